@@ -4,11 +4,31 @@
 """
 
 import os
+import copy
+import functools
 import yaml
 from typing import Dict, Any
 from pathlib import Path
 from dotenv import load_dotenv
 
+# libyaml（C実装）のローダーが使える場合は優先して使用（純Python版より数倍高速）
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+@functools.lru_cache(maxsize=8)
+def _load_settings(path: str, mtime: float) -> Dict[str, Any]:
+    """
+    settings.yamlを読み込む（パスと更新時刻をキーにキャッシュ）
+
+    ファイルが更新されるとmtimeが変わるため自動的に再読み込みされる。
+    返り値はキャッシュ内で共有されるため、呼び出し側でコピーしてから使うこと。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
 
 class Config:
     """設定クラス - 環境変数と設定ファイルを統合管理"""
@@ -27,74 +47,96 @@ class Config:
         if env_path.exists():
             load_dotenv(env_path)
         
+        # 環境変数のスナップショット（.env読み込み後に一度だけ取得）
+        # 以降の設定値はこの辞書から参照する
+        self._env = dict(os.environ)
+        
         # 設定ファイルの読み込み
         settings_path = self.project_root / settings_file
         if settings_path.exists():
-            with open(settings_path, 'r', encoding='utf-8') as f:
-                self.settings = yaml.safe_load(f)
+            # 2回目以降のインスタンス化ではYAMLの再パースをスキップ
+            # キャッシュ側を書き換えないよう、インスタンスごとに深いコピーを持つ
+            self.settings = copy.deepcopy(
+                _load_settings(str(settings_path), settings_path.stat().st_mtime)
+            )
         else:
             self.settings = {}
         
         # API Keys（環境変数から取得）
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        self.notion_token = os.getenv('NOTION_TOKEN')
-        self.notion_root_page_id = os.getenv('NOTION_ROOT_PAGE_ID')
+        self.openai_api_key = self._env.get('OPENAI_API_KEY')
+        self.notion_token = self._env.get('NOTION_TOKEN')
+        self.notion_root_page_id = self._env.get('NOTION_ROOT_PAGE_ID')
         
         # Google Drive設定
-        self.google_drive_credentials_path = os.getenv('GOOGLE_DRIVE_CREDENTIALS_PATH')
-        self.google_drive_folder_ids = os.getenv('GOOGLE_DRIVE_FOLDER_IDS', '').split(',')
-        
-        # システム設定（settings.yamlから取得、環境変数で上書き可能）
-        self.chromadb = self._get_chromadb_config()
-        self.embedding = self._get_embedding_config()
-        self.llm = self._get_llm_config()
-        self.chunking = self._get_chunking_config()
-        self.retriever = self._get_retriever_config()
+        self.google_drive_credentials_path = self._env.get('GOOGLE_DRIVE_CREDENTIALS_PATH')
+        self.google_drive_folder_ids = self._env.get('GOOGLE_DRIVE_FOLDER_IDS', '').split(',')
+    
+    # システム設定（settings.yamlから取得、環境変数で上書き可能）
+    # 各設定は初回アクセス時に一度だけ構築される
+    @functools.cached_property
+    def chromadb(self) -> Dict[str, Any]:
+        return self._get_chromadb_config()
+    
+    @functools.cached_property
+    def embedding(self) -> Dict[str, Any]:
+        return self._get_embedding_config()
+    
+    @functools.cached_property
+    def llm(self) -> Dict[str, Any]:
+        return self._get_llm_config()
+    
+    @functools.cached_property
+    def chunking(self) -> Dict[str, Any]:
+        return self._get_chunking_config()
+    
+    @functools.cached_property
+    def retriever(self) -> Dict[str, Any]:
+        return self._get_retriever_config()
     
     def _get_chromadb_config(self) -> Dict[str, Any]:
         """ChromaDB設定を取得"""
-        config = self.settings.get('chromadb', {})
+        config = dict(self.settings.get('chromadb', {}))
         # 環境変数での上書きを許可
-        config['persist_directory'] = os.getenv('CHROMA_PERSIST_DIRECTORY', 
-                                                config.get('persist_directory', './data/chromadb'))
-        config['collection_name'] = os.getenv('CHROMA_COLLECTION_NAME',
-                                             config.get('collection_name', 'phase01_documents'))
+        config['persist_directory'] = self._env.get('CHROMA_PERSIST_DIRECTORY', 
+                                                    config.get('persist_directory', './data/chromadb'))
+        config['collection_name'] = self._env.get('CHROMA_COLLECTION_NAME',
+                                                 config.get('collection_name', 'phase01_documents'))
         return config
     
     def _get_embedding_config(self) -> Dict[str, Any]:
         """埋め込みモデル設定を取得"""
-        config = self.settings.get('embedding', {})
-        config['model'] = os.getenv('OPENAI_EMBEDDING_MODEL',
-                                   config.get('model', 'text-embedding-3-small'))
+        config = dict(self.settings.get('embedding', {}))
+        config['model'] = self._env.get('OPENAI_EMBEDDING_MODEL',
+                                       config.get('model', 'text-embedding-3-small'))
         return config
     
     def _get_llm_config(self) -> Dict[str, Any]:
         """LLM設定を取得"""
-        config = self.settings.get('llm', {})
-        config['model'] = os.getenv('OPENAI_MODEL',
-                                   config.get('model', 'gpt-4o-mini'))
-        config['temperature'] = float(os.getenv('OPENAI_TEMPERATURE',
-                                               config.get('temperature', 0.3)))
-        config['max_tokens'] = int(os.getenv('OPENAI_MAX_TOKENS',
-                                            config.get('max_tokens', 2000)))
+        config = dict(self.settings.get('llm', {}))
+        config['model'] = self._env.get('OPENAI_MODEL',
+                                       config.get('model', 'gpt-4o-mini'))
+        config['temperature'] = float(self._env.get('OPENAI_TEMPERATURE',
+                                                   config.get('temperature', 0.3)))
+        config['max_tokens'] = int(self._env.get('OPENAI_MAX_TOKENS',
+                                                config.get('max_tokens', 2000)))
         return config
     
     def _get_chunking_config(self) -> Dict[str, Any]:
         """チャンク分割設定を取得"""
-        config = self.settings.get('chunking', {})
-        config['chunk_size'] = int(os.getenv('CHUNK_SIZE',
-                                            config.get('chunk_size', 500)))
-        config['chunk_overlap'] = int(os.getenv('CHUNK_OVERLAP',
-                                                config.get('chunk_overlap', 100)))
+        config = dict(self.settings.get('chunking', {}))
+        config['chunk_size'] = int(self._env.get('CHUNK_SIZE',
+                                                config.get('chunk_size', 500)))
+        config['chunk_overlap'] = int(self._env.get('CHUNK_OVERLAP',
+                                                    config.get('chunk_overlap', 100)))
         return config
     
     def _get_retriever_config(self) -> Dict[str, Any]:
         """検索設定を取得"""
-        config = self.settings.get('retriever', {})
-        config['k'] = int(os.getenv('RETRIEVER_K',
-                                   config.get('k', 10)))
-        config['score_threshold'] = float(os.getenv('RETRIEVER_SCORE_THRESHOLD',
-                                                    config.get('score_threshold', 0.2)))
+        config = dict(self.settings.get('retriever', {}))
+        config['k'] = int(self._env.get('RETRIEVER_K',
+                                       config.get('k', 10)))
+        config['score_threshold'] = float(self._env.get('RETRIEVER_SCORE_THRESHOLD',
+                                                        config.get('score_threshold', 0.2)))
         return config
     
     def validate(self) -> bool:
@@ -116,5 +158,10 @@ class Config:
         return True
 
 
-# シングルトンインスタンス
-config = Config()
\ No newline at end of file
+# シングルトンインスタンス（PEP 562により初回アクセス時に生成）
+# `from config import config` を実行した時点で初めて.envとsettings.yamlを読み込む
+def __getattr__(name: str):
+    if name == 'config':
+        instance = globals()['config'] = Config()
+        return instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
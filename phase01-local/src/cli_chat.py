@@ -15,28 +15,46 @@ import sys
 import json
 from datetime import datetime
 from typing import Optional
-import readline  # 入力履歴とタブ補完のため
+import readline  # 入力履歴（↑↓キー）のため
 from dotenv import load_dotenv
 
+# タブ補完を無効化（デフォルトのファイル名補完はTabのたびにカレントディレクトリを走査するため）
+readline.set_completer(lambda text, state: None)
+if "libedit" in (readline.__doc__ or ""):
+    readline.parse_and_bind("bind ^I ed-insert")  # macOS（libedit）
+else:
+    readline.parse_and_bind("tab: self-insert")  # GNU readline
+
 # プロジェクトのルートディレクトリをパスに追加
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from rag_chain import RAGChain
 
+# 高速JSONライブラリ（オプション）- 未インストールの場合は標準のjsonを使用
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # 環境変数の読み込み
 load_dotenv()
 
+# デバッグモード（起動時に一度だけ判定）
+_DEBUG = os.getenv("DEBUG", "").lower() == "true"
+
 # カラー出力用のANSIエスケープコード
-class Colors:
-    HEADER = '\033[95m'
-    OKBLUE = '\033[94m'
-    OKCYAN = '\033[96m'
-    OKGREEN = '\033[92m'
-    WARNING = '\033[93m'
-    FAIL = '\033[91m'
-    ENDC = '\033[0m'
-    BOLD = '\033[1m'
-    UNDERLINE = '\033[4m'
+# クラス属性の参照を避けるため、モジュールレベルの定数として定義
+HEADER = '\033[95m'
+OKBLUE = '\033[94m'
+OKCYAN = '\033[96m'
+OKGREEN = '\033[92m'
+WARNING = '\033[93m'
+FAIL = '\033[91m'
+ENDC = '\033[0m'
+BOLD = '\033[1m'
+UNDERLINE = '\033[4m'
 
 
 class CLIChat:
@@ -46,6 +64,8 @@ class CLIChat:
         """初期化"""
         self.rag_chain = None
         self.session_start = datetime.now()
+        # セッション開始時刻は変わらないため、表示用の文字列を一度だけ生成
+        self._session_start_str = self.session_start.strftime('%Y-%m-%d %H:%M:%S')
         self.question_count = 0
         
         # コマンドのヘルプ
@@ -60,39 +80,51 @@ class CLIChat:
             "/exit": "チャットを終了",
             "/quit": "チャットを終了",
         }
+        # ヘルプ表示用のテキストを事前に組み立てておく（/helpのたびに整形しない）
+        self._help_text = "\n".join(
+            [f"{BOLD}\n📚 利用可能なコマンド:{ENDC}"]
+            + [f"  {OKGREEN}{cmd:12}{ENDC} - {desc}" for cmd, desc in self.commands.items()]
+        )
         
         self.last_result = None  # 最後の回答結果を保存
+        
+        # 引数を取らないコマンドのハンドラー（辞書で直接ディスパッチ）
+        self._handlers = {
+            "/help": self.print_help,
+            "/history": self.show_history,
+            "/clear": self.clear_history,
+            "/sources": self.show_sources,
+            "/save": self.save_history,
+            "/stats": self.show_stats,
+        }
     
     def print_colored(self, text: str, color: str = ""):
         """色付きテキストを出力"""
-        print(f"{color}{text}{Colors.ENDC}")
+        sys.stdout.write(f"{color}{text}{ENDC}\n")
     
     def print_header(self):
         """ヘッダーを表示"""
-        self.print_colored("\n" + "=" * 70, Colors.OKCYAN)
-        self.print_colored("   🤖 スマートドキュメントRAGチャット", Colors.BOLD + Colors.OKCYAN)
-        self.print_colored("=" * 70, Colors.OKCYAN)
-        print(f"\n📅 セッション開始: {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"💡 ヘルプを表示するには {Colors.OKGREEN}/help{Colors.ENDC} と入力してください")
-        print(f"🚪 終了するには {Colors.WARNING}/exit{Colors.ENDC} と入力してください\n")
+        self.print_colored("\n" + "=" * 70, OKCYAN)
+        self.print_colored("   🤖 スマートドキュメントRAGチャット", BOLD + OKCYAN)
+        self.print_colored("=" * 70, OKCYAN)
+        print(f"\n📅 セッション開始: {self._session_start_str}")
+        print(f"💡 ヘルプを表示するには {OKGREEN}/help{ENDC} と入力してください")
+        print(f"🚪 終了するには {WARNING}/exit{ENDC} と入力してください\n")
     
     def print_help(self):
         """ヘルプを表示"""
-        self.print_colored("\n📚 利用可能なコマンド:", Colors.BOLD)
-        for cmd, desc in self.commands.items():
-            print(f"  {Colors.OKGREEN}{cmd:12}{Colors.ENDC} - {desc}")
-        print()
+        print(self._help_text + "\n")
     
     def initialize_rag(self):
         """RAGチェーンを初期化"""
         try:
-            self.print_colored("\n⚙️  システムを初期化中...", Colors.OKCYAN)
+            self.print_colored("\n⚙️  システムを初期化中...", OKCYAN)
             self.rag_chain = RAGChain()
-            self.print_colored("✅ 初期化完了！チャットを開始できます。\n", Colors.OKGREEN)
+            self.print_colored("✅ 初期化完了！チャットを開始できます。\n", OKGREEN)
             return True
         except Exception as e:
-            self.print_colored(f"\n❌ 初期化エラー: {e}", Colors.FAIL)
-            self.print_colored("\n以下を確認してください:", Colors.WARNING)
+            self.print_colored(f"\n❌ 初期化エラー: {e}", FAIL)
+            self.print_colored("\n以下を確認してください:", WARNING)
             print("  1. .envファイルにOPENAI_API_KEYが設定されているか")
             print("  2. indexer.pyを実行してベクトルストアが作成されているか")
             print("  3. ネットワーク接続が正常か\n")
@@ -108,36 +140,24 @@ class CLIChat:
         Returns:
             続行する場合True、終了する場合False
         """
-        command_lower = command.lower().strip()
+        # コマンド名と引数を1回の分割で取り出す（例: "/search 有給" → "/search", "有給"）
+        parts = command.strip().split(None, 1)
+        verb = parts[0].lower()
+        arg = parts[1].strip() if len(parts) > 1 else ""
         
-        if command_lower in ["/exit", "/quit"]:
+        if verb in ("/exit", "/quit"):
             return False
         
-        elif command_lower == "/help":
-            self.print_help()
-        
-        elif command_lower == "/history":
-            self.show_history()
-        
-        elif command_lower == "/clear":
-            self.clear_history()
-        
-        elif command_lower.startswith("/search "):
-            query = command[8:].strip()
-            self.search_documents(query)
+        handler = self._handlers.get(verb)
+        if handler:
+            handler()
         
-        elif command_lower == "/sources":
-            self.show_sources()
-        
-        elif command_lower == "/save":
-            self.save_history()
-        
-        elif command_lower == "/stats":
-            self.show_stats()
+        elif verb == "/search" and arg:
+            self.search_documents(arg)
         
         else:
-            self.print_colored(f"❓ 不明なコマンド: {command}", Colors.WARNING)
-            print(f"   {Colors.OKGREEN}/help{Colors.ENDC} でコマンド一覧を表示")
+            self.print_colored(f"❓ 不明なコマンド: {command}", WARNING)
+            print(f"   {OKGREEN}/help{ENDC} でコマンド一覧を表示")
         
         return True
     
@@ -146,46 +166,46 @@ class CLIChat:
         history = self.rag_chain.get_conversation_history()
         
         if not history:
-            self.print_colored("📭 会話履歴はまだありません", Colors.WARNING)
+            self.print_colored("📭 会話履歴はまだありません", WARNING)
             return
         
-        self.print_colored("\n💬 会話履歴:", Colors.BOLD)
-        print("-" * 50)
+        # 出力をリストに溜めて最後にまとめて書き出す（メッセージごとのprintを避ける）
+        lines = [f"{BOLD}\n💬 会話履歴:{ENDC}", "-" * 50]
         
         for i, msg in enumerate(history, 1):
             role_icon = "👤" if msg["role"] == "user" else "🤖"
-            role_color = Colors.OKBLUE if msg["role"] == "user" else Colors.OKGREEN
+            role_color = OKBLUE if msg["role"] == "user" else OKGREEN
             
-            print(f"\n{i}. {role_icon} ", end="")
-            self.print_colored(msg["role"].capitalize(), role_color + Colors.BOLD)
+            lines.append(f"\n{i}. {role_icon} {role_color}{BOLD}{msg['role'].capitalize()}{ENDC}")
             
             # 長いメッセージは省略
             content = msg["content"]
             if len(content) > 500:
                 content = content[:500] + "..."
-            print(f"   {content}")
+            lines.append(f"   {content}")
         
-        print("-" * 50)
+        lines.append("-" * 50)
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def clear_history(self):
         """会話履歴をクリア"""
         self.rag_chain.clear_memory()
         self.last_result = None
-        self.print_colored("💨 会話履歴をクリアしました", Colors.OKGREEN)
+        self.print_colored("💨 会話履歴をクリアしました", OKGREEN)
     
     def search_documents(self, query: str):
         """ドキュメント検索のみ実行"""
-        self.print_colored(f"\n🔍 検索中: '{query}'", Colors.OKCYAN)
+        self.print_colored(f"\n🔍 検索中: '{query}'", OKCYAN)
         
         try:
             results = self.rag_chain.search_similar_documents(query, k=10)
             
             if not results:
-                self.print_colored("📭 関連ドキュメントが見つかりませんでした", Colors.WARNING)
+                self.print_colored("📭 関連ドキュメントが見つかりませんでした", WARNING)
                 return
             
-            self.print_colored(f"\n📚 検索結果 ({len(results)}件):", Colors.BOLD)
-            print("-" * 50)
+            # 出力をリストに溜めて最後にまとめて書き出す（結果ごとのprintを避ける）
+            lines = [f"{BOLD}\n📚 検索結果 ({len(results)}件):{ENDC}", "-" * 50]
             
             for i, (doc, score) in enumerate(results, 1):
                 title = doc.metadata.get("title", "無題")
@@ -193,44 +213,43 @@ class CLIChat:
                 
                 # スコアに応じて色を変更
                 if score > 0.8:
-                    score_color = Colors.OKGREEN
+                    score_color = OKGREEN
                 elif score > 0.6:
-                    score_color = Colors.OKCYAN
+                    score_color = OKCYAN
                 else:
-                    score_color = Colors.WARNING
-                
-                print(f"\n{i}. ", end="")
-                self.print_colored(f"[{source}] {title}", Colors.BOLD)
-                print(f"   ", end="")
-                self.print_colored(f"スコア: {score:.3f}", score_color)
+                    score_color = WARNING
                 
                 # 内容のプレビュー
                 preview = doc.page_content[:150].replace("\n", " ")
-                print(f"   {preview}...")
+                
+                lines.append(f"\n{i}. {BOLD}[{source}] {title}{ENDC}")
+                lines.append(f"   {score_color}スコア: {score:.3f}{ENDC}")
+                lines.append(f"   {preview}...")
             
-            print("-" * 50)
+            lines.append("-" * 50)
+            sys.stdout.write("\n".join(lines) + "\n")
             
         except Exception as e:
-            self.print_colored(f"❌ 検索エラー: {e}", Colors.FAIL)
+            self.print_colored(f"❌ 検索エラー: {e}", FAIL)
     
     def show_sources(self):
         """最後の回答のソース詳細を表示"""
         if not self.last_result:
-            self.print_colored("📭 表示するソース情報がありません", Colors.WARNING)
+            self.print_colored("📭 表示するソース情報がありません", WARNING)
             return
         
         sources = self.last_result.get("sources", [])
         if not sources:
-            self.print_colored("📭 ソース情報がありません", Colors.WARNING)
+            self.print_colored("📭 ソース情報がありません", WARNING)
             return
         
-        self.print_colored("\n📚 参照ソース詳細:", Colors.BOLD)
+        self.print_colored("\n📚 参照ソース詳細:", BOLD)
         print("-" * 50)
         
         for i, source in enumerate(sources, 1):
             print(f"\n{i}. ", end="")
-            self.print_colored(f"[{source['source']}] {source['title']}", Colors.BOLD)
-            self.print_colored(f"   スコア: {source['score']:.3f}", Colors.OKCYAN)
+            self.print_colored(f"[{source['source']}] {source['title']}", BOLD)
+            self.print_colored(f"   スコア: {source['score']:.3f}", OKCYAN)
             print(f"   内容プレビュー:")
             print(f"   {source['content_preview']}")
         
@@ -242,7 +261,8 @@ class CLIChat:
             history = self.rag_chain.get_conversation_history()
             
             # 保存ファイル名を生成
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            now = datetime.now()
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             filename = f"chat_history_{timestamp}.json"
             filepath = os.path.join("./data/chat_logs", filename)
             
@@ -251,29 +271,36 @@ class CLIChat:
             
             # 保存データを作成
             save_data = {
-                "session_start": self.session_start.isoformat(),
-                "session_end": datetime.now().isoformat(),
+                "session_start": self.session_start,
+                "session_end": now,
                 "question_count": self.question_count,
                 "conversation": history
             }
             
             # JSONファイルに保存
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            if ORJSON_AVAILABLE:
+                # orjsonはdatetimeをISO形式で直接シリアライズし、bytesを返す
+                with open(filepath, "wb") as f:
+                    f.write(orjson.dumps(save_data, option=orjson.OPT_INDENT_2))
+            else:
+                save_data["session_start"] = save_data["session_start"].isoformat()
+                save_data["session_end"] = save_data["session_end"].isoformat()
+                with open(filepath, "w", encoding="utf-8") as f:
+                    json.dump(save_data, f, ensure_ascii=False, indent=2)
             
-            self.print_colored(f"✅ 会話履歴を保存しました: {filepath}", Colors.OKGREEN)
+            self.print_colored(f"✅ 会話履歴を保存しました: {filepath}", OKGREEN)
             
         except Exception as e:
-            self.print_colored(f"❌ 保存エラー: {e}", Colors.FAIL)
+            self.print_colored(f"❌ 保存エラー: {e}", FAIL)
     
     def show_stats(self):
         """セッション統計を表示"""
         elapsed = datetime.now() - self.session_start
         elapsed_minutes = elapsed.total_seconds() / 60
         
-        self.print_colored("\n📊 セッション統計:", Colors.BOLD)
+        self.print_colored("\n📊 セッション統計:", BOLD)
         print("-" * 50)
-        print(f"  開始時刻: {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"  開始時刻: {self._session_start_str}")
         print(f"  経過時間: {elapsed_minutes:.1f}分")
         print(f"  質問数: {self.question_count}回")
         
@@ -290,7 +317,7 @@ class CLIChat:
         self.question_count += 1
         
         print()  # 改行
-        self.print_colored(f"💭 考え中...", Colors.OKCYAN)
+        self.print_colored(f"💭 考え中...", OKCYAN)
         
         try:
             # 回答を生成
@@ -299,14 +326,14 @@ class CLIChat:
             
             # 回答を表示
             print()
-            self.print_colored("🤖 回答:", Colors.OKGREEN + Colors.BOLD)
+            self.print_colored("🤖 回答:", OKGREEN + BOLD)
             print("-" * 50)
             print(result["answer"])
             print("-" * 50)
             
             # 処理時間を表示
             elapsed = result.get("elapsed_time", 0)
-            self.print_colored(f"\n⏱️  処理時間: {elapsed:.2f}秒", Colors.OKCYAN)
+            self.print_colored(f"\n⏱️  処理時間: {elapsed:.2f}秒", OKCYAN)
             
             # ソース情報を簡易表示
             sources = result.get("sources", [])[:3]
@@ -314,12 +341,12 @@ class CLIChat:
                 print("\n📎 参照ソース:")
                 for i, source in enumerate(sources, 1):
                     print(f"  {i}. [{source['source']}] {source['title']} (スコア: {source['score']:.3f})")
-                print(f"\n💡 ソースの詳細は {Colors.OKGREEN}/sources{Colors.ENDC} で確認できます")
+                print(f"\n💡 ソースの詳細は {OKGREEN}/sources{ENDC} で確認できます")
             
         except Exception as e:
-            self.print_colored(f"\n❌ エラー: {e}", Colors.FAIL)
+            self.print_colored(f"\n❌ エラー: {e}", FAIL)
             import traceback
-            if os.getenv("DEBUG", "").lower() == "true":
+            if _DEBUG:
                 traceback.print_exc()
     
     def run(self):
@@ -336,7 +363,7 @@ class CLIChat:
             while True:
                 try:
                     # プロンプト表示と入力取得
-                    user_input = input(f"\n{Colors.OKBLUE}👤 You:{Colors.ENDC} ").strip()
+                    user_input = input(f"\n{OKBLUE}👤 You:{ENDC} ").strip()
                     
                     if not user_input:
                         continue
@@ -352,18 +379,18 @@ class CLIChat:
                 except KeyboardInterrupt:
                     # Ctrl+Cで中断
                     print()
-                    self.print_colored("\n⚠️  中断されました", Colors.WARNING)
+                    self.print_colored("\n⚠️  中断されました", WARNING)
                     continue
                 
         except Exception as e:
-            self.print_colored(f"\n❌ 予期しないエラー: {e}", Colors.FAIL)
+            self.print_colored(f"\n❌ 予期しないエラー: {e}", FAIL)
             import traceback
-            if os.getenv("DEBUG", "").lower() == "true":
+            if _DEBUG:
                 traceback.print_exc()
         
         finally:
             # 終了処理
-            self.print_colored("\n" + "=" * 70, Colors.OKCYAN)
+            self.print_colored("\n" + "=" * 70, OKCYAN)
             self.show_stats()
             
             # 会話履歴の保存を提案
@@ -372,8 +399,8 @@ class CLIChat:
                 if save_input == "y":
                     self.save_history()
             
-            self.print_colored("\n👋 ご利用ありがとうございました！", Colors.BOLD + Colors.OKCYAN)
-            self.print_colored("=" * 70 + "\n", Colors.OKCYAN)
+            self.print_colored("\n👋 ご利用ありがとうございました！", BOLD + OKCYAN)
+            self.print_colored("=" * 70 + "\n", OKCYAN)
 
 
 def main():
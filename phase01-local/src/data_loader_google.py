@@ -7,7 +7,7 @@ Google Driveクローラー（Notion版構成準拠）
 【主な機能】
 1. 指定したルートフォルダから開始して、全ファイル/フォルダを自動探索
 2. ファイルの内容をテキストとして抽出し、ローカルに保存
-3. 処理済みアイテムを記録し、中断後の再開が可能 (metadata.json)
+3. 処理済みアイテムを記録し、中断後の再開が可能 (metadata.json + metadata.jsonl)
 4. エラー処理とレート制限対策を実装
 """
 
@@ -15,26 +15,67 @@ import os
 import re
 import json
 import time
+import signal
+import contextlib
+import tempfile
+import threading
 import traceback
 import unicodedata  # Unicode正規化用（PDFテキストのクレンジングに使用）
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+import multiprocessing
 
 # Google Drive API関連のインポート
+import httplib2
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 from googleapiclient.errors import HttpError
 import io
 
-# PDF処理用ライブラリ（高精度レイアウト解析）
+# PDF処理用ライブラリ
+# pypdfium2: PDFiumベースの高速なテキスト抽出（標準）
+# pdfplumber: 高精度レイアウト解析（表組みの多いPDF向け、設定で切り替え）
 import pdfplumber
 
+try:
+    import pypdfium2 as pdfium
+
+    PYPDFIUM2_AVAILABLE = True
+except ImportError:
+    PYPDFIUM2_AVAILABLE = False
+
+# 高速JSONライブラリ（オプション）- 未インストールの場合は標準のjsonを使用
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # ========================================
 # PDFテキストクレンジング関数（RAG検索精度向上用）
 # ========================================
 
+# クレンジングで使用する正規表現（ページごとに呼ばれるため事前にコンパイル）
+_RE_PAGE_DROP = re.compile(r'---\s*ページ\s*\d+/\d+\s*---')  # ページマーカー（除去用）
+_RE_PAGE_KEEP = re.compile(r'---\s*ページ\s*(\d+)/(\d+)\s*---')  # ページマーカー（正規化用）
+_RE_NL3 = re.compile(r'\n{3,}')  # 3つ以上の連続改行
+_RE_SP2 = re.compile(r' {2,}')  # 2つ以上の連続スペース
+
+# 1文字単位の置換・削除をまとめた変換テーブル（str.translateで1パスで処理）
+_PDF_CHAR_TABLE = str.maketrans({
+    '　': ' ',  # 全角スペースを半角スペースに統一
+    '□': None,  # 判読不能文字の代替記号
+    '●': '・',  # 箇条書き記号を統一
+    # 0x00-0x1F の制御文字（タブ・改行・CRを除く）を削除
+    **{chr(c): None for c in range(0x20) if c not in (0x09, 0x0a, 0x0d)},
+})
+
+
 def clean_pdf_text(text: str, keep_page_markers: bool = False) -> str:
     """
     PDFから抽出したテキストをクレンジングして検索精度を向上させる
@@ -61,36 +102,29 @@ def clean_pdf_text(text: str, keep_page_markers: bool = False) -> str:
     # 「--- ページ X/Y ---」形式のマーカーを除去または正規化
     if not keep_page_markers:
         # ページマーカーを完全に除去（検索ノイズになるため）
-        text = re.sub(r'---\s*ページ\s*\d+/\d+\s*---', '', text)
+        text = _RE_PAGE_DROP.sub('', text)
     else:
         # ページマーカーをシンプルな形式に正規化
-        text = re.sub(r'---\s*ページ\s*(\d+)/(\d+)\s*---', r'[P\1]', text)
+        text = _RE_PAGE_KEEP.sub(r'[P\1]', text)
     
-    # ステップ2: PDFの制御文字・不要な特殊文字を除去
-    # 0x00-0x1F の制御文字（タブと改行を除く）を削除
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', text)
+    # ステップ2: 制御文字の除去・全角スペースの統一・文字化け記号の修正
+    # 変換テーブルを使い、テキスト全体を1回の走査でまとめて処理
+    text = text.translate(_PDF_CHAR_TABLE)
     
     # ステップ3: 連続する空白・改行の正規化
     # 3つ以上の連続改行を2つの改行に統一（段落区切りを保持）
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _RE_NL3.sub('\n\n', text)
     
     # 行内の連続スペースを1つに統一
-    text = re.sub(r' {2,}', ' ', text)
+    text = _RE_SP2.sub(' ', text)
     
-    # 全角スペースを半角スペースに統一
-    text = text.replace('　', ' ')
-    
-    # ステップ4: 文字化けや不要な記号の除去
-    # よくある文字化けパターンを修正
-    text = text.replace('', '')  # 文字化け記号
-    text = text.replace('□', '')  # 判読不能文字の代替記号
-    text = text.replace('●', '・')  # 箇条書き記号を統一
-    
-    # ステップ5: Unicode正規化（NFKC形式）
+    # ステップ4: Unicode正規化（NFKC形式）
     # 半角カナを全角に、機種依存文字を標準文字に変換
-    text = unicodedata.normalize('NFKC', text)
+    # ASCIIのみのテキストはNFKCで変化しないためスキップ（英数字中心のPDFで高速化）
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
     
-    # ステップ6: 前後の空白を除去
+    # ステップ5: 前後の空白を除去
     text = text.strip()
     
     return text
@@ -107,20 +141,123 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
 
+# .envから取得するGoogle Drive設定（起動時に一度だけ読み込む）
+# 認証情報ファイルのパス（相対パスの場合はプロジェクトルートからの相対パスとして解決）
+CREDENTIALS_PATH = config.google_drive_credentials_path
+if CREDENTIALS_PATH and not os.path.isabs(CREDENTIALS_PATH):
+    # スクリプトの場所から2階層上がプロジェクトルート
+    _project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    CREDENTIALS_PATH = os.path.join(_project_root, CREDENTIALS_PATH.lstrip('./'))
+# 処理対象のルートフォルダID（空要素・前後の空白を除去）
+ROOT_FOLDER_IDS = tuple(
+    folder_id.strip() for folder_id in config.google_drive_folder_ids or () if folder_id.strip()
+)
+
+# settings.yamlのdata_loader.google_drive
+_drive_settings = config.settings.get("data_loader", {}).get("google_drive", {})
+
+# PDFのテキスト抽出に使用するライブラリ（pdf_extractor）
+# pypdfium2が未インストールの場合はpdfplumberを使用
+PDF_EXTRACTOR = _drive_settings.get("pdf_extractor", "pypdfium2")
+if PDF_EXTRACTOR == "pypdfium2" and not PYPDFIUM2_AVAILABLE:
+    PDF_EXTRACTOR = "pdfplumber"
+
+# Drive APIへのHTTPリクエストのタイムアウト秒数（timeout）
+HTTP_TIMEOUT = _drive_settings.get("timeout", 30)
+
 # ファイル保存に関する設定
 SAVE_DIR = "./data/documents/google/"  # ファイルの保存先ディレクトリ
+FILE_WRITE_BUFFER_SIZE = 1 << 20  # 保存ファイル書き込み時のバッファサイズ（1MB）
+# httplib2のレスポンスキャッシュ（ETagによる再検証でメタデータ取得の転送量を削減）
+# ファイル本体のダウンロード・エクスポートはキャッシュしないクライアントで行う
+HTTP_CACHE_DIR = os.path.join(SAVE_DIR, ".httplib2_cache")
 METADATA_FILE = os.path.join(
     SAVE_DIR, "metadata.json"
 )  # 処理状況を記録するメタデータファイル
+# 処理ごとの差分を追記するジャーナル（1行1レコードのJSONL）
+# 毎回metadata.json全体を書き直す代わりに追記し、終了時にmetadata.jsonへ統合する
+METADATA_JOURNAL_FILE = os.path.join(SAVE_DIR, "metadata.jsonl")
+JOURNAL_COMPACT_INTERVAL = 1000  # この件数を追記するごとにmetadata.jsonへ統合
+# 保存済みファイルの索引（1行に「ID<TAB>更新日時<TAB>保存先パス」、追記専用）
+# 起動時はmetadata.json全体ではなくこの索引だけを読み込み、差分同期の判定に使う
+SYNC_INDEX_FILE = os.path.join(SAVE_DIR, "visited.tsv")
 
 # Google Drive APIサービスクライアントを格納するグローバル変数
 # initialize_drive_service()関数で初期化される
 drive_service = None
 
-# 訪問済みページIDを記録するセット
+# アイテムのメタデータとして取得するフィールド（files().get / files().list で共通）
+FILE_FIELDS = "id, name, mimeType, webViewLink, createdTime, modifiedTime, owners, size"
+
+# files().list() 1回で取得するアイテム数（Drive APIの上限は1000、省略時は100）
+LIST_PAGE_SIZE = 1000
+
+# バッチリクエスト1回あたりの最大リクエスト数（Drive APIの上限）
+BATCH_REQUEST_LIMIT = 100
+
+# 大きなファイルは指定サイズごとのRange GETに分割し、並列にダウンロードする
+RANGE_CHUNK_SIZE = 8 * 1024 * 1024  # 分割単位（これ以下のファイルは1リクエストで取得）
+RANGE_DOWNLOAD_WORKERS = 4  # 1ファイルあたりの同時ダウンロード数
+
+# 並列処理の設定
+# 処理はAPIの応答待ちが大半のため、スレッドで兄弟アイテムを並列に処理する
+MAX_WORKERS = 8  # 同時に処理するアイテム数の上限
+DRIVE_REQUESTS_PER_SECOND = 10  # Drive APIへのリクエスト数の上限（全スレッド合計）
+
+# httplib2.Httpはスレッドセーフではないため、APIクライアントはスレッドごとに構築する
+_credentials = None
+_thread_local = threading.local()
+
+# metadata / visited_page_ids の更新とmetadata.jsonの書き込みを保護するロック
+_metadata_lock = threading.RLock()
+
+# ジャーナルのファイルハンドルと、前回の統合以降に追記した件数
+_journal_file = None
+_journal_count = 0
+
+# 索引のファイルハンドルと、metadata.json全体をメモリ上に読み込み済みか
+# （索引だけで起動した場合は、統合時にmetadata.jsonを読み込んで今回の内容とマージする）
+_index_file = None
+_metadata_loaded = False
+
+# 並列クロール用のスレッドプールと、完了待ちのタスク
+_executor: Optional[ThreadPoolExecutor] = None
+_pending_futures: set = set()
+
+# Range GET用のスレッドプール（初回使用時に生成し、スレッドごとのAPIクライアントを再利用する）
+_range_executor: Optional[ThreadPoolExecutor] = None
+_range_executor_lock = threading.Lock()
+
+# PDFのページ抽出（CPU処理）を並列化するプロセスプール（初回使用時に生成し、全PDFで共有）
+# ページ数がPDF_PARALLEL_MIN_PAGES未満のPDFはプロセス間転送のコストが上回るため現プロセスで処理
+PDF_EXTRACT_WORKERS = os.cpu_count() or 1
+PDF_PARALLEL_MIN_PAGES = 16
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+_pdf_executor_lock = threading.Lock()
+
+# PDFiumはスレッドセーフではなく、別々の文書でも複数スレッドから同時に呼び出せないため、
+# pypdfium2の呼び出し（ページ数の取得を含む）はすべてこのロックの中で行う
+# （プロセスプールのワーカーはプロセスごとに別のロックを持つ）
+_pdfium_lock = threading.Lock()
+
+# 図形描画が大半を占めるページの判定基準（pdfplumber使用時のみ）
+# コンテンツストリームがこのサイズ以上で、テキスト描画命令あたりのバイト数が基準を超えるページは
+# 図・グラフと判断してテキスト抽出をスキップする（レイアウト解析が極端に遅くなるため）
+GRAPHICS_PAGE_MIN_BYTES = 1024 * 1024
+GRAPHICS_PAGE_BYTES_PER_TEXT_OP = 10000
+
+# pdfplumberで1ページの抽出にかけられる最大秒数（超えたページはスキップ）
+# SIGALRMを使用するため、POSIX環境のメインスレッド（プロセスプールのワーカーなど）でのみ有効
+PDF_PAGE_TIMEOUT = 30
+
+# 今回のクロールで訪問済みのページIDを記録するセット
 # 同じアイテム（ファイル/フォルダ）を重複して処理しないよう、また循環参照を防ぐために使用
+# 前回までに保存したファイルは、Drive上の更新日時を比較して変更がなければダウンロードを省略する
 visited_page_ids: set = set()
 
+# 前回までに保存したファイルの索引: ID -> (Drive上の更新日時, 保存先パス)
+known_files: Dict[str, Tuple[str, str]] = {}
+
 # メタデータを保存する辞書
 # クロール処理の状況、処理済みページ情報、エラー情報などを記録
 metadata = {
@@ -174,55 +311,268 @@ EXCLUDED_MIME_PATTERNS = [
     "application/vnd.openxmlformats",  # MS Office形式（.docx, .xlsx等）
     "application/postscript",  # PostScriptファイル（.ai等）
 ]
+# str.startswithにまとめて渡すためのタプル（1回の呼び出しで全パターンを判定）
+EXCLUDED_MIME_PREFIXES = tuple(EXCLUDED_MIME_PATTERNS)
+
+
+class _RateLimiter:
+    """
+    トークンバケット方式のレート制限。
+    全スレッドで共有し、APIへのリクエスト間隔を一定以上に保つ。
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """トークンを1つ取得する（取得できるまで待機）"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self._rate
+            time.sleep(wait_seconds)
+
+
+_rate_limiter = _RateLimiter(DRIVE_REQUESTS_PER_SECOND)
+
+
+def _json_dumps(obj, pretty: bool = False) -> bytes:
+    """
+    メタデータをUTF-8のJSONバイト列に変換する（orjsonがあれば使用）。
+    prettyがTrueの場合はインデント付きで出力する。
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None).encode("utf-8")
+
+
+# JSONの読み込み（orjson.JSONDecodeErrorはjson.JSONDecodeErrorのサブクラス）
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
 
 
 def load_existing_metadata():
     """
     既存のメタデータを読み込む（再開可能にするため）。
     スクリプト開始時に呼び出され、前回の処理状況を復元する。
+    前回が正常に終了していれば、保存済みファイルの索引だけを読み込む。
     """
-    # グローバル変数をこの関数内で変更するためglobal宣言
-    global metadata, visited_page_ids
+    global known_files
+
+    # 索引があり、ジャーナルが残っていない（前回の統合が完了している）場合は索引のみ読み込む
+    # metadata.json全体の読み込みは統合時（compact_metadata）まで遅らせる
+    if os.path.exists(SYNC_INDEX_FILE) and not os.path.exists(METADATA_JOURNAL_FILE):
+        try:
+            known_files = read_sync_index()
+            print(f"📂 既存データ読み込み: {len(known_files)}ページ処理済み")
+            return True  # 読み込み成功
+        except Exception as e:
+            print(f"⚠️  索引読み込みエラー: {e}")
+
+    # metadata.jsonを読み込む
+    loaded = _merge_metadata_file()
+
+    # 前回の実行が途中で中断された場合、ジャーナルに残った差分を反映する
+    replayed = replay_journal()
+
+    if not (loaded or replayed):
+        return False  # ファイルが存在しないか、読み込みに失敗した場合
+
+    # 処理済みページは、更新日時が変わっていなければ再ダウンロードしない（差分同期）
+    known_files = {
+        page_id: (page.get("properties", {}).get("modified_time") or "", page.get("path", ""))
+        for page_id, page in metadata["pages"].items()
+    }
+    print(f"📂 既存データ読み込み: {len(known_files)}ページ処理済み")
+    if replayed:
+        print(f"📜 ジャーナルから {replayed} 件を復元")
+
+    # ジャーナルを統合し、索引を作り直す（次回以降は索引のみで起動できる）
+    compact_metadata()
+    return True  # 読み込み成功
+
+
+def _merge_metadata_file() -> bool:
+    """
+    metadata.jsonを読み込み、メモリ上のメタデータ（今回処理した分）とマージする。
+    metadata.jsonを読み込めた場合はTrueを返す。
+    """
+    global _metadata_loaded
+    _metadata_loaded = True
 
     # metadata.jsonファイルが存在するかチェック
-    if os.path.exists(METADATA_FILE):
+    if not os.path.exists(METADATA_FILE):
+        return False
+
+    try:
+        # JSONファイルを読み込みモードでオープンし、Pythonの辞書として読み込み
+        with open(METADATA_FILE, "rb") as f:
+            existing_data = _json_loads(f.read())
+    except Exception as e:
+        # JSON読み込み中、またはデータ形式が不正な場合にエラーを出力
+        print(f"⚠️  既存メタデータ読み込みエラー: {e}")
+        return False
+
+    # 既存のpagesデータに今回処理したページを上書き（キーが存在しない場合は空の辞書をデフォルト値とする）
+    pages = existing_data.get("pages", {})
+    pages.update(metadata["pages"])
+    metadata["pages"] = pages
+    # 処理済みページ数はpagesの件数と一致させる
+    metadata["total_pages"] = len(pages)
+    # 既存のエラーページのリストの後ろに今回のエラーを追加（キーが存在しない場合は空リストをデフォルト値とする）
+    metadata["error_pages"] = existing_data.get("error_pages", []) + metadata["error_pages"]
+    return True
+
+
+def read_sync_index() -> Dict[str, Tuple[str, str]]:
+    """
+    保存済みファイルの索引を読み込む。
+    同じIDが複数行ある場合は後の行（新しい記録）を優先する。
+    """
+    index = {}
+    with open(SYNC_INDEX_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) == 3:  # 中断時に書きかけだった行は無視する
+                index[fields[0]] = (fields[1], fields[2])
+    return index
+
+
+def append_sync_index(item_id: str, modified_time: Optional[str], path: str):
+    """保存したファイルを索引に1行追記する"""
+    global _index_file
+    with _metadata_lock:
         try:
-            # JSONファイルを読み込みモードでオープン
-            with open(METADATA_FILE, "r", encoding="utf-8") as f:
-                # JSONデータをPythonの辞書として読み込み
-                existing_data = json.load(f)
-
-                # 既存のpagesデータをメタデータにコピー（キーが存在しない場合は空の辞書をデフォルト値とする）
-                metadata["pages"] = existing_data.get("pages", {})
-                # 処理済みページ数を復元（キーが存在しない場合は0をデフォルト値とする）
-                metadata["total_pages"] = existing_data.get("total_pages", 0)
-                # エラーページのリストを復元（キーが存在しない場合は空リストをデフォルト値とする）
-                metadata["error_pages"] = existing_data.get("error_pages", [])
-
-                # 重要：pagesデータのキー（ページID）をsetに変換してvisited_page_idsに格納
-                # これにより、既に処理したページを再処理しないようにする
-                visited_page_ids = set(metadata["pages"].keys())
-                print(f"📂 既存データ読み込み: {len(visited_page_ids)}ページ処理済み")
-                return True  # 読み込み成功
+            if _index_file is None:
+                _index_file = open(SYNC_INDEX_FILE, "a", encoding="utf-8")
+            _index_file.write(f"{item_id}\t{modified_time or ''}\t{path}\n")
+            _index_file.flush()
         except Exception as e:
-            # JSON読み込み中、またはデータ形式が不正な場合にエラーを出力
-            print(f"⚠️  既存メタデータ読み込みエラー: {e}")
-    return False  # ファイルが存在しないか、読み込みに失敗した場合
+            print(f"❌ 索引保存エラー: {e}")
 
 
-def save_metadata():
+def _write_sync_index():
+    """メタデータ全体から索引を作り直す（重複行を除いた最新の状態にする）"""
+    global _index_file
+    if _index_file is not None:
+        _index_file.close()
+        _index_file = None
+
+    tmp_path = SYNC_INDEX_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(
+            f"{page_id}\t{page.get('properties', {}).get('modified_time') or ''}\t{page.get('path', '')}\n"
+            for page_id, page in metadata["pages"].items()
+        )
+    os.replace(tmp_path, SYNC_INDEX_FILE)
+
+
+def replay_journal() -> int:
+    """
+    ジャーナル（metadata.jsonl）の内容をメタデータに反映する。
+    反映したレコード数を返す。
+    """
+    if not os.path.exists(METADATA_JOURNAL_FILE):
+        return 0
+
+    count = 0
+    try:
+        with open(METADATA_JOURNAL_FILE, "rb") as f:
+            for line in f:
+                try:
+                    entry = _json_loads(line)
+                except json.JSONDecodeError:
+                    continue  # 中断時に書きかけだった行は無視する
+
+                if "error" in entry:
+                    metadata["error_pages"].append(entry["error"])
+                else:
+                    if entry["id"] not in metadata["pages"]:
+                        metadata["total_pages"] += 1
+                    metadata["pages"][entry["id"]] = entry["record"]
+                count += 1
+    except Exception as e:
+        print(f"⚠️  ジャーナル読み込みエラー: {e}")
+    return count
+
+
+def save_metadata() -> bool:
     """
     現在のメタデータをJSONファイルとして保存する。
-    各アイテム処理後に呼び出され、プログラムが中断されても進捗が失われないようにする。
+    ジャーナルの統合時（compact_metadata）に呼び出される。
     """
     try:
-        # メタデータ保存用のファイルを開く（書き込みモード）
-        # ensure_ascii=Falseで日本語がそのまま保存され、indent=2で見やすい形式にする
-        with open(METADATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        # 一時ファイルに書き出してから置き換え、書き込み中に中断されても既存ファイルを壊さない
+        # 日本語はエスケープせずUTF-8のまま保存し、インデント付きで見やすい形式にする
+        # 他スレッドによる書き込み中の変更を防ぐためロックを取得
+        tmp_path = METADATA_FILE + ".tmp"
+        with _metadata_lock:
+            with open(tmp_path, "wb") as f:
+                f.write(_json_dumps(metadata, pretty=True))
+            os.replace(tmp_path, METADATA_FILE)
+        return True
     except Exception as e:
         # ファイルへの書き込み権限がない場合などのエラーを捕捉
         print(f"❌ メタデータ保存エラー: {e}")
+        return False
+
+
+def append_journal(entry: Dict):
+    """
+    処理結果を1行のJSONとしてジャーナルに追記する。
+    各アイテム処理後に呼び出され、プログラムが中断されても進捗が失われないようにする。
+    追記件数がJOURNAL_COMPACT_INTERVALに達したらmetadata.jsonへ統合する。
+    """
+    global _journal_file, _journal_count
+    with _metadata_lock:
+        try:
+            if _journal_file is None:
+                _journal_file = open(METADATA_JOURNAL_FILE, "ab")
+            _journal_file.write(_json_dumps(entry) + b"\n")
+            _journal_file.flush()
+        except Exception as e:
+            print(f"❌ メタデータ保存エラー: {e}")
+            return
+
+        _journal_count += 1
+        if _journal_count >= JOURNAL_COMPACT_INTERVAL:
+            compact_metadata()
+
+
+def compact_metadata():
+    """
+    メタデータ全体をmetadata.jsonに保存し、索引を作り直して、反映済みのジャーナルを削除する。
+    """
+    global _journal_file, _journal_count
+    with _metadata_lock:
+        # 索引だけで起動した場合は、既存のmetadata.jsonとマージしてから保存する
+        if not _metadata_loaded:
+            _merge_metadata_file()
+        # 保存に失敗した場合はジャーナルを残し、次回起動時に復元できるようにする
+        if not save_metadata():
+            return
+        try:
+            _write_sync_index()
+        except Exception as e:
+            print(f"❌ 索引保存エラー: {e}")
+            return
+        if _journal_file is not None:
+            _journal_file.close()
+            _journal_file = None
+        if os.path.exists(METADATA_JOURNAL_FILE):
+            os.remove(METADATA_JOURNAL_FILE)
+        _journal_count = 0
 
 
 def is_excluded_mime_type(mime_type: str) -> bool:
@@ -230,14 +580,13 @@ def is_excluded_mime_type(mime_type: str) -> bool:
     MIMEタイプが除外対象かどうかをチェックする。
     画像、動画、バイナリファイルなどを除外する。
     """
-    if not mime_type:
-        return False
-    
     # 除外パターンのいずれかに該当するかチェック
-    for pattern in EXCLUDED_MIME_PATTERNS:
-        if mime_type.startswith(pattern):
-            return True
-    return False
+    return bool(mime_type) and mime_type.startswith(EXCLUDED_MIME_PREFIXES)
+
+
+# ファイル名の整形で使用する変換テーブルと正規表現（アイテムごとに呼ばれるため事前に作成）
+_UNSAFE_FILENAME_TABLE = str.maketrans({c: "_" for c in '\\/*?:"<>|\n\r\t'})  # OSで使用できない文字
+_RE_MULTI_UNDERSCORE = re.compile(r"_{2,}")  # 連続したアンダースコア
 
 
 def sanitize_filename(name: str, max_length: int = 200) -> str:
@@ -245,10 +594,11 @@ def sanitize_filename(name: str, max_length: int = 200) -> str:
     ファイル名として使えない文字を置換し、長さを制限する。
     OSのファイルシステムで安全に扱えるファイル名を生成する。
     """
-    # 正規表現でOSで使用できない文字（\ / * ? : " < > | および改行など）をアンダースコアに置換
-    name = re.sub(r'[\\/*?:"<>|\n\r\t]', "_", name)
+    # OSで使用できない文字（\ / * ? : " < > | および改行など）をアンダースコアに置換
+    # 1文字単位の置換のため、正規表現ではなく変換テーブルで1回の走査で処理
+    name = name.translate(_UNSAFE_FILENAME_TABLE)
     # 連続したアンダースコアを単一のアンダースコアに置換（例: "file___name" -> "file_name"）
-    name = re.sub(r"_+", "_", name)
+    name = _RE_MULTI_UNDERSCORE.sub("_", name)
     # 先頭と末尾の不要なスペースやタブを削除
     name = name.strip()
     # ファイル名が指定の最大長（多くのファイルシステムで255文字制限）を超える場合は切り詰める
@@ -264,15 +614,9 @@ def initialize_drive_service():
     メイン処理の開始前に一度だけ呼び出される。
     """
     # グローバル変数をこの関数内で変更するためglobal宣言
-    global drive_service
-    # .envファイルからサービスアカウントの認証情報ファイルへのパスを取得
-    creds_path = config.google_drive_credentials_path
-    
-    # 相対パスの場合、プロジェクトルートからの相対パスとして解決
-    if creds_path and not os.path.isabs(creds_path):
-        # スクリプトの場所から2階層上がプロジェクトルート
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        creds_path = os.path.join(project_root, creds_path.lstrip('./'))
+    global drive_service, _credentials
+    # サービスアカウントの認証情報ファイルへのパス（起動時に解決済み）
+    creds_path = CREDENTIALS_PATH
     
     # 認証情報ファイルが存在しない場合はエラーを発生させる
     if not creds_path or not os.path.exists(creds_path):
@@ -280,11 +624,12 @@ def initialize_drive_service():
     try:
         # サービスアカウントキーファイルから認証情報を生成
         # スコープは 'drive.readonly' とし、読み取り専用の権限を要求する
-        credentials = service_account.Credentials.from_service_account_file(
+        _credentials = service_account.Credentials.from_service_account_file(
             creds_path, scopes=["https://www.googleapis.com/auth/drive.readonly"]
         )
         # 認証情報を使用してGoogle Drive APIのクライアントを構築
-        drive_service = build("drive", "v3", credentials=credentials)
+        drive_service = _build_drive_service()
+        _thread_local.service = drive_service
         print("✅ Google Drive API接続成功")
     except Exception as e:
         # 認証情報の形式が不正な場合や、APIへの接続に失敗した場合のエラー
@@ -292,10 +637,319 @@ def initialize_drive_service():
         raise
 
 
-def download_file_content(file_id: str, mime_type: str) -> Optional[str]:
+def _build_drive_service(cache: bool = True):
+    """
+    Google Drive APIのクライアントを構築する。
+    接続を使い回すhttplib2.Http（タイムアウト付き）を1つ割り当てる。
+    cache=Trueの場合はレスポンスをHTTP_CACHE_DIRにキャッシュする（メタデータ取得用）。
+    httplib2.Httpはスレッドセーフではないため、スレッドごとに呼び出して別々に構築する。
+    """
+    http = httplib2.Http(cache=HTTP_CACHE_DIR if cache else None, timeout=HTTP_TIMEOUT)
+    return build("drive", "v3", http=AuthorizedHttp(_credentials, http=http), cache_discovery=False)
+
+
+def get_drive_service():
+    """
+    現在のスレッド専用のGoogle Drive APIクライアントを返す。
+    ワーカースレッドでは初回呼び出し時に構築し、以降は再利用する。
+    """
+    service = getattr(_thread_local, "service", None)
+    if service is None:
+        service = _build_drive_service()
+        _thread_local.service = service
+    return service
+
+
+def get_drive_media_service():
+    """
+    現在のスレッド専用の、ファイル本体のダウンロード用Google Drive APIクライアントを返す。
+    get_media/export_mediaのレスポンス（ファイル内容そのもの）がHTTP_CACHE_DIRに
+    複製されないよう、レスポンスキャッシュを使わないクライアントを別に構築する。
+    """
+    service = getattr(_thread_local, "media_service", None)
+    if service is None:
+        service = _build_drive_service(cache=False)
+        _thread_local.media_service = service
+    return service
+
+
+def _get_range_executor() -> ThreadPoolExecutor:
+    """Range GET用のスレッドプールを返す（初回呼び出し時に生成）"""
+    global _range_executor
+    with _range_executor_lock:
+        if _range_executor is None:
+            _range_executor = ThreadPoolExecutor(max_workers=RANGE_DOWNLOAD_WORKERS)
+        return _range_executor
+
+
+def _download_range(file_id: str, start: int, end: int) -> bytes:
+    """ファイルの指定バイト範囲（start〜end、両端を含む）をダウンロードする"""
+    request = get_drive_media_service().files().get_media(fileId=file_id)
+    request.headers["Range"] = f"bytes={start}-{end}"
+    return request.execute()
+
+
+def download_media_in_ranges(file_id: str, file_size: int, fh: io.IOBase):
+    """
+    ファイルをRANGE_CHUNK_SIZEごとのRange GETに分割し、並列にダウンロードしてfhに書き込む。
+    チャンクごとの往復待ちを重ねることで、大きなPDFのダウンロード時間を短縮する。
+    """
+    executor = _get_range_executor()
+
+    futures = {}
+    for start in range(0, file_size, RANGE_CHUNK_SIZE):
+        end = min(start + RANGE_CHUNK_SIZE, file_size) - 1
+        futures[executor.submit(_download_range, file_id, start, end)] = (start, end)
+
+    # 各範囲をファイルの該当位置に書き込む（書き込み後の範囲データはすぐに解放される）
+    for future, (start, end) in futures.items():
+        data = future.result()
+        if len(data) != end - start + 1:
+            raise IOError(f"Range GETのサイズが一致しません: bytes={start}-{end} ({len(data)} bytes)")
+        fh.seek(start)
+        fh.write(data)
+
+
+def _is_graphics_heavy_page(page) -> bool:
+    """
+    pdfplumberのページが図形描画中心（テキストをほとんど含まない）かを判定する。
+    コンテンツストリームを走査し、テキスト描画命令（Tj / TJ）の数とサイズの比で判断する。
+    """
+    from pdfminer.pdftypes import resolve1
+
+    data = b"".join(resolve1(stream).get_data() for stream in page.page_obj.contents or [])
+    if len(data) < GRAPHICS_PAGE_MIN_BYTES:
+        return False
+    text_ops = data.count(b"Tj") + data.count(b"TJ")
+    return len(data) / max(text_ops, 1) > GRAPHICS_PAGE_BYTES_PER_TEXT_OP
+
+
+class _PageTimeout(Exception):
+    """1ページの抽出がPDF_PAGE_TIMEOUTを超えたことを示す例外"""
+
+
+@contextlib.contextmanager
+def _page_timeout(seconds: int):
+    """
+    ブロック内の処理がseconds秒を超えたら_PageTimeoutを送出する。
+    SIGALRMが使えない環境やメインスレッド以外では何もしない。
+    """
+    if not hasattr(signal, "SIGALRM") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _on_timeout(signum, frame):
+        raise _PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, _on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_page_text_with_timeout(page) -> Optional[str]:
+    """pdfplumberのページからテキストを抽出する（タイムアウトした場合はNone）"""
+    try:
+        with _page_timeout(PDF_PAGE_TIMEOUT):
+            return page.extract_text() or ""
+    except _PageTimeout:
+        print(f"      ⏱️ ページ {page.page_number} の抽出がタイムアウトしました（{PDF_PAGE_TIMEOUT}秒）")
+        return None
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int,
+                        extractor: str) -> List[Optional[str]]:
+    """
+    PDFのstart〜end-1ページからテキストを抽出する。
+    図形描画中心のためスキップしたページ、タイムアウトしたページはNoneとなる。
+    プロセスプールから呼び出すため、モジュールのトップレベルに定義している。
+    """
+    if extractor == "pdfplumber":
+        # pdfplumberの高精度テキスト抽出
+        # extract_text()は自動的にレイアウトを解析し、適切な改行を維持
+        # laparamsを渡すとpdfminerのレイアウト解析（LTTextBox等の構築）が追加で走り遅くなるため指定しない
+        with pdfplumber.open(pdf_path) as pdf:
+            return [
+                None if _is_graphics_heavy_page(page) else _extract_page_text_with_timeout(page)
+                for page in pdf.pages[start:end]
+            ]
+
+    # pypdfium2のテキスト抽出（レイアウト解析・図形の処理を行わないため高速）
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            page_texts = []
+            for i in range(start, end):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                try:
+                    # PDFiumは改行をCRLFで返すため、LFに統一
+                    page_texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+                finally:
+                    textpage.close()
+                    page.close()
+            return page_texts
+        finally:
+            pdf.close()
+
+
+def _count_pdf_pages(pdf_path: str, extractor: str) -> int:
+    """PDFのページ数を返す"""
+    if extractor == "pdfplumber":
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    """PDF抽出用のプロセスプールを返す（初回呼び出し時に生成）"""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            # クロールはスレッドで並列実行しているため、fork時のロック状態を引き継がないspawnを使用
+            _pdf_executor = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_executor
+
+
+def shutdown_pdf_executor():
+    """PDF抽出用のプロセスプールを終了する"""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is not None:
+            _pdf_executor.shutdown()
+            _pdf_executor = None
+
+
+def extract_pdf_pages(pdf_path: str) -> List[Optional[str]]:
+    """
+    PDFファイルの各ページからテキストを抽出し、ページ順のリストとして返す。
+    使用するライブラリはPDF_EXTRACTORで切り替える。
+    図形描画中心のためスキップしたページはNoneとなる。
+    ページ数の多いPDFは、ページ範囲ごとにプロセスプールで並列に抽出する。
+    """
+    total_pages = _count_pdf_pages(pdf_path, PDF_EXTRACTOR)
+
+    if PDF_EXTRACT_WORKERS <= 1 or total_pages < PDF_PARALLEL_MIN_PAGES:
+        return _extract_page_range(pdf_path, 0, total_pages, PDF_EXTRACTOR)
+
+    # ワーカーごとに連続したページ範囲を割り当てる（各ワーカーは同じファイルをパスで開く）
+    pages_per_worker = -(-total_pages // PDF_EXTRACT_WORKERS)  # 切り上げ
+    starts = range(0, total_pages, pages_per_worker)
+    executor = _get_pdf_executor()
+    futures = [
+        executor.submit(
+            _extract_page_range, pdf_path, start, min(start + pages_per_worker, total_pages), PDF_EXTRACTOR
+        )
+        for start in starts
+    ]
+
+    # ページ順を保って結合
+    page_texts = []
+    for future in futures:
+        page_texts.extend(future.result())
+    return page_texts
+
+
+def _download_to(fh: io.IOBase, file_id: str, export_mime: Optional[str],
+                 file_size: Optional[int]):
+    """
+    ファイルの内容をダウンロードしてfhに書き込む。
+    export_mimeが指定された場合はエクスポート、それ以外は直接ダウンロードする。
+    """
+    # 直接ダウンロード可能な大きなファイルの場合、範囲ごとに並列ダウンロード
+    # （エクスポートはサイズが事前に分からないため対象外）
+    if not export_mime and file_size and file_size > RANGE_CHUNK_SIZE:
+        download_media_in_ranges(file_id, file_size, fh)
+        return
+
+    service = get_drive_media_service()  # ファイル内容はキャッシュしない
+    # Googleドキュメントなど、エクスポートが必要なファイルの場合
+    if export_mime:
+        request = service.files().export_media(
+            fileId=file_id, mimeType=export_mime
+        )
+    # PDFなど、直接ダウンロード可能なファイルの場合
+    else:
+        request = service.files().get_media(fileId=file_id)
+
+    # ダウンロードを実行するダウンローダーを初期化
+    downloader = MediaIoBaseDownload(fh, request)
+
+    # チャンクごとにダウンロードを実行
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()  # statusは使用しない
+
+
+def extract_pdf_text(pdf_path: str) -> Optional[str]:
+    """
+    ダウンロード済みのPDFファイルからテキストを抽出し、クレンジングして返す。
+    テキストが抽出できなかった場合や処理に失敗した場合はNoneを返す。
+    """
+    try:
+        # 各ページからテキストを抽出
+        page_texts = extract_pdf_pages(pdf_path)
+        total_pages = len(page_texts)
+        
+        # 図形描画中心・タイムアウトのためスキップしたページを表示
+        skipped_pages = [i for i, page_text in enumerate(page_texts, 1) if page_text is None]
+        if skipped_pages:
+            print(f"      ⏭️ スキップしたページ: {skipped_pages}")
+        
+        # ページごとのテキストをリストに集め、最後に1回で結合する
+        parts = []
+        pages_with_text = 0
+        for i, page_text in enumerate(page_texts, 1):
+            # 空白のみのページ（画像だけのページなど）はページ区切りも追加しない
+            if not page_text or page_text.isspace():
+                continue
+            pages_with_text += 1
+            # ページ区切りを追加（後でクレンジングで処理される）
+            parts.append(f"\n--- ページ {i}/{total_pages} ---\n")
+            parts.append(page_text)
+        
+        # テキストが抽出できなかった場合
+        if not pages_with_text:
+            print(f"      ⚠️ PDFからテキストを抽出できませんでした")
+            return None
+        text_content = "".join(parts)
+        
+        # 抽出したPDFテキストをクレンジング
+        # RAG検索精度向上のため、ノイズを除去
+        original_length = len(text_content)
+        text_content = clean_pdf_text(text_content, keep_page_markers=False)
+        cleaned_length = len(text_content)
+        
+        print(f"      📄 PDFから {original_length} 文字を抽出（テキストのあるページ: {pages_with_text}/{total_pages}）")
+        print(f"      🧹 クレンジング後: {cleaned_length} 文字 (削減率: {100*(1-cleaned_length/original_length):.1f}%)")
+        
+        return text_content
+        
+    except Exception as pdf_error:
+        print(f"      ❌ PDF処理エラー: {pdf_error}")
+        # デバッグ情報を追加
+        print(f"         エラータイプ: {type(pdf_error).__name__}")
+        return None
+
+
+def download_file_content(file_id: str, mime_type: str,
+                          file_size: Optional[int] = None) -> Optional[str]:
     """
     指定されたファイルのIDとMIMEタイプに基づき、内容をダウンロードしてテキストとして返す。
     Googleドキュメントなどはエクスポートし、PDFはテキスト抽出、その他は直接ダウンロードする。
+    file_sizeが分かっていてRANGE_CHUNK_SIZEを超える場合は、Range GETで並列にダウンロードする。
     """
     try:
         # MIMEタイプに対応するエクスポート設定を取得
@@ -303,77 +957,28 @@ def download_file_content(file_id: str, mime_type: str) -> Optional[str]:
         export_mime = mime_info.get("export_mime")
         is_pdf = mime_info.get("is_pdf", False)
 
-        # Googleドキュメントなど、エクスポートが必要なファイルの場合
-        if export_mime:
-            request = drive_service.files().export_media(
-                fileId=file_id, mimeType=export_mime
-            )
-        # PDFなど、直接ダウンロード可能なファイルの場合
-        else:
-            request = drive_service.files().get_media(fileId=file_id)
+        # PDFファイルの場合、一時ファイルに直接ダウンロードしてからテキスト抽出
+        # （PDF全体をメモリ上に保持せず、抽出ライブラリ・ワーカープロセスにはパスで渡す）
+        if is_pdf:
+            temp_file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+            try:
+                with temp_file:
+                    _download_to(temp_file, file_id, export_mime, file_size)
+                return extract_pdf_text(temp_file.name)
+            finally:
+                os.remove(temp_file.name)
 
         # ダウンロードした内容をメモリ上のバイナリデータとして保持
         file_content_io = io.BytesIO()
-        # ダウンロードを実行するダウンローダーを初期化
-        downloader = MediaIoBaseDownload(file_content_io, request)
+        _download_to(file_content_io, file_id, export_mime, file_size)
 
-        # チャンクごとにダウンロードを実行
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()  # statusは使用しない
-
-        # PDFファイルの場合、pdfplumberでテキスト抽出
-        if is_pdf:
-            try:
-                # バイトデータを先頭に巻き戻す
-                file_content_io.seek(0)
-                
-                # pdfplumberでPDFを開く
-                with pdfplumber.open(file_content_io) as pdf:
-                    text_content = ""
-                    total_pages = len(pdf.pages)
-                    
-                    # 各ページからテキストを抽出
-                    for i, page in enumerate(pdf.pages, 1):
-                        # pdfplumberの高精度テキスト抽出
-                        # extract_text()は自動的にレイアウトを解析し、適切な改行を維持
-                        page_text = page.extract_text()
-                        
-                        if page_text:  # テキストが抽出できた場合
-                            # ページ区切りを追加（後でクレンジングで処理される）
-                            text_content += f"\n--- ページ {i}/{total_pages} ---\n"
-                            text_content += page_text
-                
-                # テキストが抽出できなかった場合
-                if not text_content.strip():
-                    print(f"      ⚠️ PDFからテキストを抽出できませんでした")
-                    return None
-                
-                # 抽出したPDFテキストをクレンジング
-                # RAG検索精度向上のため、ノイズを除去
-                original_length = len(text_content)
-                text_content = clean_pdf_text(text_content, keep_page_markers=False)
-                cleaned_length = len(text_content)
-                
-                print(f"      📄 PDFから {original_length} 文字を抽出")
-                print(f"      🧹 クレンジング後: {cleaned_length} 文字 (削減率: {100*(1-cleaned_length/original_length):.1f}%)")
-                
-                return text_content
-                
-            except Exception as pdf_error:
-                print(f"      ❌ PDF処理エラー: {pdf_error}")
-                # デバッグ情報を追加
-                print(f"         エラータイプ: {type(pdf_error).__name__}")
-                return None
-        
         # PDF以外のファイルの場合、通常のテキストデコード処理
-        else:
-            # ダウンロードしたバイナリデータをテキスト（UTF-8）にデコード
-            try:
-                return file_content_io.getvalue().decode("utf-8")
-            # UTF-8でデコードできない場合は、latin-1でエラーを無視して強制的にデコード
-            except UnicodeDecodeError:
-                return file_content_io.getvalue().decode("latin-1", errors="ignore")
+        # ダウンロードしたバイナリデータをテキスト（UTF-8）にデコード
+        try:
+            return file_content_io.getvalue().decode("utf-8")
+        # UTF-8でデコードできない場合は、latin-1でエラーを無視して強制的にデコード
+        except UnicodeDecodeError:
+            return file_content_io.getvalue().decode("latin-1", errors="ignore")
 
     except Exception as e:
         # エラーの詳細を表示
@@ -387,6 +992,33 @@ def download_file_content(file_id: str, mime_type: str) -> Optional[str]:
         return None
 
 
+def fetch_items_info(item_ids: List[str]) -> Dict[str, Dict]:
+    """
+    複数アイテムのメタデータをバッチリクエストでまとめて取得する。
+    ルートフォルダなど、親フォルダの一覧から情報を得られないアイテムに使用する。
+    取得に失敗したアイテムは結果に含めない（process_item側で個別に取得・エラー記録する）。
+    """
+    service = get_drive_service()
+    items_info = {}
+
+    def _callback(request_id, response, exception):
+        if exception is None:
+            items_info[request_id] = response
+        else:
+            print(f"⚠️  メタデータ取得エラー ({request_id[:15]}...): {exception}")
+
+    # 重複IDはバッチ内でrequest_idが衝突するため除外し、上限件数ごとに分割して送信
+    unique_ids = list(dict.fromkeys(item_ids))
+    for start in range(0, len(unique_ids), BATCH_REQUEST_LIMIT):
+        batch = service.new_batch_http_request(callback=_callback)
+        for item_id in unique_ids[start:start + BATCH_REQUEST_LIMIT]:
+            batch.add(service.files().get(fileId=item_id, fields=FILE_FIELDS), request_id=item_id)
+        _rate_limiter.acquire()
+        batch.execute()
+
+    return items_info
+
+
 def get_file_properties(file_info: Dict) -> Dict:
     """
     Google Drive APIから取得したファイル情報から、主要なプロパティを抽出・整形して返す。
@@ -410,29 +1042,35 @@ def get_file_properties(file_info: Dict) -> Dict:
     return properties
 
 
-def traverse_and_save(item_id: str, parent_titles: List[str], depth: int = 0):
+# 処理待ちアイテム: (アイテムID, 親タイトルのリスト, 階層の深さ, 取得済みのメタデータ)
+WorkItem = Tuple[str, List[str], int, Optional[Dict]]
+
+
+def process_item(item_id: str, parent_titles: List[str], depth: int,
+                 item_info: Optional[Dict], enqueue: Callable[[WorkItem], None]):
     """
-    Driveのアイテム（ファイル/フォルダ）を再帰的に辿り、コンテンツをローカルに保存する中心的な関数。
-    parent_titlesには親フォルダのタイトルがリストとして渡される（Notion版と同じ構造）。
+    アイテム（ファイル/フォルダ）を1件処理する。
+    フォルダの場合は子アイテムをenqueueに渡し、処理待ちに追加する。
     """
     # 1. 訪問済みチェック: 既に処理済みのアイテムはスキップし、無限ループを防ぐ
-    if item_id in visited_page_ids:
-        print(f"{'  ' * depth}⏭️  既訪問: {item_id[:15]}...")
-        return
+    # 並列処理中に同じアイテムを二重に処理しないよう、チェックと登録をロック内で行う
+    with _metadata_lock:
+        if item_id in visited_page_ids:
+            print(f"{'  ' * depth}⏭️  既訪問: {item_id[:15]}...")
+            return
+        visited_page_ids.add(item_id)
 
-    # 2. レート制限対策: APIへの過度なリクエストを防ぐため、短い待機時間を挿入
-    time.sleep(0.1)
+    # 2. レート制限対策: 全スレッド共通のレートリミッターでAPIへの過度なリクエストを防ぐ
+    _rate_limiter.acquire()
 
     try:
-        # 3. アイテムのメタデータをAPIから取得
-        item_info = (
-            drive_service.files()
-            .get(
-                fileId=item_id,
-                fields="id, name, mimeType, webViewLink, createdTime, modifiedTime, owners, size",
+        # 3. アイテムのメタデータをAPIから取得（親フォルダの一覧で取得済みの場合は省略）
+        if item_info is None:
+            item_info = (
+                get_drive_service().files()
+                .get(fileId=item_id, fields=FILE_FIELDS)
+                .execute()
             )
-            .execute()
-        )
 
         # アイテム名とMIMEタイプを取得
         item_name = item_info.get("name", "Untitled")
@@ -445,8 +1083,6 @@ def traverse_and_save(item_id: str, parent_titles: List[str], depth: int = 0):
         # 5. アイテムの種類（フォルダかファイルか）に応じて処理を分岐
         # 【フォルダの場合】
         if item_mime_type == "application/vnd.google-apps.folder":
-            # フォルダ自体を訪問済みとして記録
-            visited_page_ids.add(item_id)
             # 現在のパスタイトルのリストを更新（親タイトル + 現在のフォルダ名）
             current_path_titles = parent_titles + [item_name]
 
@@ -454,41 +1090,69 @@ def traverse_and_save(item_id: str, parent_titles: List[str], depth: int = 0):
             try:
                 query = f"'{item_id}' in parents and trashed=false"
                 # APIを呼び出して子アイテムのリストを取得
-                response = drive_service.files().list(q=query, fields="files(id)").execute()
-
-                # 各子アイテムに対して、この関数自身を再帰的に呼び出す
-                for child_item in response.get("files", []):
-                    traverse_and_save(child_item["id"], current_path_titles, depth + 1)
+                # 子アイテムのメタデータも一覧と同時に取得し、子ごとのfiles().get()を省略する
+                # 1ページに収まらない場合はnextPageTokenで続きを取得する
+                page_token = None
+                while True:
+                    response = get_drive_service().files().list(
+                        q=query,
+                        fields=f"nextPageToken, files({FILE_FIELDS})",
+                        pageSize=LIST_PAGE_SIZE,
+                        pageToken=page_token,
+                    ).execute()
+
+                    # 各子アイテムを処理（並列クロール中はスレッドプールに投入）
+                    for child_item in response.get("files", []):
+                        enqueue((child_item["id"], current_path_titles, depth + 1, child_item))
+
+                    page_token = response.get("nextPageToken")
+                    if not page_token:
+                        break
+                    _rate_limiter.acquire()
             except HttpError as folder_error:
                 # フォルダアクセスエラーの場合、エラーを記録して処理を継続
                 print(f"{'  ' * (depth+1)}⚠️  フォルダアクセスエラー: {folder_error.resp.status if hasattr(folder_error, 'resp') else folder_error}")
-                metadata["error_pages"].append({
-                    "id": item_id,
-                    "error": str(folder_error),
-                    "error_type": "HttpError",
-                    "title": item_name,
-                    "timestamp": datetime.now().isoformat()
-                })
-                save_metadata()
+                with _metadata_lock:
+                    error_entry = {
+                        "id": item_id,
+                        "error": str(folder_error),
+                        "error_type": "HttpError",
+                        "title": item_name,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    metadata["error_pages"].append(error_entry)
+                    append_journal({"error": error_entry})
 
         # 【ファイルの場合】
         elif item_mime_type in MIME_TYPE_MAPPING:
-            # ファイルを訪問済みとして記録
-            visited_page_ids.add(item_id)
+            # 前回保存時からDrive上で更新されていないファイルはダウンロードを省略（差分同期）
+            previous = known_files.get(item_id)
+            if (
+                previous
+                and item_info.get("modifiedTime")
+                and previous[0] == item_info["modifiedTime"]
+                and os.path.exists(previous[1])
+            ):
+                print(f"{'  ' * (depth+1)}⏭️  変更なし: {item_name}")
+                return
 
             # ファイルの内容をテキストとしてダウンロード
-            content = download_file_content(item_id, item_mime_type)
+            # サイズはAPIから文字列で返る（Googleドキュメントなどは値なし）
+            file_size = int(item_info["size"]) if item_info.get("size") else None
+            content = download_file_content(item_id, item_mime_type, file_size)
             # ダウンロードに失敗した場合はエラーとして記録し、スキップ
             if content is None:
                 print(f"{'  ' * (depth+1)}⚠️  ダウンロード失敗: {item_name}")
-                metadata["error_pages"].append({
-                    "id": item_id,
-                    "error": "コンテンツのダウンロードに失敗しました。",
-                    "error_type": "DownloadError",
-                    "title": item_name,
-                    "timestamp": datetime.now().isoformat()
-                })
-                save_metadata()
+                with _metadata_lock:
+                    error_entry = {
+                        "id": item_id,
+                        "error": "コンテンツのダウンロードに失敗しました。",
+                        "error_type": "DownloadError",
+                        "title": item_name,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    metadata["error_pages"].append(error_entry)
+                    append_journal({"error": error_entry})
                 return  # このファイルの処理をスキップ
 
             # ファイルのプロパティ情報を整形して取得
@@ -505,23 +1169,28 @@ def traverse_and_save(item_id: str, parent_titles: List[str], depth: int = 0):
             filepath = os.path.join(SAVE_DIR, filename)
 
             # ファイルにコンテンツを書き込む（UTF-8エンコーディング）
-            with open(filepath, "w", encoding="utf-8") as f:
+            # 大きめのバッファで、エンコード済みの内容をまとめて書き出す
+            with open(filepath, "w", encoding="utf-8", buffering=FILE_WRITE_BUFFER_SIZE) as f:
                 f.write(content)
             print(f"{'  ' * (depth+1)}✅ 保存完了: {filename}")
 
             # メタデータ辞書にこのファイルの情報を追加（Notion版と同じ構造）
-            metadata["pages"][item_id] = {
-                "title": item_name,  # "name"から"title"に変更
-                "type": "file",
-                "path": filepath,
-                "parent_titles": parent_titles,  # 親タイトルのリストを追加
-                "properties": properties,
-                "child_pages": []  # 子ページリスト（ファイルなので空）
-            }
-            # 総ページ数をインクリメント
-            metadata["total_pages"] += 1
-            # 変更を即座に`metadata.json`に保存
-            save_metadata()
+            with _metadata_lock:
+                is_new_page = item_id not in metadata["pages"] and item_id not in known_files
+                metadata["pages"][item_id] = {
+                    "title": item_name,  # "name"から"title"に変更
+                    "type": "file",
+                    "path": filepath,
+                    "parent_titles": parent_titles,  # 親タイトルのリストを追加
+                    "properties": properties,
+                    "child_pages": []  # 子ページリスト（ファイルなので空）
+                }
+                # 総ページ数をインクリメント（更新されたファイルの再保存は数えない）
+                if is_new_page:
+                    metadata["total_pages"] += 1
+                # 変更を即座にジャーナル（metadata.jsonl）へ追記
+                append_journal({"id": item_id, "record": metadata["pages"][item_id]})
+                append_sync_index(item_id, properties["modified_time"], filepath)
 
         # 【未対応のファイル形式の場合】
         else:
@@ -551,14 +1220,46 @@ def traverse_and_save(item_id: str, parent_titles: List[str], depth: int = 0):
             print(f"{'  ' * (depth+1)}  発生箇所: {last_error_line[0].strip()}")
         
         # エラー情報をメタデータに追加
-        metadata["error_pages"].append({
-            "id": item_id,
-            "error": error_details,
-            "error_type": error_type,
-            "title": locals().get('item_name', 'Unknown'),
-            "timestamp": datetime.now().isoformat()
-        })
-        save_metadata()
+        with _metadata_lock:
+            error_entry = {
+                "id": item_id,
+                "error": error_details,
+                "error_type": error_type,
+                "title": locals().get('item_name', 'Unknown'),
+                "timestamp": datetime.now().isoformat()
+            }
+            metadata["error_pages"].append(error_entry)
+            append_journal({"error": error_entry})
+
+
+def _schedule(work_item: WorkItem):
+    """
+    アイテムの処理をスレッドプールに投入する。
+    処理中に見つかった子アイテムも同じくスレッドプールに投入される。
+    """
+    future = _executor.submit(process_item, *work_item, enqueue=_schedule)
+    with _metadata_lock:
+        _pending_futures.add(future)
+    future.add_done_callback(_discard_future)
+
+
+def _discard_future(future):
+    """完了したタスクを待機対象から外す"""
+    with _metadata_lock:
+        _pending_futures.discard(future)
+
+
+def _wait_for_pending():
+    """
+    投入済みのタスクがすべて完了するまで待機する。
+    子アイテムは親の処理中に投入されるため、待機対象が空になった時点で全件完了となる。
+    """
+    while True:
+        with _metadata_lock:
+            pending = set(_pending_futures)
+        if not pending:
+            return
+        wait(pending)
 
 
 def main():
@@ -566,30 +1267,23 @@ def main():
     メイン実行関数。
     全体の処理フローを制御する。
     """
+    global _executor
+
     # 処理開始のヘッダーを表示
     print("\n" + "=" * 60)
     print("🚀 Google Drive クローラー開始")
     print("=" * 60)
     
-    # .envファイルから処理対象のルートフォルダID（カンマ区切り）を取得
-    root_folder_ids_str = ','.join(config.google_drive_folder_ids) if config.google_drive_folder_ids else ""
-    # 文字列をカンマで分割し、リストに変換
-    root_folder_ids = [
-        id.strip() for id in root_folder_ids_str.split(",") if id.strip()
-    ]
+    # .envファイルから取得した処理対象のルートフォルダID（起動時に読み込み済み）
+    root_folder_ids = list(ROOT_FOLDER_IDS)
 
     # 1. 環境変数チェック
-    creds_path = config.google_drive_credentials_path
+    creds_path = CREDENTIALS_PATH
     if not creds_path:
         print("❌ エラー: GOOGLE_DRIVE_CREDENTIALS_PATHが設定されていません")
         print("   対処: .envファイルに追加してください")
         return
     
-    # 相対パスの場合、プロジェクトルートからの相対パスとして解決
-    if not os.path.isabs(creds_path):
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        creds_path = os.path.join(project_root, creds_path.lstrip('./'))
-    
     if not os.path.exists(creds_path):
         print(f"❌ エラー: 認証ファイルが見つかりません: {creds_path}")
         return
@@ -622,14 +1316,22 @@ def main():
 
     # 処理時間の計測を開始
     start_time = time.time()
-    # メタデータにクロール開始日時を記録し、初回保存
+    # メタデータにクロール開始日時を記録（metadata.jsonへは統合時に保存）
     metadata["crawl_date"] = datetime.now().isoformat()
-    save_metadata()
 
     # 5. 各ルートフォルダから処理を開始
-    for folder_id in root_folder_ids:
-        # 空のリストを親タイトルとして開始（ルートレベル）
-        traverse_and_save(folder_id, [], 0)
+    # 兄弟アイテムはスレッドプールで並列に処理する（件数はMAX_WORKERSで制限）
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        _executor = executor
+        try:
+            # ルートフォルダのメタデータはバッチリクエストでまとめて取得
+            root_items_info = fetch_items_info(root_folder_ids)
+            for folder_id in root_folder_ids:
+                # 空のリストを親タイトルとして開始（ルートレベル）
+                _schedule((folder_id, [], 0, root_items_info.get(folder_id)))
+            _wait_for_pending()
+        finally:
+            _executor = None
 
     # 処理時間の計測を終了
     elapsed_time = time.time() - start_time
@@ -637,7 +1339,8 @@ def main():
     # 6. 最終統計をメタデータに更新して保存
     metadata["crawl_completed"] = datetime.now().isoformat()
     metadata["total_time_seconds"] = elapsed_time
-    save_metadata()
+    compact_metadata()
+    shutdown_pdf_executor()
 
     # 7. 最終結果のサマリーを表示
     print("-" * 60)
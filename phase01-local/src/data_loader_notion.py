@@ -6,7 +6,7 @@ Markdown形式でローカルに保存する。
 
 【主な機能】
 1. 指定したルートページから開始して、リンクされている全ページを自動探索
-2. ページ、データベース、子ページを再帰的に取得
+2. ページ、データベース、子ページを非同期に並行取得（レート制限の範囲内で複数ページを同時に処理）
 3. Notion APIから取得したコンテンツをMarkdown形式に変換
 4. 処理済みページの記録により、中断後の再開が可能
 5. エラー処理とレート制限対策を実装
@@ -16,11 +16,26 @@ import os
 import re
 import json
 import time
+import random
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import unicodedata  # Unicode正規化用（テキストクレンジングに使用）
-from typing import List, Dict, Set, Optional, Tuple
+from typing import Callable, List, Dict, Set, Optional, Tuple
 from dotenv import load_dotenv
+import httpx  # notion_clientが内部で使用するHTTPクライアント（通信エラーの判定に使用）
 import notion_client  # Notion公式APIクライアント（v2.4.0）
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
 from datetime import datetime
+from pipeline_http import new_async_client  # パイプライン共通のHTTPクライアント
+
+# 高速JSONライブラリ（オプション）- 未インストールの場合は標準のjsonを使用
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # 新しい設定管理システムを使用
 # import sys
@@ -31,6 +46,32 @@ from datetime import datetime
 # Notionテキストクレンジング関数（RAG検索精度向上用）
 # ========================================
 
+# クレンジングで使用する正規表現（ページごとに呼ばれるため事前にコンパイル）
+# HTMLタグ・埋め込み・Notion固有の記法（グループ1は簡略化する埋め込みリンクのアイコン）
+_RE_NOTION_MARKUP = re.compile(
+    r'\[(📹|📎|📄)[^\]]+\]\([^\)]+\)'  # 動画・ファイル・PDFリンク（簡略化）
+    r'|<[^>]+>'  # HTMLタグ（<u>、<details>、<summary>など）
+    r'|!\[[^\]]*\]\([^\)]+\)'  # ![alt](url) 形式の画像
+    r'|notion://[^\s\)]+'  # notion://xxxxx 形式の内部リンク
+    r'|\[[🔖🌐][^\]]+\]\([^\)]+\)'  # ブックマーク・埋め込み
+    r'|\[\[TOC\]\]'  # [[TOC]] 目次記法
+)
+# 埋め込みリンクのアイコンと置換後の文字列の対応
+_NOTION_LINK_LABELS = {'📹': '[動画]', '📎': '[ファイル]', '📄': '[PDF]'}
+_RE_BOLD3 = re.compile(r'\*{3,}')  # 3つ以上の連続アスタリスク
+_RE_STRIKE3 = re.compile(r'~{3,}')  # 3つ以上の連続チルダ
+_RE_CODE_LANG = re.compile(r'```[a-zA-Z]+\n')  # コードブロックの言語指定
+_RE_NL3 = re.compile(r'\n{3,}')  # 3つ以上の連続改行
+_RE_SP2 = re.compile(r' {2,}')  # 2つ以上の連続スペース
+_RE_DIVIDER = re.compile(r'^(?:-{3,}|={3,})$', re.MULTILINE)  # 区切り線
+
+
+def _replace_notion_markup(match: re.Match) -> str:
+    """_RE_NOTION_MARKUPの置換内容を返す（埋め込みリンクは簡略表記、それ以外は除去）"""
+    icon = match.group(1)
+    return _NOTION_LINK_LABELS[icon] if icon else ''
+
+
 def clean_notion_text(text: str) -> str:
     """
     Notionから取得したテキストをクレンジングして検索精度を向上させる
@@ -52,36 +93,14 @@ def clean_notion_text(text: str) -> str:
     
     Returns:
         クレンジング済みのテキスト
-    """
-    # ステップ1: HTMLタグの除去
-    # <u>下線</u>、<details>、<summary>などのHTMLタグを除去
-    text = re.sub(r'<[^>]+>', '', text)
-    
-    # ステップ2: 画像・動画・ファイル埋め込みの除去または簡略化
-    # ![alt](url) 形式の画像を除去（検索ノイズになるため）
-    text = re.sub(r'!\[[^\]]*\]\([^\)]+\)', '', text)
-    
-    # [📹 Video: ...](url) 形式の動画リンクを簡略化
-    text = re.sub(r'\[📹[^\]]+\]\([^\)]+\)', '[動画]', text)
-    
-    # [📎 File: ...](url) 形式のファイルリンクを簡略化
-    text = re.sub(r'\[📎[^\]]+\]\([^\)]+\)', '[ファイル]', text)
     
-    # [📄 PDF: ...](url) 形式のPDFリンクを簡略化
-    text = re.sub(r'\[📄[^\]]+\]\([^\)]+\)', '[PDF]', text)
-    
-    # ステップ3: Notion固有の記法の除去
-    # notion://xxxxx 形式の内部リンクを除去
-    text = re.sub(r'notion://[^\s\)]+', '', text)
-    
-    # [🔖 ...](url) 形式のブックマークを簡略化
-    text = re.sub(r'\[🔖[^\]]+\]\([^\)]+\)', '', text)
-    
-    # [🌐 Embed: ...](url) 形式の埋め込みを除去
-    text = re.sub(r'\[🌐[^\]]+\]\([^\)]+\)', '', text)
-    
-    # [[TOC]] 目次記法を除去
-    text = re.sub(r'\[\[TOC\]\]', '', text)
+    ページ全体のテキストは大きくなりうるため、ステップ5以降は対象の文字列が
+    含まれる場合にだけ正規表現を適用し、不要な走査とコピーを省く。
+    """
+    # ステップ1〜3: HTMLタグ・埋め込み・Notion固有の記法の除去または簡略化
+    # <u>下線</u>等のHTMLタグ、画像、動画・ファイル・PDFリンク、notion://内部リンク、
+    # ブックマーク、埋め込み、[[TOC]]を1つの正規表現でまとめて1回の走査で処理する
+    text = _RE_NOTION_MARKUP.sub(_replace_notion_markup, text)
     
     # ステップ4: 絵文字アイコンの正規化（必要に応じて除去）
     # 🗄️、📊、📄などのアイコンを除去（オプション）
@@ -89,31 +108,37 @@ def clean_notion_text(text: str) -> str:
     
     # ステップ5: Markdownの装飾記号の簡略化
     # 過剰な装飾（太字、斜体の組み合わせなど）を簡略化
-    text = re.sub(r'\*{3,}', '**', text)  # ***を**に
-    text = re.sub(r'~{3,}', '~~', text)    # ~~~を~~に
+    if '***' in text:
+        text = _RE_BOLD3.sub('**', text)  # ***を**に
+    if '~~~' in text:
+        text = _RE_STRIKE3.sub('~~', text)    # ~~~を~~に
     
     # ステップ6: コードブロックの言語指定を除去（検索時のノイズ削減）
     # ```python → ```
-    text = re.sub(r'```[a-zA-Z]+\n', '```\n', text)
+    if '```' in text:
+        text = _RE_CODE_LANG.sub('```\n', text)
     
     # ステップ7: 連続する空白・改行の正規化
     # 3つ以上の連続改行を2つの改行に統一
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    if '\n\n\n' in text:
+        text = _RE_NL3.sub('\n\n', text)
     
     # 行内の連続スペースを1つに統一
-    text = re.sub(r' {2,}', ' ', text)
+    if '  ' in text:
+        text = _RE_SP2.sub(' ', text)
     
     # 全角スペースを半角スペースに統一
     text = text.replace('　', ' ')
     
     # ステップ8: 区切り線の正規化
-    # 様々な形式の区切り線を統一
-    text = re.sub(r'^-{3,}$', '---', text, flags=re.MULTILINE)
-    text = re.sub(r'^={3,}$', '---', text, flags=re.MULTILINE)
+    # 様々な形式の区切り線（---- や === など）を統一
+    if '---' in text or '===' in text:
+        text = _RE_DIVIDER.sub('---', text)
     
     # ステップ9: Unicode正規化（NFKC形式）
     # 半角カナを全角に、機種依存文字を標準文字に変換
-    text = unicodedata.normalize('NFKC', text)
+    if not unicodedata.is_normalized('NFKC', text):
+        text = unicodedata.normalize('NFKC', text)
     
     # ステップ10: 前後の空白を除去
     text = text.strip()
@@ -130,60 +155,271 @@ load_dotenv()
 # Notion APIクライアントを初期化
 # NOTION_TOKEN: Notion Integration Tokenで、Notion APIへのアクセス権限を持つ
 NOTION_TOKEN = None
-notion = None  # main()関数内で初期化
+notion = None  # main()関数内で初期化（notion_client.AsyncClient）
+
+# 並行クロールの設定
+# Notion APIのレート制限は平均3リクエスト/秒（短時間のバーストは許容される）
+MAX_WORKERS = 5  # 同時に処理するページ数の上限
+NOTION_REQUESTS_PER_SECOND = 2.5  # APIへのリクエスト数の上限（全ワーカー合計、制限より少し低めに設定）
+NOTION_REQUEST_BURST = 5  # 連続して送信できるリクエスト数
+
+# 一時的なエラー（レート制限超過・サーバーエラー・タイムアウト）時の再試行設定
+# 待機時間は指数的に延ばし（1, 2, 4, ...秒、上限30秒）、ワーカー間で再試行が重ならないよう揺らぎを加える
+API_MAX_ATTEMPTS = 5  # 1回のAPI呼び出しあたりの最大試行回数
+API_RETRY_BASE_DELAY = 1.0  # 初回の再試行までの待機秒数
+API_RETRY_MAX_DELAY = 30.0  # 待機秒数の上限
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# レート制限と同時リクエスト数の制御（イベントループ内で生成するためcrawl開始時に初期化）
+_rate_limiter = None
+_api_semaphore: Optional[asyncio.Semaphore] = None
+
+# テキストのクレンジングとファイル書き込みを行うスレッドプール（crawl開始時に生成）
+# イベントループを止めずに、他のページのAPI通信と並行して実行する
+WRITE_WORKERS = 4
+_write_executor: Optional[ThreadPoolExecutor] = None
 
 # ファイル保存に関する設定
 SAVE_DIR = "./data/documents/notion/"  # Markdownファイルの保存先ディレクトリ
+FILE_WRITE_BUFFER_SIZE = 64 * 1024  # ファイル書き込み時のバッファサイズ（64KB）
 METADATA_FILE = os.path.join(SAVE_DIR, "metadata.json")  # 処理状況を記録するメタデータファイル
+# ページごとの処理結果を1行ずつ追記するジャーナル（NDJSON形式）
+# metadata.json全体の書き直しはJOURNAL_COMPACT_INTERVAL件ごとと終了時のみ行う
+METADATA_JOURNAL_FILE = os.path.join(SAVE_DIR, "metadata.jsonl")
+JOURNAL_COMPACT_INTERVAL = 50  # この件数を追記するごとにmetadata.jsonへ統合
+
+# ジャーナルのファイルハンドルと、前回の統合以降に追記した件数
+_journal_file = None
+_journal_count = 0
 
 # 訪問済みページIDを記録するセット
 # 同じページを重複して処理しないよう、また循環参照による無限ループを防ぐために使用
-visited_page_ids = set()
+# ページIDはUUIDのため、36文字の文字列ではなく16バイトのキー（_page_key）で保持してメモリを節約する
+visited_page_ids: Set[bytes] = set()
 
 # メタデータを保存する辞書
 # クロール処理の状況、処理済みページ情報、エラー情報などを記録
 metadata = {
-    "crawl_date": datetime.now().isoformat(),  # クロール開始日時
+    "crawl_date": None,  # クロール開始日時（main()で新規クロールの開始時に設定）
     "pages": {},  # 処理済みページの詳細情報
     "total_pages": 0,  # 処理済みページの総数
     "error_pages": [],  # エラーが発生したページの情報
 }
 
 
+class _RateLimiter:
+    """
+    トークンバケット方式のレート制限。
+    全ワーカーで共有し、APIへのリクエスト数を一定以下に保つ。
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """トークンを1つ取得する（取得できるまで待機）"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """
+    再試行までの待機秒数を返す
+    429（レート制限超過）でRetry-Afterヘッダーがある場合はその秒数に従う。
+    """
+    if isinstance(error, HTTPResponseError) and error.status == 429:
+        retry_after = error.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), API_RETRY_MAX_DELAY)
+            except ValueError:
+                pass  # 日時形式などの場合は指数バックオフにフォールバック
+    delay = min(API_RETRY_BASE_DELAY * (2 ** attempt), API_RETRY_MAX_DELAY)
+    return delay + random.uniform(0, delay / 2)
+
+
+async def call_api(method: Callable, **kwargs) -> Dict:
+    """
+    Notion APIを呼び出す（レート制限と同時リクエスト数の制御付き）
+    一時的なエラー（429・5xx・タイムアウト・通信エラー）は待機してから再試行し、
+    API_MAX_ATTEMPTS回失敗した場合や、それ以外のエラーはそのまま送出する。
+
+    Args:
+        method: notion_client.AsyncClientのメソッド（notion.pages.retrieveなど）
+        **kwargs: メソッドに渡す引数
+    """
+    for attempt in range(API_MAX_ATTEMPTS):
+        try:
+            async with _api_semaphore:
+                await _rate_limiter.acquire()
+                return await method(**kwargs)
+        except (HTTPResponseError, RequestTimeoutError, httpx.TransportError) as e:
+            # 429・5xx以外（データベースIDをページとして取得した場合の400/404など）は再試行しない
+            if isinstance(e, HTTPResponseError) and e.status not in RETRYABLE_STATUS_CODES:
+                raise
+            if attempt == API_MAX_ATTEMPTS - 1:
+                raise
+            # 待機中は同時リクエスト数の枠を解放し、他のワーカーの処理を止めない
+            delay = _retry_delay(e, attempt)
+            print(f"    🔁 APIエラー ({type(e).__name__}: {e})、{delay:.1f}秒後に再試行 ({attempt + 1}/{API_MAX_ATTEMPTS - 1})")
+            await asyncio.sleep(delay)
+
+
+async def paginate_batches(method: Callable, **kwargs):
+    """
+    ページネーションされたAPIの結果を、1回のレスポンス（最大100件）ごとにリストで返す非同期ジェネレーター
+    next_cursorを使って、has_moreがFalseになるまで順に取得する。
+    """
+    start_cursor = None  # ページネーション用のカーソル
+    while True:
+        if start_cursor:
+            # 2回目以降のリクエスト: カーソルを指定
+            response = await call_api(method, start_cursor=start_cursor, **kwargs)
+        else:
+            # 初回のリクエスト: カーソルなし
+            response = await call_api(method, **kwargs)
+        yield response.get("results", [])
+
+        # 次ページの有無を確認し、次ページ用のカーソルを取得
+        start_cursor = response.get("next_cursor")
+        if not response.get("has_more", False) or not start_cursor:
+            return
+
+
+async def paginate(method: Callable, **kwargs):
+    """ページネーションされたAPIの結果を1件ずつ返す非同期ジェネレーター"""
+    async for results in paginate_batches(method, **kwargs):
+        for item in results:
+            yield item
+
+
+def canonicalize_page_id(page_id: str) -> str:
+    """
+    ページIDを正規化する（ハイフンを除去して小文字に統一）
+    Notion APIはハイフン付き・なしの両方の形式でIDを返すため、重複判定の前に揃える。
+    """
+    return page_id.replace("-", "").lower()
+
+
+def _page_key(page_id: str) -> bytes:
+    """ページIDを訪問済みセット用の16バイトのキーに変換する（UUID形式でない場合はそのままバイト列化）"""
+    page_id = canonicalize_page_id(page_id)
+    try:
+        return bytes.fromhex(page_id)
+    except ValueError:
+        return page_id.encode()
+
+
+def _json_dumps(obj, pretty: bool = False) -> bytes:
+    """
+    メタデータをUTF-8のJSONバイト列に変換する（orjsonがあれば使用）。
+    prettyがTrueの場合はインデント付きで出力する。
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None).encode("utf-8")
+
+
+# JSONの読み込み（orjson.JSONDecodeErrorはjson.JSONDecodeErrorのサブクラス）
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
 def load_existing_metadata():
     """既存のメタデータを読み込む（再開可能にするため）"""
     # グローバル変数を変更するためglobal宣言
     global metadata, visited_page_ids
+    loaded = False
 
     # metadata.jsonファイルが存在するかチェック
     if os.path.exists(METADATA_FILE):
         try:
-            # JSONファイルを読み込みモードでオープン
-            with open(METADATA_FILE, "r", encoding="utf-8") as f:
+            # JSONファイルをバイナリモードでオープン（デコードはJSONパーサーに任せる）
+            with open(METADATA_FILE, "rb") as f:
                 # JSONデータをPythonの辞書として読み込み
-                existing_data = json.load(f)
+                existing_data = _json_loads(f.read())
                 
+                # クロール開始日時を復元（再開時も最初のクロールの開始日時を保持する）
+                metadata["crawl_date"] = existing_data.get("crawl_date")
                 # 既存のpagesデータをメタデータにコピー（空の辞書がデフォルト）
                 metadata["pages"] = existing_data.get("pages", {})
                 # 処理済みページ数を復元（0がデフォルト）
                 metadata["total_pages"] = existing_data.get("total_pages", 0)
                 # エラーページのリストを復元（空リストがデフォルト）
                 metadata["error_pages"] = existing_data.get("error_pages", [])
-                
-                # 重要：pagesデータのキー（ページID）をsetに変換してvisited_page_idsに格納
-                # これにより、既に処理したページを再処理しないようにする
-                visited_page_ids = set(metadata["pages"].keys())
-                print(f"📂 既存データ読み込み: {len(visited_page_ids)}ページ処理済み")
-                return True  # 読み込み成功
+                loaded = True
         except Exception as e:
             # JSON読み込みエラー時の処理
             print(f"⚠️  既存メタデータ読み込みエラー: {e}")
-    return False  # ファイルが存在しないか読み込み失敗
+
+    # 前回の実行が途中で中断された場合、ジャーナルに残った差分を反映する
+    replayed = replay_journal()
+
+    if not (loaded or replayed):
+        return False  # ファイルが存在しないか読み込み失敗
+
+    # 重要：pagesデータのキー（ページID）をsetに変換してvisited_page_idsに格納
+    # これにより、既に処理したページを再処理しないようにする
+    visited_page_ids = {_page_key(pid) for pid in metadata["pages"]}
+    print(f"📂 既存データ読み込み: {len(visited_page_ids)}ページ処理済み")
+    if replayed:
+        print(f"📜 ジャーナルから {replayed} 件を復元")
+        compact_metadata()
+    return True  # 読み込み成功
+
+
+def replay_journal() -> int:
+    """
+    ジャーナル（metadata.jsonl）の内容をメタデータに反映する。
+    反映したレコード数を返す。
+    """
+    if not os.path.exists(METADATA_JOURNAL_FILE):
+        return 0
+
+    count = 0
+    try:
+        with open(METADATA_JOURNAL_FILE, "rb") as f:
+            for line in f:
+                try:
+                    entry = _json_loads(line)
+                except json.JSONDecodeError:
+                    continue  # 中断時に書きかけだった行は無視する
+
+                if "error" in entry:
+                    metadata["error_pages"].append(entry["error"])
+                else:
+                    # 処理済みページ数はページのみを数える（データベースは含めない）
+                    if entry["record"].get("type") == "page" and entry["id"] not in metadata["pages"]:
+                        metadata["total_pages"] += 1
+                    metadata["pages"][entry["id"]] = entry["record"]
+                count += 1
+    except Exception as e:
+        print(f"⚠️  ジャーナル読み込みエラー: {e}")
+    return count
+
+
+# ファイル名の整形で使用する変換テーブルと正規表現（ページごとに呼ばれるため事前に作成）
+_UNSAFE_FILENAME_TABLE = str.maketrans({c: "_" for c in '\\/*?:"<>|\n\r\t'})  # OSで使用できない文字
+_RE_MULTI_UNDERSCORE = re.compile(r"_{2,}")  # 連続したアンダースコア
 
 
 def sanitize_filename(name: str, max_length: int = 200) -> str:
     """ファイル名として使えない文字を置換し、長さを制限する"""
-    # 正規表現でOSで使用できない文字をアンダースコアに置換
+    # OSで使用できない文字をアンダースコアに置換
+    # 1文字単位の置換のため、正規表現ではなく変換テーブルで1回の走査で処理
     # \\ : バックスラッシュ（Windowsのパス区切り文字）
     # /   : スラッシュ（Unix系のパス区切り文字）
     # *   : ワイルドカード
@@ -193,11 +429,11 @@ def sanitize_filename(name: str, max_length: int = 200) -> str:
     # <>  : リダイレクト文字
     # |   : パイプ
     # \n\r\t : 改行、キャリッジリターン、タブ
-    name = re.sub(r'[\\/*?:"<>|\n\r\t]', "_", name)
+    name = name.translate(_UNSAFE_FILENAME_TABLE)
     
     # 連続したアンダースコアを単一のアンダースコアに置換
     # 例: "test___file" → "test_file"
-    name = re.sub(r"_+", "_", name)
+    name = _RE_MULTI_UNDERSCORE.sub("_", name)
     
     # 先頭と末尾のスペース、タブ、改行などを削除
     name = name.strip()
@@ -212,6 +448,33 @@ def sanitize_filename(name: str, max_length: int = 200) -> str:
     return name if name else "Untitled"
 
 
+@functools.lru_cache(maxsize=4096)
+def _format_rich_text(text: str, href: Optional[str], bold: bool, italic: bool,
+                      strikethrough: bool, underline: bool, code: bool) -> str:
+    """
+    リッチテキストの1要素をマークダウン形式に変換する
+    同じ文字列・装飾の組み合わせはページ内やページ間で繰り返し現れるため、結果をキャッシュする
+    """
+    # hrefフィールドがある場合はMarkdownのリンク形式に変換
+    # [表示テキスト](URL)の形式
+    if href:
+        text = f"[{text}]({href})"
+
+    # トリッキーな部分：装飾の適用順序が重要
+    # リンクを先に処理し、その後に装飾を適用する
+    if bold:
+        text = f"**{text}**"  # Markdownの太字
+    if italic:
+        text = f"*{text}*"  # Markdownの斜体
+    if strikethrough:
+        text = f"~~{text}~~"  # Markdownの取り消し線
+    if underline:
+        text = f"<u>{text}</u>"  # Markdownには下線がないのでHTML
+    if code:
+        text = f"`{text}`"  # インラインコード
+    return text
+
+
 def extract_text_from_rich_text(rich_text_array: List[Dict]) -> str:
     """リッチテキスト配列からテキストを抽出し、マークダウン形式で返す"""
     # 配列が空またはNoneの場合は空文字列を返す
@@ -219,53 +482,216 @@ def extract_text_from_rich_text(rich_text_array: List[Dict]) -> str:
         return ""
 
     # 変換結果を格納するリスト
-    result = []
+    parts = []
     
     # リッチテキスト配列の各要素を処理
     for rt in rich_text_array:
-        # plain_textフィールドからプレーンテキストを取得（なければ空文字列）
-        text = rt.get("plain_text", "")
+        # plain_textフィールドからプレーンテキストを取得
+        text = rt.get("plain_text")
         
         # テキストが空の場合は次の要素へスキップ
         if not text:
             continue
 
         # annotationsフィールドから装飾情報を取得（なければ空の辞書）
-        annotations = rt.get("annotations", {})
+        annotations = rt.get("annotations") or {}
+        parts.append(_format_rich_text(
+            text,
+            rt.get("href"),
+            bool(annotations.get("bold")),
+            bool(annotations.get("italic")),
+            bool(annotations.get("strikethrough")),
+            bool(annotations.get("underline")),
+            bool(annotations.get("code")),
+        ))
 
-        # hrefフィールドがある場合はMarkdownのリンク形式に変換
-        # [表示テキスト](URL)の形式
-        if rt.get("href"):
-            text = f"[{text}]({rt['href']})"
+    # リストの全要素を連結して1つの文字列として返す
+    return "".join(parts)
 
-        # トリッキーな部分：装飾の適用順序が重要
-        # リンクを先に処理し、その後に装飾を適用する
-        
-        # bold=Trueの場合、**で囲む（Markdownの太字）
-        if annotations.get("bold"):
-            text = f"**{text}**"
-        
-        # italic=Trueの場合、*で囲む（Markdownの斜体）
-        if annotations.get("italic"):
-            text = f"*{text}*"
-        
-        # strikethrough=Trueの場合、~~で囲む（Markdownの取り消し線）
-        if annotations.get("strikethrough"):
-            text = f"~~{text}~~"
-        
-        # underline=Trueの場合、<u>タグで囲む（Markdownには下線がないのでHTML）
-        if annotations.get("underline"):
-            text = f"<u>{text}</u>"
-        
-        # code=Trueの場合、`で囲む（インラインコード）
-        if annotations.get("code"):
-            text = f"`{text}`"
 
-        # 変換後のテキストを結果リストに追加
-        result.append(text)
+# ========================================
+# ブロックタイプ別のMarkdown変換関数
+# ========================================
 
-    # リストの全要素を連結して1つの文字列として返す
-    return "".join(result)
+# rich_textを持たないブロック用の空のシーケンス（ブロックごとに空リストを生成しないよう共有）
+_EMPTY_RICH_TEXT = ()
+# 各関数は (ブロック, ブロックタイプ別のコンテンツ, インデント, リッチテキストの変換結果) を受け取り、
+# (Markdown文字列, 子ページIDのリスト) を返す。
+# Noneを返した場合は、convert_block_to_markdownでメンションの検出に進む。
+
+
+def _md_heading_1(block: Dict, content: Dict, indent: str, text_content: str):
+    return f"{indent}# {text_content}\n\n", []
+
+
+def _md_heading_2(block: Dict, content: Dict, indent: str, text_content: str):
+    return f"{indent}## {text_content}\n\n", []
+
+
+def _md_heading_3(block: Dict, content: Dict, indent: str, text_content: str):
+    return f"{indent}### {text_content}\n\n", []
+
+
+def _md_paragraph(block: Dict, content: Dict, indent: str, text_content: str):
+    return f"{indent}{text_content}\n\n" if text_content else "", []
+
+
+def _md_bulleted_list_item(block: Dict, content: Dict, indent: str, text_content: str):
+    return f"{indent}* {text_content}\n", []
+
+
+def _md_numbered_list_item(block: Dict, content: Dict, indent: str, text_content: str):
+    return f"{indent}1. {text_content}\n", []
+
+
+def _md_to_do(block: Dict, content: Dict, indent: str, text_content: str):
+    checked = "x" if content.get("checked", False) else " "
+    return f"{indent}- [{checked}] {text_content}\n", []
+
+
+def _md_toggle(block: Dict, content: Dict, indent: str, text_content: str):
+    return f"{indent}<details>\n{indent}<summary>{text_content}</summary>\n\n", []
+
+
+def _md_code(block: Dict, content: Dict, indent: str, text_content: str):
+    # コード本文はrich_textの変換結果（text_content）をそのまま使う
+    language = content.get("language", "")
+    return f"{indent}```{language}\n{text_content}\n{indent}```\n\n", []
+
+
+def _md_quote(block: Dict, content: Dict, indent: str, text_content: str):
+    return f"{indent}> {text_content}\n\n", []
+
+
+def _md_callout(block: Dict, content: Dict, indent: str, text_content: str):
+    emoji = content.get("icon", {}).get("emoji", "💡") if content.get("icon") else "💡"
+    return f"{indent}> {emoji} {text_content}\n\n", []
+
+
+def _md_divider(block: Dict, content: Dict, indent: str, text_content: str):
+    return f"{indent}---\n\n", []
+
+
+def _media_url(content: Dict) -> str:
+    """メディアブロック（画像・動画・ファイル・PDF）のURLを取得する（外部URLまたはNotionにアップロードされたファイル）"""
+    media_type = content.get("type")
+    if media_type == "external":
+        return content.get("external", {}).get("url", "")
+    if media_type == "file":
+        return content.get("file", {}).get("url", "")
+    return ""
+
+
+def _md_image(block: Dict, content: Dict, indent: str, text_content: str):
+    caption = extract_text_from_rich_text(content.get("caption", []))
+    return f"{indent}![{caption}]({_media_url(content)})\n\n", []
+
+
+# 動画・ファイル・PDFブロックの表示ラベルと、キャプションがない場合の表示名
+_MEDIA_LABELS = {
+    "video": ("📹 Video", "Video"),
+    "file": ("📎 File", "File"),
+    "pdf": ("📄 PDF", "PDF"),
+}
+
+
+def _md_media(block: Dict, content: Dict, indent: str, text_content: str):
+    label, default_caption = _MEDIA_LABELS[block["type"]]
+    caption = extract_text_from_rich_text(content.get("caption", []))
+    return f"{indent}[{label}: {caption or default_caption}]({_media_url(content)})\n\n", []
+
+
+def _md_bookmark(block: Dict, content: Dict, indent: str, text_content: str):
+    url = content.get("url", "")
+    caption = extract_text_from_rich_text(content.get("caption", []))
+    return f"{indent}[🔖 {caption or url}]({url})\n\n", []
+
+
+def _md_equation(block: Dict, content: Dict, indent: str, text_content: str):
+    expression = content.get("expression", "")
+    return f"{indent}$$\n{expression}\n$$\n\n", []
+
+
+def _md_table_of_contents(block: Dict, content: Dict, indent: str, text_content: str):
+    return f"{indent}[[TOC]]\n\n", []
+
+
+def _md_link_to_page(block: Dict, content: Dict, indent: str, text_content: str):
+    page_id = content.get("page_id", "")
+    if page_id:
+        return f"{indent}[📄 Page Link](notion://{page_id})\n\n", [canonicalize_page_id(page_id)]
+    return None
+
+
+def _md_child_page(block: Dict, content: Dict, indent: str, text_content: str):
+    page_id = block.get("id", "")
+    title = content.get("title", "Untitled")
+    if page_id:
+        return f"{indent}[📄 {title}](notion://{page_id})\n\n", [canonicalize_page_id(page_id)]
+    return None
+
+
+def _md_child_database(block: Dict, content: Dict, indent: str, text_content: str):
+    db_id = block.get("id", "")
+    title = content.get("title", "Database")
+    if db_id:
+        return f"{indent}[🗄️ {title}](notion://{db_id})\n\n", [canonicalize_page_id(db_id)]
+    return None
+
+
+def _md_embed(block: Dict, content: Dict, indent: str, text_content: str):
+    url = content.get("url", "")
+    caption = extract_text_from_rich_text(content.get("caption", []))
+    return f"{indent}[🌐 Embed: {caption or url}]({url})\n\n", []
+
+
+def _md_table(block: Dict, content: Dict, indent: str, text_content: str):
+    # テーブルの処理（簡易版）
+    return f"{indent}[Table - Please view in Notion]\n\n", []
+
+
+def _md_layout(block: Dict, content: Dict, indent: str, text_content: str):
+    # カラムリスト・カラムは子要素で処理
+    return "", []
+
+
+def _md_synced_block(block: Dict, content: Dict, indent: str, text_content: str):
+    # 同期ブロックの処理
+    if content.get("synced_from"):
+        return f"{indent}[Synced Block]\n\n", []
+    return "", []
+
+
+# ブロックタイプと変換関数の対応表（ブロックごとに呼ばれるため、if/elifの連鎖ではなく辞書で1回で引く）
+_BLOCK_HANDLERS: Dict[str, Callable[[Dict, Dict, str, str], Optional[Tuple[str, List[str]]]]] = {
+    "heading_1": _md_heading_1,
+    "heading_2": _md_heading_2,
+    "heading_3": _md_heading_3,
+    "paragraph": _md_paragraph,
+    "bulleted_list_item": _md_bulleted_list_item,
+    "numbered_list_item": _md_numbered_list_item,
+    "to_do": _md_to_do,
+    "toggle": _md_toggle,
+    "code": _md_code,
+    "quote": _md_quote,
+    "callout": _md_callout,
+    "divider": _md_divider,
+    "image": _md_image,
+    "video": _md_media,
+    "file": _md_media,
+    "pdf": _md_media,
+    "bookmark": _md_bookmark,
+    "equation": _md_equation,
+    "table_of_contents": _md_table_of_contents,
+    "link_to_page": _md_link_to_page,
+    "child_page": _md_child_page,
+    "child_database": _md_child_database,
+    "embed": _md_embed,
+    "table": _md_table,
+    "column_list": _md_layout,
+    "column": _md_layout,
+    "synced_block": _md_synced_block,
+}
 
 
 def convert_block_to_markdown(
@@ -316,143 +742,38 @@ def convert_block_to_markdown(
     child_page_ids = []  # 子ページIDを格納するリスト
 
     # リッチテキストの処理（ほとんどのブロックで使用）
-    text_content = extract_text_from_rich_text(content.get("rich_text", []))
+    # 取得と変換は1回だけ行い、変換関数とメンションの検出で共有する
+    rich_text = content.get("rich_text") or _EMPTY_RICH_TEXT
+    text_content = extract_text_from_rich_text(rich_text)
 
     # ========================================
-    # ブロックタイプ別の処理
+    # ブロックタイプ別の処理（_BLOCK_HANDLERSから変換関数を引く）
     # ========================================
-    if block_type == "heading_1":
-        return f"{indent}# {text_content}\n\n", child_page_ids
-    elif block_type == "heading_2":
-        return f"{indent}## {text_content}\n\n", child_page_ids
-    elif block_type == "heading_3":
-        return f"{indent}### {text_content}\n\n", child_page_ids
-    elif block_type == "paragraph":
-        return f"{indent}{text_content}\n\n" if text_content else "", child_page_ids
-    elif block_type == "bulleted_list_item":
-        return f"{indent}* {text_content}\n", child_page_ids
-    elif block_type == "numbered_list_item":
-        return f"{indent}1. {text_content}\n", child_page_ids
-    elif block_type == "to_do":
-        checked = "x" if content.get("checked", False) else " "
-        return f"{indent}- [{checked}] {text_content}\n", child_page_ids
-    elif block_type == "toggle":
-        return (
-            f"{indent}<details>\n{indent}<summary>{text_content}</summary>\n\n",
-            child_page_ids,
-        )
-    elif block_type == "code":
-        language = content.get("language", "")
-        code_text = extract_text_from_rich_text(content.get("rich_text", []))
-        return f"{indent}```{language}\n{code_text}\n{indent}```\n\n", child_page_ids
-    elif block_type == "quote":
-        return f"{indent}> {text_content}\n\n", child_page_ids
-    elif block_type == "callout":
-        emoji = (
-            content.get("icon", {}).get("emoji", "💡") if content.get("icon") else "💡"
-        )
-        return f"{indent}> {emoji} {text_content}\n\n", child_page_ids
-    elif block_type == "divider":
-        return f"{indent}---\n\n", child_page_ids
-    elif block_type == "image":
-        image_url = ""
-        if content.get("type") == "external":
-            image_url = content.get("external", {}).get("url", "")
-        elif content.get("type") == "file":
-            image_url = content.get("file", {}).get("url", "")
-        caption = extract_text_from_rich_text(content.get("caption", []))
-        return f"{indent}![{caption}]({image_url})\n\n", child_page_ids
-    elif block_type == "video":
-        video_url = ""
-        if content.get("type") == "external":
-            video_url = content.get("external", {}).get("url", "")
-        elif content.get("type") == "file":
-            video_url = content.get("file", {}).get("url", "")
-        caption = extract_text_from_rich_text(content.get("caption", []))
-        return (
-            f"{indent}[📹 Video: {caption or 'Video'}]({video_url})\n\n",
-            child_page_ids,
-        )
-    elif block_type == "file":
-        file_url = ""
-        if content.get("type") == "external":
-            file_url = content.get("external", {}).get("url", "")
-        elif content.get("type") == "file":
-            file_url = content.get("file", {}).get("url", "")
-        caption = extract_text_from_rich_text(content.get("caption", []))
-        return f"{indent}[📎 File: {caption or 'File'}]({file_url})\n\n", child_page_ids
-    elif block_type == "pdf":
-        pdf_url = ""
-        if content.get("type") == "external":
-            pdf_url = content.get("external", {}).get("url", "")
-        elif content.get("type") == "file":
-            pdf_url = content.get("file", {}).get("url", "")
-        caption = extract_text_from_rich_text(content.get("caption", []))
-        return f"{indent}[📄 PDF: {caption or 'PDF'}]({pdf_url})\n\n", child_page_ids
-    elif block_type == "bookmark":
-        url = content.get("url", "")
-        caption = extract_text_from_rich_text(content.get("caption", []))
-        return f"{indent}[🔖 {caption or url}]({url})\n\n", child_page_ids
-    elif block_type == "equation":
-        expression = content.get("expression", "")
-        return f"{indent}$$\n{expression}\n$$\n\n", child_page_ids
-    elif block_type == "table_of_contents":
-        return f"{indent}[[TOC]]\n\n", child_page_ids
-    elif block_type == "link_to_page":
-        page_id = content.get("page_id", "")
-        if page_id:
-            child_page_ids.append(page_id)
-            return f"{indent}[📄 Page Link](notion://{page_id})\n\n", child_page_ids
-    elif block_type == "child_page":
-        page_id = block.get("id", "")
-        title = content.get("title", "Untitled")
-        if page_id:
-            child_page_ids.append(page_id)
-            return f"{indent}[📄 {title}](notion://{page_id})\n\n", child_page_ids
-    elif block_type == "child_database":
-        db_id = block.get("id", "")
-        title = content.get("title", "Database")
-        if db_id:
-            child_page_ids.append(db_id)
-            return f"{indent}[🗄️ {title}](notion://{db_id})\n\n", child_page_ids
-    elif block_type == "embed":
-        url = content.get("url", "")
-        caption = extract_text_from_rich_text(content.get("caption", []))
-        return f"{indent}[🌐 Embed: {caption or url}]({url})\n\n", child_page_ids
-    elif block_type == "table":
-        # テーブルの処理（簡易版）
-        return f"{indent}[Table - Please view in Notion]\n\n", child_page_ids
-    elif block_type == "column_list":
-        return "", child_page_ids  # カラムリストは子要素で処理
-    elif block_type == "column":
-        return "", child_page_ids  # カラムは子要素で処理
-    elif block_type == "synced_block":
-        # 同期ブロックの処理
-        synced_from = content.get("synced_from")
-        if synced_from:
-            return f"{indent}[Synced Block]\n\n", child_page_ids
-        return "", child_page_ids
+    handler = _BLOCK_HANDLERS.get(block_type)
+    if handler:
+        result = handler(block, content, indent, text_content)
+        if result is not None:
+            return result
 
     # メンションやリンクの検出
     # Notionのテキスト内にページやデータベースへのメンションが含まれる場合、
     # それらのIDを収集して後で再帰的に処理する
-    if "rich_text" in content:
-        for rt in content.get("rich_text", []):
-            if rt.get("type") == "mention":
-                mention = rt.get("mention", {})
-                if mention.get("type") == "page":
-                    page_id = mention.get("page", {}).get("id")
-                    if page_id:
-                        child_page_ids.append(page_id)
-                elif mention.get("type") == "database":
-                    db_id = mention.get("database", {}).get("id")
-                    if db_id:
-                        child_page_ids.append(db_id)
+    for rt in rich_text:
+        if rt.get("type") == "mention":
+            mention = rt.get("mention", {})
+            if mention.get("type") == "page":
+                page_id = mention.get("page", {}).get("id")
+                if page_id:
+                    child_page_ids.append(canonicalize_page_id(page_id))
+            elif mention.get("type") == "database":
+                db_id = mention.get("database", {}).get("id")
+                if db_id:
+                    child_page_ids.append(canonicalize_page_id(db_id))
 
     return "", child_page_ids
 
 
-def process_blocks_recursively(
+async def process_blocks_recursively(
     blocks: List[Dict], notion_client, indent_level: int = 0
 ) -> Tuple[str, List[str]]:
     """
@@ -463,54 +784,70 @@ def process_blocks_recursively(
     この関数は、ブロックのリストを受け取り、各ブロックをMarkdownに変換し、
     has_childrenフラグが立っているブロックは再帰的に子ブロックを処理する。
     
+    子ブロックの取得は兄弟ブロック間で並行に行い、結果は元の順序で連結する。
+    
     【特別な処理】
     - toggleブロック: 子要素の処理後に</details>タグを追加
     - インデント: ネストの深さに応じてインデントを追加
     
     Args:
         blocks: 処理するブロックのリスト
-        notion_client: Notion APIクライアントオブジェクト
+        notion_client: Notion APIクライアントオブジェクト（notion_client.AsyncClient）
         indent_level: 現在のインデントレベル
     
     Returns:
         Tuple[str, List[str]]: 
             - すべてのブロックを変換したMarkdown文字列
-            - 発見した子ページIDのリスト
+            - 発見した子ページIDのリスト（重複なし）
     """
-    markdown_content = ""
-    all_child_page_ids = []
+    async def fetch_children(block: Dict) -> Optional[Tuple[str, List[str]]]:
+        """子ブロックをAPIから取得し、再帰的に変換する（取得に失敗した場合はNone）"""
+        try:
+            child_blocks = (
+                await call_api(notion_client.blocks.children.list, block_id=block["id"])
+            ).get("results", [])
+            # 子ブロックを再帰的に処理（インデントレベルを上げる）
+            return await process_blocks_recursively(
+                child_blocks, notion_client, indent_level + 1
+            )
+        except Exception as e:
+            print(f"    ⚠️  子ブロック取得エラー: {e}")
+            return None
+
+    # 子ブロックを持つブロックは、子ブロックの取得と変換をまとめて並行に実行する
+    # （同時リクエスト数とレート制限はcall_apiで全体として制御される）
+    children_results = iter(await asyncio.gather(
+        *(fetch_children(block) for block in blocks if block.get("has_children", False))
+    ))
+
+    # 変換結果は部分文字列のリストに集め、最後に1回だけ連結する
+    markdown_parts = []
+    # 子ページIDは重複を除いて発見順に保持する（同じページへのリンクが何度あっても1回だけ返す）
+    all_child_page_ids: Dict[str, None] = {}
 
     for block in blocks:
         # 各ブロックをMarkdownに変換
         block_md, child_ids = convert_block_to_markdown(block, indent_level)
-        markdown_content += block_md
-        all_child_page_ids.extend(child_ids)
+        markdown_parts.append(block_md)
+        all_child_page_ids.update(dict.fromkeys(child_ids))
 
-        # 子ブロックがある場合は再帰的に処理
+        # 子ブロックがある場合は、並行に取得済みの変換結果を元の順序で追加
         if block.get("has_children", False):
-            try:
-                # 子ブロックをAPIから取得
-                child_blocks = notion_client.blocks.children.list(
-                    block_id=block["id"]
-                ).get("results", [])
-                
-                # 子ブロックを再帰的に処理（インデントレベルを上げる）
-                child_md, more_child_ids = process_blocks_recursively(
-                    child_blocks, notion_client, indent_level + 1
-                )
-                markdown_content += child_md
-                all_child_page_ids.extend(more_child_ids)
+            result = next(children_results)
+            if result is None:
+                continue
+            child_md, more_child_ids = result
+            markdown_parts.append(child_md)
+            all_child_page_ids.update(dict.fromkeys(more_child_ids))
 
-                # toggleブロックの場合は終了タグを追加
-                if block.get("type") == "toggle":
-                    markdown_content += "  " * indent_level + "</details>\n\n"
-            except Exception as e:
-                print(f"    ⚠️  子ブロック取得エラー: {e}")
+            # toggleブロックの場合は終了タグを追加
+            if block.get("type") == "toggle":
+                markdown_parts.append("  " * indent_level + "</details>\n\n")
 
-    return markdown_content, all_child_page_ids
+    return "".join(markdown_parts), list(all_child_page_ids)
 
 
-def get_page_properties(page_info: Dict) -> Dict:
+def get_page_properties(page_info: Dict) -> Tuple[Dict, str]:
     """
     Notionページのプロパティを取得して辞書形式で返す
     
@@ -544,9 +881,12 @@ def get_page_properties(page_info: Dict) -> Dict:
         page_info: Notion APIから取得したページ情報
     
     Returns:
-        Dict: プロパティ名をキー、値をバリューとする辞書
+        Tuple[Dict, str]:
+            - プロパティ名をキー、値をバリューとする辞書
+            - ページのタイトル（titleタイプのプロパティの値、空の場合は"Untitled"）
     """
     properties = {}
+    title = ""  # プロパティの走査中にtitleタイプの値を記録（再度走査しないため）
     for prop_name, prop_value in page_info.get("properties", {}).items():
         prop_type = prop_value.get("type")  # プロパティのタイプを取得
 
@@ -554,6 +894,8 @@ def get_page_properties(page_info: Dict) -> Dict:
             properties[prop_name] = "".join(
                 [t.get("plain_text", "") for t in prop_value.get("title", [])]
             )
+            # 最初に見つかったタイトルプロパティを使用
+            title = title or properties[prop_name]
         elif prop_type == "rich_text":
             properties[prop_name] = "".join(
                 [t.get("plain_text", "") for t in prop_value.get("rich_text", [])]
@@ -616,46 +958,120 @@ def get_page_properties(page_info: Dict) -> Dict:
             edited_by = prop_value.get("last_edited_by", {})
             properties[prop_name] = edited_by.get("name", edited_by.get("id"))
 
-    return properties
+    return properties, title or "Untitled"
 
 
-def traverse_and_save(page_id: str, parent_titles: List[str], depth: int = 0):
+def _clean_and_write(filepath: str, content: str) -> Tuple[int, int]:
     """
-    ページを再帰的に辿り、Markdownとして保存する中心的な関数
-    
+    テキストをクレンジングしてファイルに書き込む（_write_executorのスレッドで実行）
+    クレンジング前後の文字数を返す。
+    """
+    # RAG検索精度向上のため、テキストをクレンジング
+    # HTMLタグやNotion固有の記法を除去
+    cleaned_content = clean_notion_text(content)
+
+    # ファイルに書き込み（UTF-8エンコーディングで日本語を保持）
+    # エンコード済みのバイト列をバッファ経由でまとめて書き出す
+    with open(filepath, "wb", buffering=FILE_WRITE_BUFFER_SIZE) as f:
+        f.write(cleaned_content.encode("utf-8"))
+    return len(content), len(cleaned_content)
+
+
+def _db_page_title(db_page: Dict) -> str:
+    """
+    データベース内のページのタイトルを取得する
+    データベースの各ページはpropertiesを持ち、その中にtitleタイプがある
+    """
+    for prop_value in db_page.get("properties", {}).values():
+        if prop_value.get("type") == "title":
+            return "".join(t.get("plain_text", "") for t in prop_value.get("title", [])) or "Untitled"
+    return "Untitled"  # タイトルプロパティがない場合のデフォルト
+
+
+async def traverse_and_save(page_id: str, parent_titles: List[str], depth: int = 0):
+    """
+    指定したページを起点にリンク先を辿り、すべてのページをMarkdownとして保存する
+
     【処理フロー】
-    1. 訪問済みチェック: 循環参照を防ぐため、処理済みページはスキップ
-    2. レート制限対策: APIのレート制限を避けるためsleepを挿入
-    3. ページ/データベース判定: APIエラーによりタイプを判別
-    4. コンテンツ取得: ブロックを取得してMarkdownに変換
-    5. ファイル保存: タイトル階層をファイル名にして保存
-    6. メタデータ更新: 進捗状況を即座に保存（中断時の再開用）
-    7. 再帰処理: 発見した子ページを再帰的に処理
+    1. 起点ページをキューに登録
+    2. MAX_WORKERS個のワーカーがキューからページを取り出して並行に処理（process_page）
+    3. 処理中に発見した子ページはキューに追加され、空いたワーカーが処理する
+       （訪問済みチェックはキューへの追加時に行い、重複したページはAPIを呼ぶ前に除外する）
+    4. キューが空になり、すべてのワーカーの処理が終わったら終了
+
+    APIへのリクエストはすべてcall_apiを経由し、全ワーカー合計でレート制限を守る。
 
     Args:
-        page_id (str): 現在処理中のページID
+        page_id (str): 起点のページID
         parent_titles (List[str]): 親ページのタイトル階層（ファイル名生成用）
-        depth (int): 現在の深さ（コンソール出力のインデント用）
+        depth (int): 起点の深さ（コンソール出力のインデント用）
     """
-    # ========================================
-    # 1. 訪問済みチェック
-    # ========================================
-    if page_id in visited_page_ids:
-        print(
-            f"{'  ' * depth}⏭️  既訪問: {page_id[:8]}... [処理済: {len(visited_page_ids)}]"
-        )
-        return
-    visited_page_ids.add(page_id)  # 訪問済みとして記録
+    global _rate_limiter, _api_semaphore, _write_executor
+    _rate_limiter = _RateLimiter(NOTION_REQUESTS_PER_SECOND, NOTION_REQUEST_BURST)
+    _api_semaphore = asyncio.Semaphore(MAX_WORKERS)
+    _write_executor = ThreadPoolExecutor(max_workers=WRITE_WORKERS)
+
+    # 処理待ちのページ: (ページID, 親タイトル階層, 深さ)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def enqueue(item: Tuple[str, List[str], int]):
+        """未訪問のページだけを正規化したIDでキューに追加する（循環参照・重複の防止）"""
+        page_id, parent_titles, depth = item
+        page_id = canonicalize_page_id(page_id)
+        page_key = _page_key(page_id)
+        if page_key in visited_page_ids:
+            print(
+                f"{'  ' * depth}⏭️  既訪問: {page_id[:8]}... [処理済: {len(visited_page_ids)}]"
+            )
+            return
+        visited_page_ids.add(page_key)  # 訪問済みとして記録
+        queue.put_nowait((page_id, parent_titles, depth))
 
-    # ========================================
-    # 2. レート制限対策
-    # ========================================
-    time.sleep(0.3)  # Notion APIのレート制限を避けるための待機
+    enqueue((page_id, parent_titles, depth))
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            try:
+                await process_page(*item, enqueue=enqueue)
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(MAX_WORKERS)]
+    try:
+        # キューに追加されたすべてのページの処理が終わるまで待機
+        await queue.join()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        _write_executor.shutdown(wait=True)
 
+
+async def process_page(page_id: str, parent_titles: List[str], depth: int,
+                       enqueue: Callable[[Tuple[str, List[str], int]], None]):
+    """
+    1つのページ（またはデータベース）を取得し、Markdownとして保存する
+
+    【処理フロー】
+    1. 進捗表示（訪問済みチェックはキューへの追加時に済んでいる）
+    2. ページ/データベース判定: APIエラーによりタイプを判別
+    3. コンテンツ取得: ブロックを取得してMarkdownに変換
+    4. ファイル保存: タイトル階層をファイル名にして保存
+    5. メタデータ更新: 進捗状況を即座に保存（中断時の再開用）
+    6. 子ページの登録: 発見した子ページをキューに追加（再帰せず、別のワーカーが処理する）
+
+    Args:
+        page_id (str): 現在処理中のページID
+        parent_titles (List[str]): 親ページのタイトル階層（ファイル名生成用）
+        depth (int): 現在の深さ（コンソール出力のインデント用）
+        enqueue: 子ページ (ページID, 親タイトル階層, 深さ) をキューに追加する関数
+    """
     # ========================================
-    # 3. 進捗表示
+    # 1. 進捗表示
     # ========================================
-    progress_info = f"[{len(visited_page_ids)}ページ処理中]"
+    # レート制限はcall_apiで全ワーカー共通に行うため、ここでの待機は不要
+    progress_info = f"[{len(visited_page_ids)}ページ登録済]"
     print(
         f"{'  ' * depth}📄 処理中: {' > '.join(parent_titles[-3:])} - {page_id[:8]}... {progress_info}"
     )
@@ -670,28 +1086,7 @@ def traverse_and_save(page_id: str, parent_titles: List[str], depth: int = 0):
         # そのため、まずページAPIで取得を試み、失敗したらデータベースAPIを試す
         try:
             # pages.retrieve APIを使ってページ情報を取得
-            page_info = notion.pages.retrieve(page_id=page_id)
-            
-            # トリッキーな処理：Notionのページのタイトル取得
-            # propertiesの中で"title"という名前のプロパティを探す（デフォルト）
-            title_property = page_info.get("properties", {}).get("title", {})
-            
-            # "title"という名前のプロパティがない場合のフォールバック
-            if not title_property:
-                # 全プロパティをループしてtype="title"のプロパティを探す
-                for prop_name, prop_value in page_info.get("properties", {}).items():
-                    if prop_value.get("type") == "title":
-                        title_property = prop_value
-                        break  # 最初に見つかったタイトルプロパティを使用
-
-            # リスト内包表記を使ってタイトルを結合
-            # titleプロパティはリッチテキストの配列なので、plain_textを抽出して結合
-            current_title = (
-                "".join(
-                    [t.get("plain_text", "") for t in title_property.get("title", [])]
-                )
-                or "Untitled"  # タイトルが空の場合は"Untitled"を使用
-            )
+            page_info = await call_api(notion.pages.retrieve, page_id=page_id)
         except Exception as e:
             # ページAPIが失敗 = データベースの可能性が高い
             is_database = True
@@ -701,7 +1096,7 @@ def traverse_and_save(page_id: str, parent_titles: List[str], depth: int = 0):
             # データベースとして処理する場合
             try:
                 # databases.retrieve APIでデータベース情報を取得
-                db_info = notion.databases.retrieve(database_id=page_id)
+                db_info = await call_api(notion.databases.retrieve, database_id=page_id)
                 
                 # データベースのタイトルを取得（titleフィールドはリッチテキスト配列）
                 current_title = (
@@ -709,79 +1104,46 @@ def traverse_and_save(page_id: str, parent_titles: List[str], depth: int = 0):
                     or "Database"  # タイトルがない場合のデフォルト値
                 )
 
+                # データベース内のページの保存先（タイトル階層）
+                current_path_titles = parent_titles + [current_title]
+
                 # databases.query APIでデータベース内の全ページを取得
-                # ページネーション処理を実装して全ページを取得
-                db_pages = []  # 全ページを格納するリスト
-                has_more = True  # 次のページがあるかどうか
-                start_cursor = None  # ページネーション用カーソル
-                
-                while has_more:
-                    # データベースをクエリ（ページネーション対応）
-                    if start_cursor:
-                        response = notion.databases.query(
-                            database_id=page_id,
-                            start_cursor=start_cursor
-                        )
-                    else:
-                        response = notion.databases.query(database_id=page_id)
-                    
-                    # 取得したページを追加
-                    db_pages.extend(response.get("results", []))
-                    
-                    # 次ページの有無を確認
-                    has_more = response.get("has_more", False)
-                    start_cursor = response.get("next_cursor")
+                # 結果全体をリストに溜めず、取得した行ごとにリンクを作成して子ページをキューに追加
+                page_links = []  # データベース内の各ページへのリンク（Markdownの行）
+                async for db_page in paginate(notion.databases.query, database_id=page_id):
+                    page_links.append(f"- [{_db_page_title(db_page)}](notion://{db_page['id']})\n")
+                    # データベース内の各ページをキューに追加（空いたワーカーが並行に処理）
+                    enqueue((db_page["id"], current_path_titles, depth + 1))
+                page_count = len(page_links)
                 print(
-                    f"{'  ' * depth}  📊 データベース「{current_title}」内の{len(db_pages)}ページを処理"
+                    f"{'  ' * depth}  📊 データベース「{current_title}」内の{page_count}ページを処理"
                 )
 
                 # データベース自体の情報を保存
-                current_path_titles = parent_titles + [current_title]
                 filename = sanitize_filename("-".join(current_path_titles)) + "_DB.md"
                 filepath = os.path.join(SAVE_DIR, filename)
 
-                db_content = f"# 🗄️ {current_title}\n\n"
-                db_content += f"**Type**: Database\n"
-                db_content += f"**ID**: {page_id}\n"
-                db_content += f"**Total Pages**: {len(db_pages)}\n\n"
-                db_content += "## Properties\n\n"
-
-                # プロパティ情報を追加
-                for prop_name, prop_config in db_info.get("properties", {}).items():
-                    db_content += f"- **{prop_name}** ({prop_config.get('type')})\n"
-
-                db_content += f"\n## Pages in Database\n\n"
-
-                # データベース内の各ページへのリンクを作成
-                for db_page in db_pages:
-                    page_title = "Untitled"  # デフォルトのページタイトル
-                    
-                    # データベース内のページのタイトルを探す
-                    # データベースの各ページはpropertiesを持ち、その中にtitleタイプがある
-                    for prop_value in db_page.get("properties", {}).values():
-                        if prop_value.get("type") == "title":
-                            page_title = (
-                                "".join(
-                                    [
-                                        t.get("plain_text", "")
-                                        for t in prop_value.get("title", [])
-                                    ]
-                                )
-                                or "Untitled"
-                            )
-                            break
-                    db_content += f"- [{page_title}](notion://{db_page['id']})\n"
-
-                # ファイルに即座に保存（ディレクトリ作成も含む）
-                os.makedirs(os.path.dirname(filepath) or SAVE_DIR, exist_ok=True)
-                
+                # プロパティ一覧とページへのリンクを1つのテンプレートにまとめる
+                props_md = "".join(
+                    f"- **{prop_name}** ({prop_config.get('type')})\n"
+                    for prop_name, prop_config in db_info.get("properties", {}).items()
+                )
+                pages_md = "".join(page_links)
+                db_content = (
+                    f"# 🗄️ {current_title}\n\n"
+                    f"**Type**: Database\n"
+                    f"**ID**: {page_id}\n"
+                    f"**Total Pages**: {page_count}\n\n"
+                    f"## Properties\n\n{props_md}"
+                    f"\n## Pages in Database\n\n{pages_md}"
+                )
+
+                # ファイルに即座に保存（保存先ディレクトリはmain()で作成済み）
                 # データベース情報もクレンジング（RAG検索精度向上）
-                original_length = len(db_content)
-                cleaned_content = clean_notion_text(db_content)
-                cleaned_length = len(cleaned_content)
-                
-                with open(filepath, "w", encoding="utf-8") as f:
-                    f.write(cleaned_content)
+                # クレンジングと書き込みはスレッドプールで実行し、その間も他のワーカーのAPI通信を進める
+                original_length, cleaned_length = await asyncio.get_running_loop().run_in_executor(
+                    _write_executor, _clean_and_write, filepath, db_content
+                )
                 print(f"{'  ' * depth}  ✅ データベース保存: {filename}")
                 print(f"{'  ' * depth}     🧹 クレンジング: {original_length} → {cleaned_length} 文字 (削減率: {100*(1-cleaned_length/original_length):.1f}%)")
 
@@ -791,40 +1153,37 @@ def traverse_and_save(page_id: str, parent_titles: List[str], depth: int = 0):
                     "type": "database",
                     "path": filepath,
                     "parent_titles": parent_titles,
-                    "page_count": len(db_pages),
+                    "page_count": page_count,
                 }
-                save_metadata()  # メタデータを即座に保存
-
-                # データベース内の各ページを再帰的に処理
-                for db_page in db_pages:
-                    traverse_and_save(db_page["id"], current_path_titles, depth + 1)
+                # 変更を即座にジャーナルへ追記
+                append_journal({"id": page_id, "record": metadata["pages"][page_id]})
 
             except Exception as e:
                 print(f"{'  ' * depth}  ❌ データベース処理エラー: {e}")
-                metadata["error_pages"].append(
-                    {"id": page_id, "error": str(e), "type": "database"}
-                )
-                save_metadata()  # エラー情報も即座に保存
+                error_entry = {"id": page_id, "error": str(e), "type": "database"}
+                metadata["error_pages"].append(error_entry)
+                append_journal({"error": error_entry})  # エラー情報も即座に保存
             return
 
         # ページの場合の処理（データベースではない通常のページ）
         
+        # ページのプロパティ（タグ、日付、作成者など）とタイトルを1回の走査で取得
+        # タイトルはtitleタイプのプロパティ（リッチテキストの配列）のplain_textを結合したもの
+        properties, current_title = get_page_properties(page_info)
+
         # ファイル名生成: 親ページのタイトルを階層的に結合
         # 例: ["Root", "Parent", "Current"] → "Root-Parent-Current.md"
         current_path_titles = parent_titles + [current_title]
         filename = sanitize_filename("-".join(current_path_titles)) + ".md"
         filepath = os.path.join(SAVE_DIR, filename)
 
-        # ページのプロパティ（タグ、日付、作成者など）を取得
-        properties = get_page_properties(page_info)
-
-        # Markdownファイルのコンテンツを構築開始
+        # Markdownファイルのコンテンツを構築開始（部分文字列のリストに集め、最後に1回だけ連結する）
         # まずタイトルをH1として追加
-        page_content_md = f"# {current_title}\n\n"
+        page_parts = [f"# {current_title}\n\n"]
 
         # プロパティ情報をMarkdownのメタデータセクションとして追加
         if properties:
-            page_content_md += "## Properties\n\n"
+            page_parts.append("## Properties\n\n")
             
             # 各プロパティをリスト形式で出力
             for prop_name, prop_value in properties.items():
@@ -832,56 +1191,29 @@ def traverse_and_save(page_id: str, parent_titles: List[str], depth: int = 0):
                     # リストや辞書はJSON形式に変換（日本語を保持）
                     if isinstance(prop_value, (list, dict)):
                         prop_value = json.dumps(prop_value, ensure_ascii=False)
-                    page_content_md += f"- **{prop_name}**: {prop_value}\n"
+                    page_parts.append(f"- **{prop_name}**: {prop_value}\n")
             
             # プロパティセクションの後に区切り線を追加
-            page_content_md += "\n---\n\n"
-
-        # ページの全ブロック（コンテンツ）を取得
-        # Notion APIはページネーションを使用してブロックを返す
-        all_blocks = []  # 全ブロックを格納するリスト
-        has_more = True  # 次のページがあるかどうかのフラグ
-        start_cursor = None  # ページネーション用のカーソル
-
-        # トリッキーなページネーション処理
-        # Notion APIは1回のリクエストで最大100ブロックしか返さない
-        while has_more:
-            if start_cursor:
-                # 2回目以降のリクエスト: カーソルを指定
-                response = notion.blocks.children.list(
-                    block_id=page_id, start_cursor=start_cursor
-                )
-            else:
-                # 初回のリクエスト: カーソルなし
-                response = notion.blocks.children.list(block_id=page_id)
-
-            # 取得したブロックをリストに追加
-            all_blocks.extend(response.get("results", []))
-            
-            # 次ページの有無を確認
-            has_more = response.get("has_more", False)
-            
-            # 次ページ用のカーソルを取得
-            start_cursor = response.get("next_cursor")
-
-        # ブロックを再帰的に処理してMarkdownに変換
-        # 返り値: (Markdown文字列, 子ページIDのリスト)
-        blocks_md, child_page_ids = process_blocks_recursively(all_blocks, notion)
-        page_content_md += blocks_md  # 変換したMarkdownを追加
-
-        # Markdownファイルとして即座に保存
-        # トリッキー: os.path.dirname()が空文字列を返す場合に備えてor演算子を使用
-        os.makedirs(os.path.dirname(filepath) or SAVE_DIR, exist_ok=True)
-        
-        # RAG検索精度向上のため、テキストをクレンジング
-        # HTMLタグやNotion固有の記法を除去
-        original_length = len(page_content_md)
-        cleaned_content = clean_notion_text(page_content_md)
-        cleaned_length = len(cleaned_content)
-        
-        # ファイルに書き込み（UTF-8エンコーディングで日本語を保持）
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(cleaned_content)
+            page_parts.append("\n---\n\n")
+
+        # ページの全ブロック（コンテンツ）を取得してMarkdownに変換
+        # Notion APIは1回のリクエストで最大100ブロックしか返さないため、
+        # 全ブロックをリストに溜めず、取得した単位ごとに変換して結果だけを保持する
+        child_page_ids: Dict[str, None] = {}  # 子ページID（重複を除いて発見順に保持）
+        async for blocks in paginate_batches(notion.blocks.children.list, block_id=page_id):
+            # ブロックを再帰的に処理してMarkdownに変換
+            # 返り値: (Markdown文字列, 子ページIDのリスト)
+            blocks_md, batch_child_ids = await process_blocks_recursively(blocks, notion)
+            page_parts.append(blocks_md)  # 変換したMarkdownを追加
+            child_page_ids.update(dict.fromkeys(batch_child_ids))
+        child_page_ids = list(child_page_ids)
+        page_content_md = "".join(page_parts)
+
+        # Markdownファイルとして即座に保存（保存先ディレクトリはmain()で作成済み）
+        # クレンジングと書き込みはスレッドプールで実行し、その間も他のワーカーのAPI通信を進める
+        original_length, cleaned_length = await asyncio.get_running_loop().run_in_executor(
+            _write_executor, _clean_and_write, filepath, page_content_md
+        )
         print(f"{'  ' * depth}  ✅ 保存完了: {filename}")
         print(f"{'  ' * depth}     🧹 クレンジング: {original_length} → {cleaned_length} 文字 (削減率: {100*(1-cleaned_length/original_length):.1f}%)")
 
@@ -895,21 +1227,21 @@ def traverse_and_save(page_id: str, parent_titles: List[str], depth: int = 0):
             "child_pages": child_page_ids,
         }
         metadata["total_pages"] += 1
-        save_metadata()  # メタデータを即座に保存
+        # 変更を即座にジャーナルへ追記
+        append_journal({"id": page_id, "record": metadata["pages"][page_id]})
 
-        # 発見した子ページを再帰的に辿る
+        # 発見した子ページをキューに追加（空いたワーカーが並行に処理）
         for child_id in child_page_ids:
-            traverse_and_save(child_id, current_path_titles, depth + 1)
+            enqueue((child_id, current_path_titles, depth + 1))
 
     except Exception as e:
         print(f"{'  ' * depth}  ❌ エラー発生 (ID: {page_id[:8]}...): {e}")
-        metadata["error_pages"].append(
-            {"id": page_id, "error": str(e), "parent_titles": parent_titles}
-        )
-        save_metadata()  # エラー情報も即座に保存
+        error_entry = {"id": page_id, "error": str(e), "parent_titles": parent_titles}
+        metadata["error_pages"].append(error_entry)
+        append_journal({"error": error_entry})  # エラー情報も即座に保存
 
 
-def save_metadata():
+def save_metadata() -> bool:
     """
     メタデータをJSONファイルとして保存
     
@@ -922,14 +1254,64 @@ def save_metadata():
     - total_time_seconds: 処理時間
     
     【重要】
-    各ページ処理後に即座に保存することで、
-    プログラムが中断されても途中から再開できるようにしている。
+    各ページの処理結果はジャーナル（append_journal）に即座に追記し、
+    metadata.json全体の書き直しは統合時（compact_metadata）にまとめて行う。
+    書き込み中に中断されても既存ファイルを壊さないよう、一時ファイル経由で置き換える。
+    """
+    try:
+        tmp_path = METADATA_FILE + ".tmp"
+        with open(tmp_path, "wb", buffering=FILE_WRITE_BUFFER_SIZE) as f:
+            f.write(_json_dumps(metadata, pretty=True))
+        os.replace(tmp_path, METADATA_FILE)
+        return True
+    except Exception as e:
+        print(f"❌ メタデータ保存エラー: {e}")
+        return False
+
+
+def append_journal(entry: Dict):
     """
+    処理結果を1行のJSONとしてジャーナルに追記する。
+    各ページ処理後に呼び出され、プログラムが中断されても進捗が失われないようにする。
+    追記件数がJOURNAL_COMPACT_INTERVALに達したらmetadata.jsonへ統合する。
+    """
+    global _journal_file, _journal_count
     try:
-        with open(METADATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        if _journal_file is None:
+            _journal_file = open(METADATA_JOURNAL_FILE, "ab")
+        _journal_file.write(_json_dumps(entry) + b"\n")
+        _journal_file.flush()
     except Exception as e:
         print(f"❌ メタデータ保存エラー: {e}")
+        return
+
+    _journal_count += 1
+    if _journal_count >= JOURNAL_COMPACT_INTERVAL:
+        compact_metadata()
+
+
+def compact_metadata():
+    """
+    メタデータ全体をmetadata.jsonに保存し、反映済みのジャーナルを削除する。
+    """
+    global _journal_file, _journal_count
+    # 保存に失敗した場合はジャーナルを残し、次回起動時に復元できるようにする
+    if not save_metadata():
+        return
+    if _journal_file is not None:
+        _journal_file.close()
+        _journal_file = None
+    if os.path.exists(METADATA_JOURNAL_FILE):
+        os.remove(METADATA_JOURNAL_FILE)
+    _journal_count = 0
+
+
+async def crawl(root_page_id: str):
+    """ルートページからクロールし、終了後にNotionクライアントの接続を閉じる"""
+    try:
+        await traverse_and_save(root_page_id, [])
+    finally:
+        await notion.aclose()
 
 
 def main():
@@ -964,8 +1346,9 @@ def main():
         print("エラー: .envファイルにNOTION_TOKENを設定してください。")
         return
     
-    # Notionクライアントを作成
-    notion = notion_client.Client(auth=NOTION_TOKEN)
+    # Notionクライアントを作成（非同期版: 複数のリクエストを並行に送信できる）
+    # HTTPクライアントはパイプライン共通の設定（接続プール・HTTP/2）で作成
+    notion = notion_client.AsyncClient(auth=NOTION_TOKEN, client=new_async_client())
     print(f"Notionクライアント作成完了")
 
     print("=" * 60)
@@ -975,6 +1358,7 @@ def main():
     # ========================================
     # 2. 保存先ディレクトリを作成
     # ========================================
+    # 全ファイルをSAVE_DIR直下に保存するため、ここで一度だけ作成する
     os.makedirs(SAVE_DIR, exist_ok=True)
     print(f"📁 保存先: {SAVE_DIR}")
     print(f"🏠 ルートページID: {root_page_id}")
@@ -992,14 +1376,15 @@ def main():
 
     start_time = time.time()
 
-    # 初期メタデータを保存
-    metadata["crawl_date"] = datetime.now().isoformat()
+    # 初期メタデータを保存（クロール開始日時は新規クロールの場合のみ記録）
+    if not metadata["crawl_date"]:
+        metadata["crawl_date"] = datetime.now().isoformat()
     save_metadata()
 
     # ========================================
     # 4. ルートページから処理を開始
     # ========================================
-    traverse_and_save(root_page_id, [])
+    asyncio.run(crawl(root_page_id))
 
     elapsed_time = time.time() - start_time
 
@@ -1008,7 +1393,7 @@ def main():
     # ========================================
     metadata["crawl_completed"] = datetime.now().isoformat()
     metadata["total_time_seconds"] = elapsed_time
-    save_metadata()
+    compact_metadata()
 
     print("-" * 60)
     print("📈 統計情報")
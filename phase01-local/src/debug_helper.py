@@ -11,6 +11,58 @@ from datetime import datetime
 from typing import Any, Dict, Optional
 import json
 import traceback
+import reprlib
+import itertools
+
+# 高速JSONライブラリ（オプション）- 未インストールの場合は標準のjsonを使用
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# オブジェクトの詳細表示を省略する要素数（巨大な辞書などで処理が止まらないようにする）
+INSPECT_MAX_ITEMS = 10000
+
+# 表示用の短いrepr（巨大な値でも全体のreprを作らずに途中で打ち切る）
+_short_repr = reprlib.Repr()
+_short_repr.maxstring = 50
+_short_repr.maxother = 50
+_short_repr.maxlist = 5
+_short_repr.maxtuple = 5
+_short_repr.maxset = 5
+_short_repr.maxdict = 5
+
+
+def _short(value: Any, width: int = 50) -> str:
+    """値の短いrepr文字列を返す"""
+    return _short_repr.repr(value)[:width]
+
+
+def _keys_only_in(a: dict, b: dict, limit: int = 10):
+    """
+    aにだけ存在するキーの件数と先頭limit件を返す
+    キーの集合を作らずに1回の走査で数える。
+    """
+    count, sample = 0, []
+    for key in a:
+        if key not in b:
+            count += 1
+            if len(sample) < limit:
+                sample.append(key)
+    return count, sample
+
+
+def _snapshot_bytes(data: Any) -> bytes:
+    """スナップショット用にデータをUTF-8のJSONバイト列に変換（orjsonがあれば使用）"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass  # 64bitを超える整数など、orjsonが扱えない値は標準のjsonで出力
+    return json.dumps(data, ensure_ascii=False, indent=2, default=str).encode('utf-8')
 
 
 def setup_debug_logging(log_level=logging.DEBUG, log_dir="./logs"):
@@ -67,7 +119,8 @@ def debug_checkpoint(locals_dict: Dict[str, Any], message: str = "Debug Checkpoi
     print(f"\n{'='*60}")
     print(f"🔍 {message}")
     print(f"{'='*60}")
-    print(f"📍 場所: {traceback.extract_stack()[-2].filename}:{traceback.extract_stack()[-2].lineno}")
+    caller = sys._getframe(1)  # 呼び出し元のフレーム（スタック全体は走査しない）
+    print(f"📍 場所: {caller.f_code.co_filename}:{caller.f_lineno}")
     print(f"⏰ 時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}")
     
@@ -104,18 +157,26 @@ def inspect_object(obj: Any, name: str = "Object", max_depth: int = 2):
         print(f"Doc: {obj.__doc__[:100]}...")
     
     # 長さ情報
+    length = None
     if hasattr(obj, '__len__'):
         try:
-            print(f"Length: {len(obj)}")
+            length = len(obj)
+            print(f"Length: {length}")
         except:
             pass
     
+    # 巨大なコンテナは属性や要素の列挙を省略
+    if length is not None and length > INSPECT_MAX_ITEMS:
+        print(f"(too large, skipping attribute dump: {length} > {INSPECT_MAX_ITEMS})")
+        print("=" * 60)
+        return
+    
     # 属性情報
     if hasattr(obj, '__dict__'):
         print("\n📦 Attributes:")
         for attr, value in sorted(obj.__dict__.items()):
             try:
-                value_repr = repr(value)[:50]
+                value_repr = _short(value)
                 print(f"  - {attr}: {type(value).__name__} = {value_repr}")
             except:
                 print(f"  - {attr}: {type(value).__name__} = <表示不可>")
@@ -132,12 +193,12 @@ def inspect_object(obj: Any, name: str = "Object", max_depth: int = 2):
     # 特殊なオブジェクトタイプの追加情報
     if isinstance(obj, dict):
         print(f"\n🗝️ Dictionary Keys ({len(obj)}):")
-        for key in list(obj.keys())[:10]:
-            print(f"  - {repr(key)}")
+        for key in itertools.islice(obj, 10):
+            print(f"  - {_short(key)}")
     elif isinstance(obj, (list, tuple)):
         print(f"\n📝 First 5 items:")
         for i, item in enumerate(obj[:5]):
-            print(f"  [{i}]: {type(item).__name__} = {repr(item)[:50]}")
+            print(f"  [{i}]: {type(item).__name__} = {_short(item)}")
     
     print("=" * 60)
 
@@ -214,11 +275,11 @@ def save_debug_snapshot(data: Any, filename: str = None, directory: str = "./deb
     filepath = os.path.join(directory, filename)
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
+        with open(filepath, 'wb') as f:
             if isinstance(data, (dict, list)):
-                json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+                f.write(_snapshot_bytes(data))
             else:
-                f.write(str(data))
+                f.write(str(data).encode('utf-8'))
         
         print(f"📸 Debug snapshot saved: {filepath}")
         return filepath
@@ -251,22 +312,21 @@ def compare_objects(obj1: Any, obj2: Any, name1: str = "Object1", name2: str = "
     
     # 辞書の場合
     if isinstance(obj1, dict) and isinstance(obj2, dict):
-        keys1, keys2 = set(obj1.keys()), set(obj2.keys())
-        
-        only_in_1 = keys1 - keys2
-        only_in_2 = keys2 - keys1
-        common = keys1 & keys2
+        # キーの集合は作らず、差分は件数と先頭10件だけを求める
+        only_in_1, sample_1 = _keys_only_in(obj1, obj2)
+        only_in_2, sample_2 = _keys_only_in(obj2, obj1)
+        common = len(obj1) - only_in_1
         
         if only_in_1:
-            print(f"\n🔵 Only in {name1}: {only_in_1}")
+            print(f"\n🔵 Only in {name1} ({only_in_1}): {sample_1}{' ...' if only_in_1 > len(sample_1) else ''}")
         if only_in_2:
-            print(f"\n🟢 Only in {name2}: {only_in_2}")
+            print(f"\n🟢 Only in {name2} ({only_in_2}): {sample_2}{' ...' if only_in_2 > len(sample_2) else ''}")
         
-        print(f"\n🔍 Common keys ({len(common)}):")
-        for key in list(common)[:10]:
+        print(f"\n🔍 Common keys ({common}):")
+        for key in itertools.islice((k for k in obj1 if k in obj2), 10):
             val1, val2 = obj1[key], obj2[key]
             if val1 != val2:
-                print(f"  ❌ {key}: {repr(val1)[:30]} != {repr(val2)[:30]}")
+                print(f"  ❌ {key}: {_short(val1, 30)} != {_short(val2, 30)}")
             else:
                 print(f"  ✅ {key}: same")
     
@@ -277,7 +337,7 @@ def compare_objects(obj1: Any, obj2: Any, name1: str = "Object1", name2: str = "
         
         for i in range(min(len1, len2, 10)):  # 最初の10個を比較
             if obj1[i] != obj2[i]:
-                print(f"  ❌ [{i}]: {repr(obj1[i])[:30]} != {repr(obj2[i])[:30]}")
+                print(f"  ❌ [{i}]: {_short(obj1[i], 30)} != {_short(obj2[i], 30)}")
     
     print("=" * 60)
 
@@ -13,18 +13,43 @@
 # 標準ライブラリのインポート
 import os  # OS関連の操作（ファイルパス、環境変数など）
 import json  # JSONファイルの読み書き用
-import glob  # ファイルパターンマッチング用（*.txtなど）
-import time  # スリープ処理用（APIレート制限対策）
-from typing import List, Dict, Optional  # 型ヒント用
+import re  # ドキュメントタイプ判定用の正規表現
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor  # ファイル読み込み・チャンク分割の並列化用
+import time  # レート制限の経過時間計測用
+import asyncio  # 埋め込みAPIの並列呼び出し用
+import functools  # 埋め込みモデルのキャッシュ用
+import hashlib  # 埋め込みキャッシュのキー生成用
+import sqlite3  # 埋め込みキャッシュの永続化用
+from array import array  # 埋め込みベクトルのバイナリ変換用
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple  # 型ヒント用
 from datetime import datetime  # 日時操作用
 from dotenv import load_dotenv  # .envファイルから環境変数を読み込む
+from openai import AsyncOpenAI  # OpenAI公式の非同期クライアント
+import tiktoken  # トークン数の計算用（レート制限の見積もり）
 
 # LangChain関連のインポート
-from langchain_text_splitters import RecursiveCharacterTextSplitter  # テキストを再帰的にチャンク分割
-from langchain_openai import OpenAIEmbeddings  # OpenAIの埋め込みモデルを使用
-from langchain_chroma import Chroma  # ChromaDBベクトルデータベースの操作
-from langchain.schema import Document  # LangChainのDocumentオブジェクト
-from langchain_community.vectorstores.utils import filter_complex_metadata  # メタデータのフィルタリング
+# スプリッター・埋め込み・ChromaDBのモジュールは読み込みが重いため、使用する関数の中でインポートする
+from langchain_core.documents import Document  # LangChainのDocumentオブジェクト（軽量なlangchain_coreから直接）
+
+if TYPE_CHECKING:
+    from langchain_openai import OpenAIEmbeddings  # OpenAIの埋め込みモデル
+    from langchain_chroma import Chroma  # ChromaDBベクトルデータベースの操作
+
+# 高速JSONライブラリ（オプション）- 未インストールの場合は標準のjsonを使用
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Aho-Corasick法の文字列検索ライブラリ（オプション）- 未インストールの場合はキーワードごとに検索
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 # 環境変数の読み込み（.envファイルからOPENAI_API_KEYなどを読み込む）
 load_dotenv()
@@ -33,6 +58,7 @@ load_dotenv()
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
+from pipeline_http import get_shared_client, new_async_client  # パイプライン共通のHTTPクライアント
 
 # ========================================
 # 設定
@@ -42,6 +68,12 @@ from config import config
 NOTION_DOCS_DIR = "./data/documents/notion"  # Notionから取得したドキュメント
 GOOGLE_DOCS_DIR = "./data/documents/google"  # Google Driveから取得したドキュメント
 
+# 読み込むファイルの拡張子
+DOCUMENT_EXTENSIONS = {".txt", ".md", ".csv", ".html", ".xml", ".json"}
+
+# ファイル読み込みの並列数（ディスクI/Oを重ねるためのスレッド数）
+LOAD_WORKERS = 16
+
 # ChromaDBの保存先（ベクトルデータベースの永続化ディレクトリ）
 CHROMA_PERSIST_DIRECTORY = config.chromadb['persist_directory']
 CHROMA_COLLECTION_NAME = config.chromadb['collection_name']
@@ -53,6 +85,216 @@ CHUNK_OVERLAP = config.chunking['chunk_overlap']
 # OpenAI Embeddingモデル（テキストをベクトルに変換するモデル）
 EMBEDDING_MODEL = config.embedding['model']
 
+# チャンクから自動抽出するキーワード（メタデータに付与して検索精度を向上）
+KEYWORDS = (
+    "有給休暇", "年次有給休暇", "特別休暇",
+    "フレックスタイム", "コアタイム",
+    "時間外労働", "残業", "休日出勤",
+    "就業規則", "労働契約", "給与", "賞与",
+)
+
+# (キーワード, 小文字化したキーワード) の組（チャンクごとにlower()を呼ばないよう事前に計算）
+KEYWORDS_LC = tuple((keyword, keyword.lower()) for keyword in KEYWORDS)
+
+# ドキュメントタイプ別のテキストスプリッターの設定（RecursiveCharacterTextSplitterの引数）
+SPLITTER_SETTINGS = {
+    # 法的文書・就業規則用: 条文単位で分割し、意味のまとまりを保持
+    "legal": dict(
+        chunk_size=600,  # 小さめのチャンク（条文は短いため）
+        chunk_overlap=50,  # 少なめのオーバーラップ（条文は独立性が高い）
+        separators=[
+            "\n第",  # 条文の区切り（「第１条」「第２条」など）
+            "\n（",   # 項目の区切り（「（目的）」「（定義）」など）
+            "\n\n",   # 段落の区切り
+            "。\n",   # 文末で改行
+            "。",     # 句点
+            "",       # 最終手段
+        ],
+        length_function=len,
+    ),
+    # 労務関連文書用
+    "hr": dict(
+        chunk_size=700,  # 中程度のチャンク
+        chunk_overlap=100,  # 適度なオーバーラップ
+        separators=[
+            "\n##",   # マークダウンのセクション
+            "\n\n",   # 段落
+            "\n",     # 改行
+            "。",     # 句点
+            "",       # 最終手段
+        ],
+        length_function=len,
+    ),
+    # 一般文書用（デフォルト）
+    "general": dict(
+        chunk_size=800,  # 標準サイズ
+        chunk_overlap=150,  # 標準オーバーラップ
+        separators=["\n\n", "\n", "。", ".", " ", ""],
+        length_function=len,
+    ),
+}
+
+# チャンク分割の並列プロセス数（Noneの場合はCPUコア数）
+SPLIT_WORKERS = None
+
+# ドキュメントタイプ判定用のタイトルのパターン
+_LEGAL_TITLE_RE = re.compile(r"就業規則|規程")
+_HR_TITLE_RE = re.compile(r"労働|勤務|休暇")
+
+# 埋め込みAPIの同時リクエスト数（バッチを並列に送信してネットワーク待ちを重ねる）
+EMBEDDING_CONCURRENCY = 8
+
+# 埋め込みAPIのトークン数レート制限（1分あたりの上限トークン数）
+EMBEDDING_TOKENS_PER_MINUTE = 300_000
+
+# 埋め込みAPIの1リクエストあたりの上限（入力件数はAPIの上限2048件、合計トークン数も上限内に収める）
+EMBEDDING_BATCH_SIZE = 2048
+EMBEDDING_MAX_BATCH_TOKENS = 250_000
+
+# 埋め込みベクトルのキャッシュ（変更のないチャンクは再実行時にAPIを呼ばない）
+EMBEDDING_CACHE_PATH = "./data/embedding_cache.sqlite3"
+
+
+@functools.lru_cache(maxsize=1)
+def get_embeddings() -> "OpenAIEmbeddings":
+    """
+    OpenAI Embeddingsのインスタンスを取得（初回呼び出し時に一度だけ作成）
+
+    パイプライン共通のhttpx.Client（keep-alive有効）を使い、
+    リクエストごとのTCP/TLSハンドシェイクを省く。
+    """
+    from langchain_openai import OpenAIEmbeddings  # OpenAIの埋め込みモデルを使用
+
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL, http_client=get_shared_client())
+
+
+def _build_keyword_automaton():
+    """全キーワードを1回の走査で検出するAho-Corasickオートマトンを構築"""
+    automaton = ahocorasick.Automaton()
+    for keyword, keyword_lower in KEYWORDS_LC:
+        automaton.add_word(keyword_lower, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+def extract_keywords(text: str) -> List[str]:
+    """テキストに含まれるキーワードをKEYWORDSの順序で返す"""
+    text_lower = text.lower()
+    if _KEYWORD_AUTOMATON is not None:
+        found = {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(text_lower)}
+        return [keyword for keyword in KEYWORDS if keyword in found]
+    return [keyword for keyword, keyword_lower in KEYWORDS_LC if keyword_lower in text_lower]
+
+
+def _get_encoding(model: str):
+    """埋め込みモデルに対応するトークナイザーを取得（未知のモデルはcl100k_baseで代用）"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+class _TokenRateLimiter:
+    """
+    トークンバケット方式のレート制限（消費量はバッチのトークン数）。
+    バケットに十分なトークンがある間は待機せずにリクエストを送信する。
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self._rate = tokens_per_minute / 60.0  # 1秒あたりの補充量
+        self._capacity = float(tokens_per_minute)
+        self._tokens = self._capacity
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: int):
+        """指定トークン数を取得する（不足している場合は補充されるまで待機）"""
+        amount = min(amount, self._capacity)  # 上限を超えるバッチでも永久に待たないようにする
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+                self._last = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self._rate)
+
+
+class _EmbeddingCache:
+    """
+    チャンクの埋め込みベクトルをSQLiteに保存するキャッシュ。
+    キーは「モデル名 + 本文」のSHA-256で、本文やモデルが変わると別のキーになる。
+    """
+
+    # 1回のSELECTで問い合わせるキーの数（SQLiteのパラメータ数上限を考慮）
+    _QUERY_CHUNK = 500
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+
+    @staticmethod
+    def key(text: str) -> str:
+        """キャッシュキーを生成"""
+        return hashlib.sha256(f"{EMBEDDING_MODEL}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """キャッシュに存在するキーの埋め込みを {キー: ベクトル} で返す"""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for i in range(0, len(unique_keys), self._QUERY_CHUNK):
+            chunk = unique_keys[i:i + self._QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})", chunk
+            )
+            for key, blob in rows:
+                found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, items):
+        """(キー, ベクトル) の組をまとめて保存"""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)",
+                ((key, array("f", embedding).tobytes()) for key, embedding in items),
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+# JSONの読み込み（orjson.JSONDecodeErrorはjson.JSONDecodeErrorのサブクラス）
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+def _json_dumps_str(obj) -> str:
+    """メタデータ用にJSON文字列へ変換（日本語はエスケープしない、orjsonがあれば使用）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _read_text_file(filepath: str) -> Tuple[str, Optional[str], Optional[Exception]]:
+    """
+    テキストファイルを読み込む（スレッドプールのワーカーで実行）
+
+    Returns:
+        (ファイルパス, 内容, 例外) のタプル。失敗時は内容がNoneで例外が入る
+    """
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:  # ファイルをUTF-8で開く
+            return filepath, f.read(), None  # ファイルの全内容を文字列として読み込む
+    except Exception as e:
+        return filepath, None, e
+
 
 def load_documents_from_directory(directory: str, source_type: str) -> List[Document]:
     """
@@ -71,53 +313,66 @@ def load_documents_from_directory(directory: str, source_type: str) -> List[Docu
     metadata_file = os.path.join(directory, "metadata.json")  # metadata.jsonのパスを作成
     metadata = {}  # メタデータを格納する辞書
     if os.path.exists(metadata_file):  # metadata.jsonが存在する場合
-        with open(metadata_file, "r", encoding="utf-8") as f:  # UTF-8でファイルを開く
-            metadata = json.load(f)  # JSONをパースしてPythonの辞書に変換
+        with open(metadata_file, "rb") as f:  # バイナリで開く（UTF-8のままパーサーに渡す）
+            metadata = _json_loads(f.read())  # JSONをパースしてPythonの辞書に変換
 
-    # ディレクトリ内の全てのテキストファイルを処理
-    file_patterns = ["*.txt", "*.md", "*.csv", "*.html", "*.xml", "*.json"]  # 読み込むファイルの拡張子パターン
+    # ファイル名 → (ページID, ページ情報) の索引を一度だけ作成（ファイルごとの全件走査を避ける）
+    pages_by_filename = {}
+    for page_id, page_info in metadata.get("pages", {}).items():  # 各ページの情報をループ
+        path = page_info.get("path")
+        if path:
+            pages_by_filename.setdefault(os.path.basename(path), (page_id, page_info))  # 同名は最初のものを優先
 
-    for pattern in file_patterns:  # 各ファイルパターンを処理
-        for filepath in glob.glob(os.path.join(directory, pattern)):  # パターンにマッチするファイルを検索
-            # metadata.jsonはスキップ（メタデータファイル自体は処理しない）
-            if filepath.endswith("metadata.json"):
+    # ディレクトリ内の全てのテキストファイルを処理
+    # 読み込むファイルの一覧を先に作成（ディレクトリの走査は1回だけ）
+    with os.scandir(directory) as entries:
+        filepaths = [
+            entry.path
+            for entry in entries
+            if not entry.name.startswith(".")  # 隠しファイルはスキップ
+            and os.path.splitext(entry.name)[1] in DOCUMENT_EXTENSIONS  # 読み込む拡張子のみ
+            and not entry.name.endswith("metadata.json")  # metadata.jsonはスキップ（メタデータファイル自体は処理しない）
+            and entry.is_file()
+        ]
+
+    # ファイルの読み込みはスレッドプールで並列に実行（ディスクI/Oの待ち時間を重ねる）
+    # メタデータとの対応付けは読み込み順にメインスレッドで行う
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+        for filepath, content, error in executor.map(_read_text_file, filepaths):
+            filename = os.path.basename(filepath)  # ファイル名を取得（パスからファイル名部分だけを抽出）
+            if error is not None:  # ファイル読み込みに失敗した場合
+                print(f"  ❌ エラー: {filename} - {error}")  # エラーメッセージを表示
                 continue  # 次のファイルに進む
 
             try:  # エラー処理の開始
-                # ファイル内容を読み込む
-                with open(filepath, "r", encoding="utf-8") as f:  # ファイルをUTF-8で開く
-                    content = f.read()  # ファイルの全内容を文字列として読み込む
-
                 # ファイル名からメタデータを探す
                 file_metadata = {}  # このファイルのメタデータを格納する辞書
-                filename = os.path.basename(filepath)  # ファイル名を取得（パスからファイル名部分だけを抽出）
 
                 # metadata.jsonからこのファイルの情報を探す
-                pages_data = metadata.get("pages", {})  # metadataからpagesデータを取得（なければ空の辞書）
-                for page_id, page_info in pages_data.items():  # 各ページの情報をループ
-                    if page_info.get("path", "").endswith(filename):  # パスが現在のファイル名で終わる場合
-                        file_metadata = {  # メタデータ辞書を作成
-                            "source": source_type,  # データソース（notionまたはgoogle_drive）
-                            "title": page_info.get("title", filename),  # ドキュメントのタイトル
-                            "file_path": filepath,  # ファイルのフルパス
-                            "parent_titles_json": json.dumps(  # 親階層のタイトルをJSON文字列として保存
-                                page_info.get("parent_titles", []), ensure_ascii=False  # 日本語をそのまま保存
-                            ),  # ChromaDBはリスト型を受け付けないためJSON文字列に変換
-                            "page_id": page_id,  # ページの一意識別子
-                            "type": page_info.get("type", "file"),  # ドキュメントタイプ（page、database、fileなど）
-                        }
-
-                        # Notion固有のプロパティを追加
-                        if source_type == "notion":  # Notionの場合
-                            file_metadata["url"] = page_info.get("properties", {}).get(  # NotionWebページのURLを追加
-                                "url"
-                            )
-                        # Google Drive固有のプロパティを追加
-                        elif source_type == "google_drive":  # Google Driveの場合
-                            props = page_info.get("properties", {})  # プロパティ辞書を取得
-                            file_metadata["drive_link"] = props.get("drive_link")  # Google Driveの共有リンク
-                            file_metadata["modified_time"] = props.get("modified_time")  # 最終更新日時
-                        break  # マッチしたらループを抜ける
+                hit = pages_by_filename.get(filename)  # ファイル名で索引を引く
+                if hit is not None:  # metadata.jsonにこのファイルの情報がある場合
+                    page_id, page_info = hit
+                    file_metadata = {  # メタデータ辞書を作成
+                        "source": source_type,  # データソース（notionまたはgoogle_drive）
+                        "title": page_info.get("title", filename),  # ドキュメントのタイトル
+                        "file_path": filepath,  # ファイルのフルパス
+                        "parent_titles_json": _json_dumps_str(  # 親階層のタイトルをJSON文字列として保存
+                            page_info.get("parent_titles", [])  # 日本語をそのまま保存
+                        ),  # ChromaDBはリスト型を受け付けないためJSON文字列に変換
+                        "page_id": page_id,  # ページの一意識別子
+                        "type": page_info.get("type", "file"),  # ドキュメントタイプ（page、database、fileなど）
+                    }
+
+                    # Notion固有のプロパティを追加
+                    if source_type == "notion":  # Notionの場合
+                        file_metadata["url"] = page_info.get("properties", {}).get(  # NotionWebページのURLを追加
+                            "url"
+                        )
+                    # Google Drive固有のプロパティを追加
+                    elif source_type == "google_drive":  # Google Driveの場合
+                        props = page_info.get("properties", {})  # プロパティ辞書を取得
+                        file_metadata["drive_link"] = props.get("drive_link")  # Google Driveの共有リンク
+                        file_metadata["modified_time"] = props.get("modified_time")  # 最終更新日時
 
                 # メタデータが見つからない場合は基本情報のみ
                 if not file_metadata:  # metadata.jsonにこのファイルの情報がない場合
@@ -127,14 +382,13 @@ def load_documents_from_directory(directory: str, source_type: str) -> List[Docu
                         "file_path": filepath,  # ファイルパス
                     }
 
-                # parent_titlesリストをJSON文字列に変換（ChromaDBのメタデータ制限対応）
-                if "parent_titles" in file_metadata and isinstance(  # parent_titlesキーが存在し、かつ
-                    file_metadata["parent_titles"], list  # リスト型である場合
-                ):
-                    file_metadata["parent_titles_json"] = json.dumps(  # JSON文字列に変換して新しいキーに保存
-                        file_metadata["parent_titles"], ensure_ascii=False  # 日本語をそのまま保存
-                    )
-                    del file_metadata["parent_titles"]  # 元のリスト型のキーを削除（ChromaDBはリストを受け付けない）
+                # ChromaDBが受け付ける型（str/int/float/bool）だけに揃える（ChromaDBのメタデータ制限対応）
+                # Noneのキーは除き、それ以外の型は文字列に変換する
+                file_metadata = {
+                    key: value if isinstance(value, (str, int, float, bool)) else str(value)
+                    for key, value in file_metadata.items()
+                    if value is not None
+                }
 
                 # Documentオブジェクトを作成
                 doc = Document(page_content=content, metadata=file_metadata)  # LangChainのDocumentオブジェクトを作成
@@ -148,6 +402,31 @@ def load_documents_from_directory(directory: str, source_type: str) -> List[Docu
     return documents  # 読み込んだ全ドキュメントを返す
 
 
+@functools.lru_cache(maxsize=None)
+def get_splitter(doc_type: str):
+    """
+    ドキュメントタイプに対応するテキストスプリッターを取得（プロセスごとに一度だけ作成）
+    スプリッターは状態を持たないため全ドキュメントで共有する。
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter  # テキストを再帰的にチャンク分割
+
+    return RecursiveCharacterTextSplitter(**SPLITTER_SETTINGS[doc_type])
+
+
+def _split_one(payload: Tuple[str, str]) -> List[str]:
+    """
+    1ドキュメントの本文をタイプに応じたスプリッターで分割（プロセスプールのワーカーで実行）
+
+    Args:
+        payload: (本文, ドキュメントタイプ) のタプル
+
+    Returns:
+        チャンク本文のリスト
+    """
+    text, doc_type = payload
+    return get_splitter(doc_type).split_text(text)
+
+
 def split_documents(documents: List[Document]) -> List[Document]:
     """
     ドキュメントをチャンクに分割（最適化版）
@@ -168,95 +447,269 @@ def split_documents(documents: List[Document]) -> List[Document]:
     for doc in documents:
         # ドキュメントタイプを判定（メタデータやタイトルから推測）
         title = doc.metadata.get("title", "")
-        file_path = doc.metadata.get("file_path", "")
-        content = doc.page_content.lower()  # 内容を小文字化して判定用
+        head = doc.page_content[:500]  # 判定には先頭500文字だけを使う（全文のコピーを作らない）
         
         # ドキュメントタイプの判定と適切なスプリッターの選択
-        if "就業規則" in title or "規程" in title or "第一条" in content[:500]:
-            # 法的文書・就業規則用のスプリッター
-            # 条文単位で分割し、意味のまとまりを保持
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=600,  # 小さめのチャンク（条文は短いため）
-                chunk_overlap=50,  # 少なめのオーバーラップ（条文は独立性が高い）
-                separators=[
-                    "\n第",  # 条文の区切り（「第１条」「第２条」など）
-                    "\n（",   # 項目の区切り（「（目的）」「（定義）」など）
-                    "\n\n",   # 段落の区切り
-                    "。\n",   # 文末で改行
-                    "。",     # 句点
-                    "",       # 最終手段
-                ],
-                length_function=len,
-            )
-            doc.metadata["doc_type"] = "legal"  # ドキュメントタイプをメタデータに記録
-            
-        elif "労働" in title or "勤務" in title or "休暇" in title:
-            # 労務関連文書用のスプリッター
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=700,  # 中程度のチャンク
-                chunk_overlap=100,  # 適度なオーバーラップ
-                separators=[
-                    "\n##",   # マークダウンのセクション
-                    "\n\n",   # 段落
-                    "\n",     # 改行
-                    "。",     # 句点
-                    "",       # 最終手段
-                ],
-                length_function=len,
-            )
-            doc.metadata["doc_type"] = "hr"  # HR（人事・労務）文書
-            
+        if _LEGAL_TITLE_RE.search(title) or "第一条" in head:
+            doc_type = "legal"  # 法的文書・就業規則
+        elif _HR_TITLE_RE.search(title):
+            doc_type = "hr"  # HR（人事・労務）文書
         else:
-            # 一般文書用のスプリッター（デフォルト）
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=800,  # 標準サイズ
-                chunk_overlap=150,  # 標準オーバーラップ
-                separators=["\n\n", "\n", "。", ".", " ", ""],
-                length_function=len,
-            )
-            doc.metadata["doc_type"] = "general"  # 一般文書
-        
-        # ドキュメントを分割
-        doc_chunks = text_splitter.split_documents([doc])
+            doc_type = "general"  # 一般文書
+        doc.metadata["doc_type"] = doc_type  # ドキュメントタイプをメタデータに記録
+    
+    # ドキュメントの分割はCPU処理のためプロセスプールで並列に実行
+    # ワーカーには (本文, タイプ) だけを渡し、Documentの組み立てはメインプロセスで行う
+    payloads = [(doc.page_content, doc.metadata["doc_type"]) for doc in documents]
+    with ProcessPoolExecutor(max_workers=SPLIT_WORKERS) as executor:
+        chunk_texts_per_doc = list(executor.map(_split_one, payloads, chunksize=8))
+    
+    global_idx = 0  # 全体を通したチャンクインデックス
+    type_counts = {"legal": 0, "hr": 0, "general": 0}  # ドキュメントタイプ別のチャンク数
+    for doc, chunk_texts in zip(documents, chunk_texts_per_doc):
+        type_counts[doc.metadata["doc_type"]] += len(chunk_texts)
         
         # 各チャンクに追加情報を付与
-        for j, chunk in enumerate(doc_chunks):
+        for j, text in enumerate(chunk_texts):
+            chunk = Document(page_content=text, metadata=dict(doc.metadata))
             # 元のドキュメント内でのチャンク位置
             chunk.metadata["chunk_index_in_doc"] = j
-            chunk.metadata["total_chunks_in_doc"] = len(doc_chunks)
-            chunk.metadata["chunk_size"] = len(chunk.page_content)
+            chunk.metadata["total_chunks_in_doc"] = len(chunk_texts)
+            chunk.metadata["chunk_size"] = len(text)
             
             # キーワードを自動抽出してメタデータに追加（検索精度向上）
-            keywords = []
-            keyword_patterns = [
-                "有給休暇", "年次有給休暇", "特別休暇",
-                "フレックスタイム", "コアタイム",
-                "時間外労働", "残業", "休日出勤",
-                "就業規則", "労働契約", "給与", "賞与",
-            ]
-            chunk_content_lower = chunk.page_content.lower()
-            for keyword in keyword_patterns:
-                if keyword.lower() in chunk_content_lower:
-                    keywords.append(keyword)
+            keywords = extract_keywords(text)
             
             if keywords:
                 chunk.metadata["keywords"] = ",".join(keywords)
-        
-        split_docs.extend(doc_chunks)
-    
-    # 全体を通したチャンクインデックスを付与
-    for i, doc in enumerate(split_docs):
-        doc.metadata["global_chunk_index"] = i
+            
+            # 全体を通したチャンクインデックスを付与（分割後にもう一度走査しない）
+            chunk.metadata["global_chunk_index"] = global_idx
+            global_idx += 1
+            
+            split_docs.append(chunk)
     
     print(f"  🔄 チャンク分割完了:")
-    print(f"     - 法的文書: {sum(1 for d in split_docs if d.metadata.get('doc_type') == 'legal')} チャンク")
-    print(f"     - HR文書: {sum(1 for d in split_docs if d.metadata.get('doc_type') == 'hr')} チャンク")
-    print(f"     - 一般文書: {sum(1 for d in split_docs if d.metadata.get('doc_type') == 'general')} チャンク")
+    print(f"     - 法的文書: {type_counts['legal']} チャンク")
+    print(f"     - HR文書: {type_counts['hr']} チャンク")
+    print(f"     - 一般文書: {type_counts['general']} チャンク")
 
     return split_docs  # 分割済みドキュメントを返す
 
 
-def create_or_update_vectorstore(documents: List[Document]) -> Chroma:
+def _make_batches(documents: List[Document], encoding) -> List[Tuple[List[Document], int]]:
+    """
+    チャンクを埋め込みAPIの1リクエスト分ずつのバッチにまとめる
+
+    件数がEMBEDDING_BATCH_SIZE、合計トークン数がEMBEDDING_MAX_BATCH_TOKENSを
+    超えないようにまとめる。
+
+    Returns:
+        (チャンクのリスト, バッチの合計トークン数) のリスト
+    """
+    token_counts = [len(t) for t in encoding.encode_ordinary_batch([d.page_content for d in documents])]
+
+    batches = []  # 完成したバッチのリスト
+    batch, batch_tokens = [], 0  # 作成中のバッチとそのトークン数
+    for doc, tokens in zip(documents, token_counts):
+        if batch and (len(batch) >= EMBEDDING_BATCH_SIZE or batch_tokens + tokens > EMBEDDING_MAX_BATCH_TOKENS):
+            batches.append((batch, batch_tokens))
+            batch, batch_tokens = [], 0
+        batch.append(doc)
+        batch_tokens += tokens
+    if batch:
+        batches.append((batch, batch_tokens))
+    return batches
+
+
+def _chunk_id(doc: Document) -> str:
+    """
+    チャンクの固定IDを生成（ファイルパスとドキュメント内のチャンク位置から決まる）
+    再実行時も同じIDになるため、upsertで既存のチャンクが上書きされる。
+    """
+    key = f"{doc.metadata.get('file_path', '')}\0{doc.metadata.get('chunk_index_in_doc', 0)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+# _chunk_idで生成したID（SHA-1の16進40文字）の形式
+# これ以外のIDは固定IDに移行する前のインデックス（uuid）で登録されたチャンク
+_CHUNK_ID_RE = re.compile(r"[0-9a-f]{40}")
+
+
+def _find_stale_chunks(collection, documents: List[Document]) -> List[str]:
+    """
+    今回のチャンクに含まれないIDで登録済みのチャンクのIDを返す
+
+    固定IDのupsertでは上書きされず残ってしまう以下のチャンクを対象とする:
+    - 今回インデックスしたファイルの、現在のチャンク数より後ろの位置のチャンク（ファイルが短くなった場合）
+    - ファイル自体が削除されたチャンク
+    - 固定IDに移行する前のインデックスで、uuidのIDで登録されたチャンク（同じ内容が固定IDで再登録されるため）
+    """
+    current_ids = {_chunk_id(d) for d in documents}
+    current_paths = {d.metadata.get("file_path") for d in documents}
+
+    # 登録済みのIDとファイルパスを一定件数ずつ取得
+    stale_ids = []
+    offset = 0
+    while True:
+        result = collection.get(limit=EMBEDDING_BATCH_SIZE, offset=offset, include=["metadatas"])
+        if not result["ids"]:
+            break
+        for chunk_id, metadata in zip(result["ids"], result["metadatas"]):
+            if chunk_id in current_ids:
+                continue
+            file_path = (metadata or {}).get("file_path")
+            if (
+                file_path in current_paths  # 今回インデックスしたファイルの古い位置のチャンク
+                or not _CHUNK_ID_RE.fullmatch(chunk_id)  # 移行前のuuidのチャンク
+                or (file_path and not os.path.exists(file_path))  # 削除されたファイルのチャンク
+            ):
+                stale_ids.append(chunk_id)
+        offset += len(result["ids"])
+    return stale_ids
+
+
+# 他のファイルの追加・削除だけで値が変わる位置依存のメタデータ（変更判定では比較しない）
+_POSITION_METADATA_KEYS = ("global_chunk_index",)
+
+
+def _content_key(text: str, metadata: Optional[dict]) -> Tuple[str, dict]:
+    """変更判定に使う (本文, 位置依存の項目を除いたメタデータ) を返す"""
+    metadata = {k: v for k, v in (metadata or {}).items() if k not in _POSITION_METADATA_KEYS}
+    return text, metadata
+
+
+def _drop_unchanged(collection, documents: List[Document]) -> List[Document]:
+    """コレクションに同じID・本文・メタデータで登録済みのチャンクを除いたリストを返す"""
+    ids = [_chunk_id(d) for d in documents]
+    existing = {}  # ID → (本文, メタデータ)
+    for i in range(0, len(ids), EMBEDDING_BATCH_SIZE):
+        result = collection.get(ids=ids[i:i + EMBEDDING_BATCH_SIZE], include=["documents", "metadatas"])
+        for chunk_id, text, metadata in zip(result["ids"], result["documents"], result["metadatas"]):
+            existing[chunk_id] = _content_key(text, metadata)
+    return [
+        d for d, chunk_id in zip(documents, ids)
+        if existing.get(chunk_id) != _content_key(d.page_content, d.metadata)
+    ]
+
+
+async def _embed_batch(client: AsyncOpenAI, batch: List[Document]) -> Tuple[List[str], List[List[float]], List[dict], List[str]]:
+    """
+    1バッチ分のチャンクを1回のAPIリクエストでベクトル化
+
+    Returns:
+        collection.upsertにそのまま渡せる (ids, embeddings, metadatas, documents) のタプル
+    """
+    texts = [d.page_content for d in batch]
+    response = await client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+    return (
+        [_chunk_id(d) for d in batch],
+        [item.embedding for item in response.data],
+        [d.metadata for d in batch],
+        texts,
+    )
+
+
+async def _embed_all(collection, documents: List[Document]) -> int:
+    """
+    全チャンクの埋め込みを生成してChromaDBのコレクションに追加
+
+    チャンクのIDは固定のためupsertで登録し、登録済みで変更のないチャンクは
+    スキップする。キャッシュ済みのチャンクは保存済みのベクトルをそのまま使い、
+    それ以外だけをAsyncOpenAIで直接ベクトル化してコレクションに登録する。
+    同時リクエスト数はEMBEDDING_CONCURRENCY、送信トークン数は
+    EMBEDDING_TOKENS_PER_MINUTEで制限する。
+    今回のチャンクに含まれなくなったIDのチャンクは、全てのバッチの登録に
+    成功した場合にのみ最後に削除する（途中で失敗してもインデックスが空にならない）。
+
+    Args:
+        collection: ChromaDBのコレクション
+        documents: ベクトル化するチャンクのリスト
+
+    Returns:
+        実際にコレクションへ登録したチャンク数
+    """
+    # ファイルの縮小・削除や旧形式のIDで残っているチャンクを先に洗い出す（削除は最後）
+    stale_ids = _find_stale_chunks(collection, documents)
+
+    # 登録済みで変更のないチャンクはスキップ
+    changed = _drop_unchanged(collection, documents)
+    if len(changed) < len(documents):
+        print(f"  ⏭️  変更のないチャンクをスキップ: {len(documents) - len(changed)} チャンク")
+    documents = changed
+
+    upserted = 0  # 登録に成功したチャンク数
+    all_succeeded = True  # 全バッチが成功したか（失敗があれば不要チャンクを削除しない）
+
+    if documents:
+        cache = _EmbeddingCache(EMBEDDING_CACHE_PATH)
+        try:
+            # キャッシュにあるチャンク（hits）とAPIで生成するチャンク（misses）に分ける
+            keys = [cache.key(d.page_content) for d in documents]
+            cached = cache.get_many(keys)
+            hits = [(d, cached[k]) for d, k in zip(documents, keys) if k in cached]
+            misses = [d for d, k in zip(documents, keys) if k not in cached]
+
+            if hits:
+                print(f"  💾 キャッシュ済みの埋め込みを使用: {len(hits)} チャンク")
+                for i in range(0, len(hits), EMBEDDING_BATCH_SIZE):
+                    batch = hits[i:i + EMBEDDING_BATCH_SIZE]
+                    collection.upsert(
+                        ids=[_chunk_id(d) for d, _ in batch],
+                        embeddings=[embedding for _, embedding in batch],
+                        metadatas=[d.metadata for d, _ in batch],
+                        documents=[d.page_content for d, _ in batch],
+                    )
+                    upserted += len(batch)
+
+            if misses:
+                batches = _make_batches(misses, _get_encoding(EMBEDDING_MODEL))
+                total_batches = len(batches)
+                semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)  # 同時リクエスト数の上限
+                rate_limiter = _TokenRateLimiter(EMBEDDING_TOKENS_PER_MINUTE)  # トークン数のレート制限
+
+                # 全バッチで1つのHTTPクライアントを共有（keep-aliveで接続を再利用）
+                async with new_async_client() as http_client:
+                    client = AsyncOpenAI(http_client=http_client)
+
+                    async def process_batch(batch_no: int, batch: List[Document], batch_tokens: int) -> bool:
+                        """1バッチを登録し、成功したかどうかを返す"""
+                        async with semaphore:
+                            print(f"  ⏳ バッチ {batch_no}/{total_batches}: {len(batch)} チャンクを処理中...")
+                            # レート上限に達している場合のみ待機
+                            await rate_limiter.acquire(batch_tokens)
+                            try:
+                                ids, embeddings, metadatas, texts = await _embed_batch(client, batch)
+                                collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=texts)
+                                cache.put_many(zip((cache.key(t) for t in texts), embeddings))
+                                print(f"     ✅ バッチ {batch_no} 完了")
+                                return True
+                            except Exception as e:
+                                print(f"     ❌ バッチ {batch_no} エラー: {e}")
+                                # エラーが発生しても他のバッチは継続（一部のチャンクが失敗しても全体を止めない）
+                                return False
+
+                    results = await asyncio.gather(
+                        *(process_batch(no, batch, tokens) for no, (batch, tokens) in enumerate(batches, 1))
+                    )
+                    upserted += sum(len(batch) for (batch, _), ok in zip(batches, results) if ok)
+                    all_succeeded = all(results)
+        finally:
+            cache.close()
+
+    # 全チャンクの登録に成功した場合のみ不要になったチャンクを削除
+    if stale_ids:
+        if all_succeeded:
+            for i in range(0, len(stale_ids), EMBEDDING_BATCH_SIZE):
+                collection.delete(ids=stale_ids[i:i + EMBEDDING_BATCH_SIZE])
+            print(f"  🗑️  不要になったチャンクを削除: {len(stale_ids)} チャンク")
+        else:
+            print(f"  ⚠️  失敗したバッチがあるため不要なチャンクの削除をスキップ: {len(stale_ids)} チャンク")
+
+    return upserted
+
+
+def create_or_update_vectorstore(documents: List[Document]) -> "Chroma":
     """
     ChromaDBのベクトルストアを作成または更新
     バッチ処理でトークン制限を回避
@@ -267,100 +720,30 @@ def create_or_update_vectorstore(documents: List[Document]) -> Chroma:
     Returns:
         Chromaベクトルストアインスタンス
     """
-    # ChromaDBが受け付けない複雑なメタデータをフィルタリング
-    # リスト、辞書、Noneなどを除去し、str/int/float/boolのみを残す
-    documents = filter_complex_metadata(documents)  # ChromaDBが処理できる形式にメタデータをクリーンアップ
-
-    # OpenAI Embeddingsを初期化
-    embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)  # OpenAIの埋め込みモデルを初期化
+    # メタデータはload_documents_from_directoryとsplit_documentsで
+    # ChromaDBが受け付ける型（str/int/float/bool）だけを設定済み
 
-    # バッチサイズの設定（トークン制限を考慮）
-    # text-embedding-ada-002は最大8191トークン/リクエスト、最大300,000トークン/分
-    # 安全のため、1バッチあたり100チャンクに制限
-    BATCH_SIZE = 100  # 1回のAPIリクエストで処理するチャンク数
+    from langchain_chroma import Chroma  # ChromaDBベクトルデータベースの操作
 
-    # 既存のベクトルストアがあるかチェック
-    vectorstore = None  # ベクトルストアオブジェクトを初期化
+    # OpenAI Embeddingsを取得（検索時のクエリのベクトル化に使用）
+    embeddings = get_embeddings()  # 接続を共有する埋め込みモデルを取得
 
     if os.path.exists(CHROMA_PERSIST_DIRECTORY):  # ChromaDBの保存ディレクトリが既に存在する場合
         print(f"\n📂 既存のベクトルストアを更新: {CHROMA_PERSIST_DIRECTORY}")
-
-        # 既存のベクトルストアを読み込む
-        vectorstore = Chroma(  # ChromaDBインスタンスを作成
-            collection_name=CHROMA_COLLECTION_NAME,  # コレクション名を指定
-            embedding_function=embeddings,  # 埋め込み関数を指定
-            persist_directory=CHROMA_PERSIST_DIRECTORY,  # 保存ディレクトリを指定
-        )
-
-        # バッチごとに新しいドキュメントを追加
-        if documents:  # 追加するドキュメントがある場合
-            total_docs = len(documents)  # ドキュメントの総数をカウント
-            for i in range(0, total_docs, BATCH_SIZE):  # BATCH_SIZEごとにループ
-                batch_end = min(i + BATCH_SIZE, total_docs)  # バッチの終了位置を計算（最後のバッチは小さい可能性）
-                batch = documents[i:batch_end]  # 現在のバッチを切り出し
-
-                print(  # 進捗表示
-                    f"  ⏳ バッチ {i//BATCH_SIZE + 1}/{(total_docs-1)//BATCH_SIZE + 1}: {len(batch)} チャンクを処理中..."  # バッチ番号/総バッチ数: チャンク数
-                )
-
-                try:  # エラー処理開始
-                    vectorstore.add_documents(batch)  # バッチをベクトルストアに追加
-                    print(f"     ✅ 完了")  # 成功メッセージ
-                except Exception as e:  # エラーが発生した場合
-                    print(f"     ❌ エラー: {e}")  # エラーメッセージを表示
-                    # エラーが発生してもバッチ処理を継続（一部のチャンクが失敗しても全体を止めない）
-                    continue  # 次のバッチに進む
-
-                # APIレート制限対策のため、バッチ間で少し待機
-                if batch_end < total_docs:  # 最後のバッチでない場合
-                    time.sleep(1)  # 1秒待機（OpenAI APIのレート制限を避ける）
-
-            print(f"  ➕ {total_docs} 個のチャンクを追加完了")  # 追加完了メッセージ
     else:  # ChromaDBがまだ存在しない場合（初回実行）
         print(f"\n🆕 新規ベクトルストアを作成: {CHROMA_PERSIST_DIRECTORY}")
 
-        # 新規作成（最初のバッチで作成）
-        if documents:  # ドキュメントがある場合
-            total_docs = len(documents)  # ドキュメントの総数をカウント
-
-            # 最初のバッチでベクトルストアを作成
-            first_batch_size = min(BATCH_SIZE, total_docs)  # 最初のバッチサイズを計算（BATCH_SIZEまたは総数の小さい方）
-            first_batch = documents[:first_batch_size]  # 最初のバッチを切り出し
-
-            print(  # 進捗表示
-                f"  ⏳ バッチ 1/{(total_docs-1)//BATCH_SIZE + 1}: {len(first_batch)} チャンクを作成中..."  # 最初のバッチ情報
-            )
-
-            vectorstore = Chroma.from_documents(  # ChromaDBを新規作成（from_documentsメソッド使用）
-                documents=first_batch,  # 最初のバッチのドキュメント
-                embedding=embeddings,  # 埋め込みモデル
-                collection_name=CHROMA_COLLECTION_NAME,  # コレクション名
-                persist_directory=CHROMA_PERSIST_DIRECTORY,  # 保存ディレクトリ
-            )
-            print(f"     ✅ 完了")  # 作成完了メッセージ
-
-            # 残りのドキュメントをバッチで追加
-            for i in range(first_batch_size, total_docs, BATCH_SIZE):  # 2番目以降のバッチを処理
-                batch_end = min(i + BATCH_SIZE, total_docs)  # バッチの終了位置を計算
-                batch = documents[i:batch_end]  # 現在のバッチを切り出し
-
-                print(  # 進捗表示
-                    f"  ⏳ バッチ {i//BATCH_SIZE + 1}/{(total_docs-1)//BATCH_SIZE + 1}: {len(batch)} チャンクを追加中..."  # バッチ情報
-                )
-
-                try:  # エラー処理開始
-                    vectorstore.add_documents(batch)  # バッチをベクトルストアに追加
-                    print(f"     ✅ 完了")  # 成功メッセージ
-                except Exception as e:  # エラーが発生した場合
-                    print(f"     ❌ エラー: {e}")  # エラーメッセージを表示
-                    # エラーが発生してもバッチ処理を継続（一部のチャンクが失敗しても全体を止めない）
-                    continue  # 次のバッチに進む
-
-                # APIレート制限対策のため、バッチ間で少し待機
-                if batch_end < total_docs:  # 最後のバッチでない場合
-                    time.sleep(1)  # 1秒待機（OpenAI APIのレート制限を避ける）
-
-            print(f"  ✅ {total_docs} 個のチャンクを作成完了")  # 作成完了メッセージ
+    # ベクトルストアを開く（存在しない場合は空のコレクションが作成される）
+    vectorstore = Chroma(  # ChromaDBインスタンスを作成
+        collection_name=CHROMA_COLLECTION_NAME,  # コレクション名を指定
+        embedding_function=embeddings,  # 埋め込み関数を指定
+        persist_directory=CHROMA_PERSIST_DIRECTORY,  # 保存ディレクトリを指定
+    )
+
+    # バッチに分けて並列に埋め込みを生成し追加
+    if documents:  # 追加するドキュメントがある場合
+        upserted = asyncio.run(_embed_all(vectorstore._collection, documents))
+        print(f"  ➕ {upserted} 個のチャンクを追加完了")  # 追加完了メッセージ
 
     return vectorstore  # 作成または更新したベクトルストアを返す
 
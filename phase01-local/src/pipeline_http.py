@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+パイプライン共通のHTTPクライアント
+data_loader_notion.py（Notion API）とindexer.py（OpenAI API）で
+接続プールの設定を共有し、keep-aliveで接続を使い回す。
+
+h2パッケージがインストールされている場合はHTTP/2で接続し、
+1本のTCP/TLS接続上で複数のリクエストを多重化する。
+"""
+
+import atexit
+import functools
+import httpx
+
+# HTTP/2対応（オプション）- 未インストールの場合はHTTP/1.1で接続
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 接続プールの上限（全ホスト合計の接続数と、待機中に保持するkeep-alive接続数）
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+# リクエストのタイムアウト秒数
+HTTP_TIMEOUT = 60.0
+
+
+@functools.lru_cache(maxsize=1)
+def get_shared_client() -> httpx.Client:
+    """
+    プロセス全体で共有する同期HTTPクライアントを取得（初回呼び出し時に一度だけ作成）
+    プロセス終了時に自動的にクローズされる。
+    """
+    client = httpx.Client(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    atexit.register(client.close)
+    return client
+
+
+def new_async_client() -> httpx.AsyncClient:
+    """
+    共通設定の非同期HTTPクライアントを作成
+
+    httpx.AsyncClientは作成後に使用したイベントループに紐づくため、
+    asyncio.run()ごとに作成し、呼び出し側でacloseする。
+    """
+    return httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
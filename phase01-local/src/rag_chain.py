@@ -12,9 +12,18 @@ ChromaDBから関連ドキュメントを検索し、LLMで回答を生成する
 
 # 標準ライブラリのインポート
 import os  # OS関連の操作（環境変数の取得など）
+import itertools  # ソース情報を必要な件数だけ取り出すため
+import math  # 距離から類似度スコアへの換算用
+from collections import (
+    OrderedDict,
+    deque,
+)  # 検索結果のLRUキャッシュとプロンプト用の直近の会話履歴（先頭から取り除くため）
 from typing import (
     List,
+    Callable,
     Dict,
+    Iterable,
+    Iterator,
     Optional,
     Tuple,
 )  # 型ヒント用（リスト、辞書、オプション、タプル）
@@ -26,12 +35,10 @@ from langchain_openai import (
     OpenAIEmbeddings,
     ChatOpenAI,
 )  # OpenAIの埋め込みモデルとチャットモデル
-from langchain_chroma import Chroma  # ChromaDBベクトルデータベース操作
+import chromadb  # ChromaDBベクトルデータベース操作（LangChainのラッパーを通さず直接使用）
 from langchain.schema import (
     Document,
     BaseMessage,
-    HumanMessage,
-    AIMessage,
     SystemMessage,
 )  # LangChainの基本スキーマ
 from langchain.prompts import (
@@ -41,7 +48,9 @@ from langchain.prompts import (
 from langchain.chains import (
     ConversationalRetrievalChain,
 )  # 会話型検索チェーン（未使用だが互換性のため残す）
-from langchain.memory import ConversationBufferMemory  # 会話履歴を保持するメモリ
+from langchain.memory import (
+    ConversationSummaryBufferMemory,
+)  # 古い会話を要約し、直近の会話はそのまま保持するメモリ
 from langchain_core.prompts import (
     PromptTemplate,
 )  # コアプロンプトテンプレート（未使用だが互換性のため残す）
@@ -65,6 +74,7 @@ from config import config
 # ChromaDBの設定
 CHROMA_PERSIST_DIRECTORY = config.chromadb['persist_directory']
 CHROMA_COLLECTION_NAME = config.chromadb['collection_name']
+CHROMA_SEARCH_EF = config.chromadb.get('search_ef', 64)  # HNSWの検索時の探索幅
 
 # OpenAI Embeddingモデル（テキストをベクトルに変換するモデル）
 EMBEDDING_MODEL = config.embedding['model']
@@ -78,21 +88,116 @@ LLM_MAX_TOKENS = config.llm['max_tokens']
 RETRIEVER_K = config.retriever['k']
 RETRIEVER_SCORE_THRESHOLD = config.retriever['score_threshold']
 
+# 会話履歴としてそのまま保持するトークン数の上限（超えた分は要約に畳み込む）
+MEMORY_MAX_TOKEN_LIMIT = 500
+
+# 検索結果キャッシュの最大件数（同じ質問の再検索でEmbedding APIとChromaDBを呼ばない）
+RETRIEVAL_CACHE_SIZE = 256
+
+
+# プロンプトテンプレート（LLMへの指示文、{変数}は実行時に置換される）
+SYSTEM_TEMPLATE = """あなたは親切で知識豊富なアシスタントです。
+以下のコンテキスト情報を使用して、ユーザーの質問に正確かつ詳細に回答してください。
+
+回答の際は以下の点に注意してください：
+1. コンテキストに基づいて回答すること
+2. コンテキストに情報がない場合は、その旨を明確に伝えること
+3. 推測や憶測は避け、事実に基づいた回答をすること
+4. 必要に応じて、関連する追加情報も提供すること
+5. 日本語で丁寧に回答すること
+
+コンテキスト:
+{context}
+
+会話履歴:
+{chat_history}
+
+質問: {question}
+
+回答:"""
+
+# テンプレート文字列から作成したプロンプトオブジェクト（全インスタンスで共有）
+_PROMPT = ChatPromptTemplate.from_template(SYSTEM_TEMPLATE)
+
+
+def _format_docs(docs: List[Document]) -> str:
+    """検索されたドキュメントを文字列に変換（プロンプトに含めるため）"""
+    formatted_docs = []  # フォーマット済みドキュメントを格納するリスト
+    for i, doc in enumerate(docs, 1):  # 各ドキュメントを1から番号付けでループ
+        source = doc.metadata.get(
+            "source", "不明"
+        )  # メタデータからソース取得（デフォルト：不明）
+        title = doc.metadata.get(
+            "title", "無題"
+        )  # メタデータからタイトル取得（デフォルト：無題）
+        content = doc.page_content  # ドキュメントの実際の内容テキスト
+
+        formatted_docs.append(  # フォーマット済みテキストをリストに追加
+            f"【ドキュメント {i}】\n"  # ドキュメント番号
+            f"ソース: {source}\n"  # ソース情報（NotionまたはGoogle Drive）
+            f"タイトル: {title}\n"  # ドキュメントのタイトル
+            f"内容:\n{content}\n"  # ドキュメントの内容
+        )
+
+    return "\n---\n".join(
+        formatted_docs
+    )  # 各ドキュメントを「---」で区切って結合
+
+
+def _relevance_score_fn(space: str) -> Callable[[float], float]:
+    """
+    ChromaDBの距離を類似度スコア（高いほど類似）に換算する関数を選択
+    （langchain_chromaのsimilarity_score_thresholdと同じ換算方法）
+
+    Args:
+        space: コレクションの距離関数（"l2", "cosine", "ip"）
+
+    Returns:
+        距離を受け取り類似度スコアを返す関数
+    """
+    if space == "cosine":  # コサイン距離（0-2）
+        return lambda distance: 1.0 - distance
+    if space == "ip":  # 内積
+        return lambda distance: 1.0 - distance if distance > 0 else -1.0 * distance
+    # ユークリッド距離（正規化済みベクトルでは0-√2）
+    return lambda distance: 1.0 - distance / math.sqrt(2)
+
+
+def _iter_sources(
+    retrieved_docs: Iterable[Tuple[Document, float]],
+) -> Iterator[Dict]:
+    """検索結果からソース情報の辞書を1件ずつ作成（必要な件数だけ作れるようにジェネレータにする）"""
+    for doc, score in retrieved_docs:
+        metadata = doc.metadata  # 辞書の参照をローカル変数に保持
+        yield {
+            "title": metadata.get("title", "無題"),  # ドキュメントタイトル
+            "source": metadata.get("source", "不明"),  # ソース（NotionかGoogle Drive）
+            "score": float(score),  # 類似度スコア（0-1の値、高いほど関連性が高い）
+            "content_preview": doc.page_content[:200]
+            + "...",  # 内容の先頭200文字プレビュー
+        }
+
 
 class RAGChain:
     """RAGチェーンクラス - 検索拡張生成(Retrieval-Augmented Generation)の実装"""
 
     def __init__(self):
         """初期化 - RAGシステムの各コンポーネントを初期化"""
-        self.vectorstore = None  # ChromaDBベクトルストア（ドキュメントの保存先）
-        self.retriever = None  # 検索器（関連ドキュメントを検索）
+        self.collection = None  # ChromaDBのコレクション（ドキュメントの保存先）
+        self.embeddings = None  # 埋め込みモデル（質問のベクトル化に使用）
+        self.relevance_score_fn = None  # ChromaDBの距離を類似度スコア（0-1）に換算する関数
         self.llm = None  # 大規模言語モデル（回答生成用）
         self.chain = None  # RAGチェーン（検索と生成を繋ぐパイプライン）
-        self.memory = ConversationBufferMemory(  # 会話履歴を管理するメモリ
-            memory_key="chat_history",  # プロンプトテンプレート内でのキー名
-            return_messages=True,  # メッセージオブジェクトとして返す（Falseなら文字列）
-            output_key="answer",  # 出力のキー名（LLMの回答を保存）
-        )
+        self.memory = None  # 会話履歴を管理するメモリ（要約にLLMを使うため_initializeで作成）
+        self.history = []  # 画面表示・保存用の全会話履歴（要約されないまま保持）
+        self._recent_formatted = (
+            deque()
+        )  # プロンプト用にフォーマット済みの直近の会話（メモリが保持するメッセージと同期）
+
+        # 検索結果のLRUキャッシュ（インスタンスごとに作成し、clear_memoryで破棄）
+        self._search_cache: "OrderedDict[Tuple[str, int], List[Tuple[Document, float]]]" = (
+            OrderedDict()
+        )  # (正規化したクエリ, k) → 検索結果
 
         # 初期化実行（コンストラクタから自動実行）
         self._initialize()
@@ -118,29 +223,36 @@ class RAGChain:
 
         # 1. ベクトルストアの読み込み
         print("📚 ベクトルストアを読み込み中...")  # 読み込み開始メッセージ
-        embeddings = OpenAIEmbeddings(
+        self.embeddings = OpenAIEmbeddings(
             model=EMBEDDING_MODEL
         )  # OpenAI埋め込みモデルのインスタンス作成
-        self.vectorstore = Chroma(  # ChromaDBベクトルストアを初期化
-            collection_name=CHROMA_COLLECTION_NAME,  # コレクション名を指定
-            embedding_function=embeddings,  # 埋め込み関数を設定（クエリのベクトル化に使用）
-            persist_directory=CHROMA_PERSIST_DIRECTORY,  # 永続化ディレクトリを指定
-        )
+        client = chromadb.PersistentClient(
+            path=CHROMA_PERSIST_DIRECTORY
+        )  # 永続化ディレクトリを指定してChromaDBクライアントを作成
+        self.collection = client.get_collection(
+            CHROMA_COLLECTION_NAME
+        )  # indexer.pyで作成済みのコレクションを取得
+        collection = self.collection
 
         # ドキュメント数の確認（正常に読み込めたか確認）
-        collection = (
-            self.vectorstore._collection
-        )  # ChromaDBの内部コレクションオブジェクトを取得
         doc_count = collection.count()  # コレクション内のドキュメント数をカウント
         print(f"  ✅ {doc_count} 個のチャンクを読み込み完了")  # 読み込み完了メッセージ
 
-        # 2. Retrieverの設定（検索器の設定）
-        self.retriever = self.vectorstore.as_retriever(  # ベクトルストアから検索器を作成
-            search_type="similarity_score_threshold",  # 検索タイプ：類似度スコアの閾値を使用
-            search_kwargs={  # 検索パラメータの辞書
-                "k": RETRIEVER_K,  # 取得する文書の最大数（上位K件）
-                "score_threshold": RETRIEVER_SCORE_THRESHOLD,  # 類似度スコアの最小閾値（これ以上のスコアのみ返す）
-            },
+        # HNSWインデックスの検索時の探索幅を設定（M等の構築時パラメータは作成後に変更できない）
+        try:
+            collection.modify(configuration={"hnsw": {"ef_search": CHROMA_SEARCH_EF}})
+        except Exception as e:  # 古いChromaDBやHNSW以外のインデックスでは設定しない
+            print(f"  ⚠️ HNSWの探索幅を設定できませんでした: {e}")
+
+        # ウォームアップ検索（最初の質問でインデックスの読み込み待ちが発生しないようにする）
+        if doc_count > 0:
+            sample = collection.get(limit=1, include=["embeddings"])  # 次元数の合うベクトルを1件取得
+            collection.query(query_embeddings=sample["embeddings"], n_results=1)
+
+        # 2. 類似度スコアの換算関数（コレクションの距離関数に応じたものを選択）
+        # 質問のベクトル化は ask() で1回だけ行い、検索結果をそのままコンテキストにも使う
+        self.relevance_score_fn = _relevance_score_fn(
+            (collection.metadata or {}).get("hnsw:space", "l2")
         )
 
         # 3. LLMの設定（大規模言語モデルの設定）
@@ -150,30 +262,18 @@ class RAGChain:
             max_tokens=LLM_MAX_TOKENS,  # 生成する最大トークン数（回答の長さ制限）
         )
 
-        # 4. プロンプトテンプレートの作成（LLMへの指示文）
-        system_template = """あなたは親切で知識豊富なアシスタントです。
-以下のコンテキスト情報を使用して、ユーザーの質問に正確かつ詳細に回答してください。
-
-回答の際は以下の点に注意してください：
-1. コンテキストに基づいて回答すること
-2. コンテキストに情報がない場合は、その旨を明確に伝えること
-3. 推測や憶測は避け、事実に基づいた回答をすること
-4. 必要に応じて、関連する追加情報も提供すること
-5. 日本語で丁寧に回答すること
-
-コンテキスト:
-{context}
-
-会話履歴:
-{chat_history}
-
-質問: {question}
-
-回答:"""  # プロンプトテンプレート文字列（{変数}は実行時に置換される）
+        # 会話履歴メモリの作成（上限を超えた古い会話は同じLLMで要約される）
+        self.memory = ConversationSummaryBufferMemory(
+            llm=self.llm,  # 要約用のLLM（回答生成用と共有）
+            max_token_limit=MEMORY_MAX_TOKEN_LIMIT,  # そのまま保持する会話のトークン数上限
+            memory_key="chat_history",  # プロンプトテンプレート内でのキー名
+            return_messages=True,  # メッセージオブジェクトとして返す（Falseなら文字列）
+            input_key="question",  # 入力のキー名（ユーザーの質問を保存）
+            output_key="answer",  # 出力のキー名（LLMの回答を保存）
+        )
 
-        self.prompt = ChatPromptTemplate.from_template(
-            system_template
-        )  # テンプレート文字列からプロンプトオブジェクトを作成
+        # 4. プロンプトテンプレート（モジュール読み込み時に作成済みのものを共有）
+        self.prompt = _PROMPT
 
         # 5. チェーンの構築（検索と生成を繋ぐパイプライン）
         self._build_chain()  # プライベートメソッドを呼び出してチェーンを構築
@@ -181,38 +281,13 @@ class RAGChain:
     def _build_chain(self):
         """RAGチェーンを構築 - LCEL（LangChain Expression Language）を使用"""
 
-        # ドキュメントをフォーマットする内部関数
-        def format_docs(docs: List[Document]) -> str:
-            """検索されたドキュメントを文字列に変換（プロンプトに含めるため）"""
-            formatted_docs = []  # フォーマット済みドキュメントを格納するリスト
-            for i, doc in enumerate(docs, 1):  # 各ドキュメントを1から番号付けでループ
-                source = doc.metadata.get(
-                    "source", "不明"
-                )  # メタデータからソース取得（デフォルト：不明）
-                title = doc.metadata.get(
-                    "title", "無題"
-                )  # メタデータからタイトル取得（デフォルト：無題）
-                content = doc.page_content  # ドキュメントの実際の内容テキスト
-
-                formatted_docs.append(  # フォーマット済みテキストをリストに追加
-                    f"【ドキュメント {i}】\n"  # ドキュメント番号
-                    f"ソース: {source}\n"  # ソース情報（NotionまたはGoogle Drive）
-                    f"タイトル: {title}\n"  # ドキュメントのタイトル
-                    f"内容:\n{content}\n"  # ドキュメントの内容
-                )
-
-            return "\n---\n".join(
-                formatted_docs
-            )  # 各ドキュメントを「---」で区切って結合
-
         # チェーンの構築（LCEL - LangChain Expression Language使用）
+        # 入力は {"context": フォーマット済みコンテキスト, "question": 質問} の辞書
+        # （検索は ask() で済ませるため、チェーン内で質問を再度ベクトル化しない）
         self.chain = (  # パイプライン演算子（|）で処理を連結
-            {  # 辞書で複数の入力を並列処理
-                "context": self.retriever
-                | format_docs,  # 検索器で文書を取得し、フォーマット関数で文字列化
-                "chat_history": lambda x: self._format_chat_history(),  # 会話履歴をフォーマット（ラムダ関数）
-                "question": RunnablePassthrough(),  # 質問をそのまま通す（変換なし）
-            }  # この辞書がプロンプトテンプレートの変数に対応
+            RunnablePassthrough.assign(  # context・questionはそのまま通す
+                chat_history=lambda x: self._format_chat_history(),  # 会話履歴をフォーマット（ラムダ関数）
+            )  # この辞書がプロンプトテンプレートの変数に対応
             | self.prompt  # プロンプトテンプレートに辞書の値を埋め込む
             | self.llm  # LLMで回答を生成
             | StrOutputParser()  # LLMの出力を文字列として取り出す
@@ -220,24 +295,18 @@ class RAGChain:
 
     def _format_chat_history(self) -> str:
         """会話履歴をフォーマット - プロンプトに含めるための文字列化"""
-        messages = (
-            self.memory.chat_memory.messages
-        )  # メモリから会話履歴のメッセージリストを取得
-        if not messages:  # 履歴が空の場合
+        summary = (
+            self.memory.moving_summary_buffer
+        )  # 古い会話の要約（上限を超えるまでは空文字列）
+        if not summary and not self._recent_formatted:  # 履歴が空の場合
             return "（会話履歴なし）"  # デフォルトメッセージを返す
 
-        formatted = []  # フォーマット済みメッセージを格納するリスト
-        for msg in messages[-10:]:  # 直近10件まで（メモリ制限のため古いものは除外）
-            if isinstance(msg, HumanMessage):  # ユーザーのメッセージの場合
-                formatted.append(
-                    f"User: {msg.content}"
-                )  # 「User:」プレフィックスを付けて追加
-            elif isinstance(msg, AIMessage):  # AIのメッセージの場合
-                formatted.append(
-                    f"Assistant: {msg.content}"
-                )  # 「Assistant:」プレフィックスを付けて追加
-
-        return "\n".join(formatted)  # 改行で結合して1つの文字列にする
+        recent = "\n".join(
+            self._recent_formatted
+        )  # 追加時にフォーマット済みなので結合するだけ
+        if summary:  # 要約がある場合は先頭に追加
+            return f"これまでの会話の要約: {summary}\n{recent}"
+        return recent
 
     def search_similar_documents(
         self, query: str, k: int = None
@@ -255,18 +324,51 @@ class RAGChain:
         if k is None:  # k引数が指定されていない場合
             k = RETRIEVER_K  # デフォルト値（環境変数から読み込んだ値）を使用
 
-        results = self.vectorstore.similarity_search_with_score(
-            query, k=k
-        )  # ChromaDBで類似検索（スコア付き）
-        return results  # [(doc1, score1), (doc2, score2), ...] の形式で返す
+        # 前後の空白と大文字小文字の違いを無視してキャッシュを引く
+        # （正規化はキャッシュキーにのみ使い、ベクトル化には元の質問文を使う）
+        cache_key = (query.strip().lower(), k)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            self._search_cache.move_to_end(cache_key)  # 最近使った順に更新
+            return list(cached)  # キャッシュ側を書き換えられないようにコピーを返す
+
+        results = self._search_uncached(query, k)
+
+        # 検索結果をキャッシュに登録し、上限を超えたら最も古いものを破棄
+        if RETRIEVAL_CACHE_SIZE > 0:
+            self._search_cache[cache_key] = list(results)
+            if len(self._search_cache) > RETRIEVAL_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+
+        return results
+
+    def _search_uncached(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """キャッシュを通さずにChromaDBで類似検索"""
+        query_embedding = self.embeddings.embed_query(query)  # 質問をベクトル化（1回のみ）
+        response = self.collection.query(  # ベクトル化済みの質問で直接検索
+            query_embeddings=[query_embedding],  # 検索に使うベクトル
+            n_results=k,  # 取得する文書数
+            include=["documents", "metadatas", "distances"],  # 本文・メタデータ・距離
+        )
+        return [  # [(doc1, score1), (doc2, score2), ...] の形式で返す
+            (Document(page_content=text, metadata=metadata or {}), distance)
+            for text, metadata, distance in zip(
+                response["documents"][0],
+                response["metadatas"][0],
+                response["distances"][0],
+            )
+        ]
 
-    def ask(self, question: str, verbose: bool = False) -> Dict:
+    def ask(
+        self, question: str, verbose: bool = False, max_sources: Optional[int] = None
+    ) -> Dict:
         """
         質問に回答 - RAGパイプラインのメイン処理
 
         Args:
             question: ユーザーの質問文
             verbose: 詳細情報を出力するか（True: 処理状況を表示、False: 静かに処理）
+            max_sources: 結果に含めるソース情報の最大件数（Noneの場合は検索された全件）
 
         Returns:
             回答と関連情報を含む辞書（answer, sources, elapsed_time等）
@@ -296,11 +398,29 @@ class RAGChain:
         if verbose:  # 詳細モードの場合
             print(f"\n💭 回答を生成中...")  # 生成開始メッセージ
 
-        answer = self.chain.invoke(question)  # RAGチェーンを実行して回答を生成
+        # 類似度スコアが閾値以上の文書だけをコンテキストに使う
+        context_docs = [
+            doc
+            for doc, score in retrieved_docs
+            if self.relevance_score_fn(score) >= RETRIEVER_SCORE_THRESHOLD
+        ]
+        answer = self.chain.invoke(  # RAGチェーンを実行して回答を生成
+            {"context": _format_docs(context_docs), "question": question}
+        )
 
         # 会話履歴に追加（次の質問で文脈として使用される）
-        self.memory.chat_memory.add_user_message(question)  # ユーザーの質問を履歴に追加
-        self.memory.chat_memory.add_ai_message(answer)  # AIの回答を履歴に追加
+        self.memory.save_context(
+            {"question": question}, {"answer": answer}
+        )  # 質問と回答を履歴に追加（上限を超えた古い会話はここで要約される）
+        self.history.append({"role": "user", "content": question})  # 表示・保存用
+        self.history.append({"role": "assistant", "content": answer})
+
+        # プロンプト用の直近の会話に追加（フォーマットは追加時の1回だけ）
+        self._recent_formatted.append(f"User: {question}")
+        self._recent_formatted.append(f"Assistant: {answer}")
+        # メモリ側で要約に回された会話は、要約と重複しないように取り除く
+        while len(self._recent_formatted) > len(self.memory.chat_memory.messages):
+            self._recent_formatted.popleft()
 
         # 処理時間の計算
         elapsed_time = (
@@ -311,20 +431,9 @@ class RAGChain:
         result = {
             "question": question,  # 元の質問文
             "answer": answer,  # 生成された回答
-            "sources": [  # 参照したソース情報のリスト
-                {
-                    "title": doc.metadata.get("title", "無題"),  # ドキュメントタイトル
-                    "source": doc.metadata.get(
-                        "source", "不明"
-                    ),  # ソース（NotionかGoogle Drive）
-                    "score": float(
-                        score
-                    ),  # 類似度スコア（0-1の値、高いほど関連性が高い）
-                    "content_preview": doc.page_content[:200]
-                    + "...",  # 内容の先頭200文字プレビュー
-                }
-                for doc, score in retrieved_docs  # 検索された全ドキュメントを処理
-            ],
+            "sources": list(  # 参照したソース情報のリスト（上位max_sources件のみ作成）
+                itertools.islice(_iter_sources(retrieved_docs), max_sources)
+            ),
             "elapsed_time": elapsed_time,  # 処理時間（秒）
             "timestamp": datetime.now().isoformat(),  # タイムスタンプ（ISO形式）
         }
@@ -336,7 +445,10 @@ class RAGChain:
 
     def clear_memory(self):
         """会話履歴をクリア - 新しい会話を開始する際に使用"""
-        self.memory.clear()  # ConversationBufferMemoryの内容を削除
+        self.memory.clear()  # 会話履歴と要約を削除
+        self.history.clear()  # 表示・保存用の履歴も削除
+        self._recent_formatted.clear()  # プロンプト用の直近の会話も削除
+        self._search_cache.clear()  # 検索結果のキャッシュも破棄
         print("💨 会話履歴をクリアしました")  # クリア完了メッセージ
 
     def get_conversation_history(self) -> List[Dict]:
@@ -346,20 +458,8 @@ class RAGChain:
         Returns:
             会話履歴のリスト [{"role": "user/assistant", "content": "..."}]
         """
-        messages = self.memory.chat_memory.messages  # メモリから全メッセージを取得
-        history = []  # 返却用のリスト
-
-        for msg in messages:  # 各メッセージを処理
-            if isinstance(msg, HumanMessage):  # ユーザーメッセージの場合
-                history.append(
-                    {"role": "user", "content": msg.content}
-                )  # role=userで追加
-            elif isinstance(msg, AIMessage):  # AIメッセージの場合
-                history.append(
-                    {"role": "assistant", "content": msg.content}
-                )  # role=assistantで追加
-
-        return history  # 会話履歴のリストを返す
+        # メモリ側は古い会話が要約されるため、要約前の全履歴を返す
+        return list(self.history)  # 呼び出し側で変更されないようにコピーを返す
 
 
 def main():
@@ -385,8 +485,8 @@ def main():
 
             # 回答を取得
             result = rag.ask(
-                question, verbose=True
-            )  # RAGチェーンで回答生成（詳細モードON）
+                question, verbose=True, max_sources=3
+            )  # RAGチェーンで回答生成（詳細モードON、表示する上位3件のソースのみ作成）
 
             # 回答を表示
             print(f"\n📝 回答:")  # 回答セクションのヘッダー
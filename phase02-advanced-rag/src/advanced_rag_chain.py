@@ -3,13 +3,19 @@ Advanced RAG Chain - 全技術を統合
 """
 
 # 必要なライブラリのインポート
-from typing import Dict, List, Optional, Any  # 型ヒント用のライブラリ
+from typing import Dict, List, Optional, Any, AsyncIterator, Iterator, Tuple  # 型ヒント用のライブラリ
 from textwrap import dedent  # 複数行文字列のインデント調整用
 from dataclasses import dataclass  # データクラス用（設定クラスを簡潔に定義）
+from collections import OrderedDict  # 検索結果のLRUキャッシュ用
+import asyncio  # HyDEとRAG-Fusionの同時実行用
 import time  # 実行時間計測用
 import os  # 環境変数取得用
+import threading  # ループごとの接続プールの登録を保護するロック用
+import weakref  # 終了したイベントループの接続プールを自動で破棄するため
+import numpy as np  # MMRの類似度計算用
+import httpx  # OpenAI APIとのHTTP通信用（接続プールを共有）
 from dotenv import load_dotenv  # .envファイル読み込み用
-from langchain_openai import ChatOpenAI  # OpenAIのLLM
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings  # OpenAIのLLMと埋め込みモデル
 from langchain.prompts import ChatPromptTemplate  # チャット用プロンプトテンプレート
 from langchain.schema import Document  # LangChainのドキュメント型
 from loguru import logger  # ログ出力用
@@ -19,10 +25,59 @@ from hyde import HyDE  # HyDE（仮想文書生成）モジュール
 from rag_fusion import RAGFusion  # RAG-Fusion（複数クエリ生成）モジュール
 from reranker import get_reranker  # Reranker（再順位付け）モジュール
 import config  # 設定ファイル
+from document_key import document_key  # 文書の一意キー
+from sync_runner import SyncLoopRunner  # 同期APIから非同期処理を実行する専用ループ
+
+# HTTP/2対応（オプション）- 未インストールの場合はHTTP/1.1（keep-alive）で接続
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 # .envファイルから環境変数を読み込む
 load_dotenv()
 
+# OpenAI APIへの接続プールの上限（HyDE・RAG-Fusion・回答生成で共有）
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+
+class _LoopLocalAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    イベントループごとに別の接続プールを使うhttpxの非同期トランスポート
+
+    httpx.AsyncClientの接続は開いたイベントループに紐づくため、1つのプールを
+    複数のループ（同期APIの専用ループ、呼び出し側のループ、asyncio.run()のループ）で
+    使い回すと "attached to a different loop" などのエラーになる。
+    実行中のループごとにプールを遅延作成し、同じループの中でだけkeep-alive接続を再利用する。
+    """
+
+    def __init__(self, **transport_kwargs):
+        self._transport_kwargs = transport_kwargs  # AsyncHTTPTransportに渡す設定（http2, limits等）
+        self._transports = weakref.WeakKeyDictionary()  # イベントループ → 接続プール
+        self._lock = threading.Lock()
+
+    def _current_transport(self) -> httpx.AsyncHTTPTransport:
+        """実行中のイベントループ用の接続プールを取得（初回は作成）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+                self._transports[loop] = transport
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._current_transport().handle_async_request(request)
+
+    async def aclose(self):
+        """実行中のイベントループの接続プールを閉じる（他のループのものはループと共に破棄される）"""
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
 
 @dataclass  # データクラスで設定を管理
 class AdvancedRAGConfig:
@@ -36,11 +91,51 @@ class AdvancedRAGConfig:
     retrieval_k: int = 20  # 初期検索で取得する文書数
     final_k: int = 5  # 最紂的に使用する文書数
     reranker_type: str = "auto"  # Rerankerのタイプ
+    rerank_skip_margin: Optional[float] = 0.5  # RRF 1位と2位の差（1位比）がこれ以上ならRerankerを省略（Noneで常に実行）
+    mmr_lambda: Optional[float] = 0.5  # MMRの関連性と多様性のバランス（1.0で関連性のみ、NoneでMMRを使わない）
+    retrieval_cache_size: int = 256  # 検索結果をキャッシュする質問数（0でキャッシュしない）
 
 
 class AdvancedRAGChain:
     """すべてのAdvanced RAG技術を統合したチェーン"""
 
+    # 最終回答生成用のプロンプトテンプレート（クラス定義時に一度だけ作成し、全インスタンスで共有）
+    _ANSWER_PROMPT = ChatPromptTemplate.from_messages(
+        [
+            # システムメッセージ：AIアシスタントの役割と指示を定義
+            (
+                "system",
+                dedent(
+                    """
+            あなたは親切で知識豊富なAIアシスタントです。
+            与えられたコンテキストを使用して、ユーザーの質問に正確かつ詳細に答えてください。
+
+            重要な指示：
+            1. コンテキストに基づいて回答する
+            2. コンテキストにない情報は「情報が見つかりません」と明記
+            3. 技術的な内容は正確に、初心者にもわかりやすく説明
+            4. 必要に応じて例や具体例を含める
+            5. 日本語で回答する
+        """
+                ).strip(),
+            ),
+            # ユーザーメッセージ：コンテキストと質問を挿入
+            (
+                "user",
+                dedent(
+                    """
+            コンテキスト:
+            {context}
+
+            質問: {question}
+
+            回答:
+        """
+                ).strip(),
+            ),
+        ]
+    )
+
     def __init__(self, config: Optional[AdvancedRAGConfig] = None, llm: Optional[ChatOpenAI] = None):
         """
         初期化
@@ -54,10 +149,32 @@ class AdvancedRAGChain:
         # LLMを初期化（指定されなければ設定ファイルから読み込む）
         import config as cfg  # configモジュールをインポート
 
+        # OpenAI APIとのHTTPクライアントを1つずつ作成し、LLMと埋め込みモデルで共有
+        # （コンポーネントごとにTCP/TLS接続を張り直さず、keep-alive接続を使い回す）
+        self.http_client = httpx.Client(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS)
+        # 非同期クライアントの接続はイベントループごとに別のプールで管理する
+        # （ainvoke/astreamは呼び出し側のループ、retrieve_documentsは下の専用ループで動くため）
+        self.http_async_client = httpx.AsyncClient(
+            transport=_LoopLocalAsyncTransport(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS)
+        )
+
+        # 同期APIから非同期処理を呼ぶためのイベントループ
+        # asyncio.run()で毎回新しいループを作らず、このループのkeep-alive接続を使い続ける
+        self._runner = SyncLoopRunner(type(self).__name__)
+
         self.llm = llm or ChatOpenAI(
             api_key=cfg.OPENAI_API_KEY,  # APIキー
             model=cfg.LLM_MODEL,  # モデル名
             temperature=cfg.LLM_TEMPERATURE,  # 生成の多様性
+            http_client=self.http_client,  # 同期呼び出し用の共有クライアント
+            http_async_client=self.http_async_client,  # 非同期呼び出し用の共有クライアント
+        )
+        # 埋め込みモデルもHyDEとRAG-Fusionで共有する
+        self.embeddings = OpenAIEmbeddings(
+            api_key=cfg.OPENAI_API_KEY,  # APIキー
+            model=cfg.EMBEDDING_MODEL,  # モデル名
+            http_client=self.http_client,  # 同期呼び出し用の共有クライアント
+            http_async_client=self.http_async_client,  # 非同期呼び出し用の共有クライアント
         )
         # Advanced RAGの各コンポーネントを初期化
         logger.info("Initializing Advanced RAG components...")
@@ -66,7 +183,7 @@ class AdvancedRAGChain:
         self.hyde = None
         if self.config.use_hyde:  # HyDEを使用する設定の場合
             try:
-                self.hyde = HyDE()  # HyDEインスタンスを作成
+                self.hyde = HyDE(llm=self.llm, embeddings=self.embeddings)  # HyDEインスタンスを作成（LLMと埋め込みモデルを共有）
                 logger.info("HyDE initialized")
             except Exception as e:
                 # 初期化に失敗した場合は警告を出して無効化
@@ -77,7 +194,7 @@ class AdvancedRAGChain:
         self.fusion = None
         if self.config.use_fusion:  # RAG-Fusionを使用する設定の場合
             try:
-                self.fusion = RAGFusion()  # RAG-Fusionインスタンスを作成
+                self.fusion = RAGFusion(llm=self.llm, embeddings=self.embeddings)  # RAG-Fusionインスタンスを作成（LLMと埋め込みモデルを共有）
                 logger.info("RAG-Fusion initialized")
             except Exception as e:
                 # 初期化に失敗した場合は警告を出して無効化
@@ -95,50 +212,25 @@ class AdvancedRAGChain:
                 logger.warning(f"Reranker initialization failed: {e}")
                 self.config.use_reranker = False
 
+        # 検索結果のLRUキャッシュ（正規化した質問 → 文書リスト）
+        # aretrieve_documentsはコルーチンなのでlru_cacheは使えず、OrderedDictで管理する
+        self._retrieval_cache: "OrderedDict[str, List[Document]]" = OrderedDict()
+
         # 最低限一つの検索コンポーネントが必要（HyDEまたはRAG-Fusion）
         if not (self.hyde or self.fusion):
             raise ValueError("At least one retrieval method (HyDE or RAG-Fusion) must be available")
 
         # 最終回答生成用のプロンプトテンプレート
-        self.answer_prompt = ChatPromptTemplate.from_messages(
-            [
-                # システムメッセージ：AIアシスタントの役割と指示を定義
-                (
-                    "system",
-                    dedent(
-                        """
-                あなたは親切で知識豊富なAIアシスタントです。
-                与えられたコンテキストを使用して、ユーザーの質問に正確かつ詳細に答えてください。
-
-                重要な指示：
-                1. コンテキストに基づいて回答する
-                2. コンテキストにない情報は「情報が見つかりません」と明記
-                3. 技術的な内容は正確に、初心者にもわかりやすく説明
-                4. 必要に応じて例や具体例を含める
-                5. 日本語で回答する
-            """
-                    ).strip(),
-                ),
-                # ユーザーメッセージ：コンテキストと質問を挿入
-                (
-                    "user",
-                    dedent(
-                        """
-                コンテキスト:
-                {context}
-
-                質問: {question}
-
-                回答:
-            """
-                    ).strip(),
-                ),
-            ]
-        )
+        self.answer_prompt = self._ANSWER_PROMPT
+        # プロンプトとLLMを連結したチェーン（呼び出しごとに組み立て直さない）
+        self.answer_chain = self.answer_prompt | self.llm
 
-    def retrieve_documents(self, query: str) -> List[Document]:
+    async def aretrieve_documents(self, query: str) -> List[Document]:
         """
-        Advanced RAG技術を使用して文書を検索
+        Advanced RAG技術を使用して文書を検索（非同期版）
+
+        HyDEとRAG-FusionはどちらもOpenAI APIの待ち時間が大半を占めるため、
+        同時に実行し、検索時間を max(HyDE, RAG-Fusion) に短縮する
 
         Args:
             query: 検索クエリ
@@ -146,63 +238,94 @@ class AdvancedRAGChain:
         Returns:
             検索された文書のリスト
         """
-        # 検索結果を格納するデータ構造を初期化
-        all_docs = []  # すべての文書を格納するリスト
-        doc_scores = {}  # 文書ごとのスコアとソースを記録する辞書
+        # 同じ質問の検索結果がキャッシュにあれば、APIを呼ばずにそのまま返す
+        cache_key = query.strip().lower()  # 前後の空白と大文字小文字の違いを無視
+        cached = self._retrieval_cache.get(cache_key)
+        if cached is not None:
+            self._retrieval_cache.move_to_end(cache_key)  # 最近使った順に更新
+            logger.info("Retrieval cache hit")
+            return list(cached)
+
+        documents, complete = await self._aretrieve_uncached(query)
+
+        # 検索結果をキャッシュに登録し、上限を超えたら最も古いものを破棄
+        # （一部のコンポーネントが失敗した劣化結果はキャッシュしない）
+        if complete and self.config.retrieval_cache_size > 0:
+            self._retrieval_cache[cache_key] = list(documents)
+            if len(self._retrieval_cache) > self.config.retrieval_cache_size:
+                self._retrieval_cache.popitem(last=False)
 
-        # ステップ1: HyDEによる検索（仮想文書を生成して検索）
+        return documents
+
+    async def _aretrieve_uncached(self, query: str) -> Tuple[List[Document], bool]:
+        """キャッシュを通さずにHyDE・RAG-Fusion・Rerankerで文書を検索
+
+        Returns:
+            (検索された文書, 有効な全コンポーネントが成功したかどうか)
+        """
+        complete = True  # いずれかのコンポーネントが失敗したらFalse
+        # 有効なコンポーネントの検索タスクを作成
+        tasks = {}  # コンポーネント名 → コルーチン
         if self.config.use_hyde and self.hyde:
             logger.info("Executing HyDE search...")
-            try:
-                # HyDE検索を実行
-                hyde_results = self.hyde.search_with_hyde(
-                    query,  # 検索クエリ
-                    k=self.config.retrieval_k,  # 取得する文書数
-                    num_hypothetical=self.config.hyde_num_hypothetical,  # 仮想回答数
-                )
-                # 検索結果を統合リストに追加
-                for doc, score in hyde_results["results"]:
-                    doc_key = hash(doc.page_content)  # 文書の一意キーを生成
-                    if doc_key not in doc_scores:
-                        doc_scores[doc_key] = []  # スコアリストを初期化
-                        all_docs.append(doc)  # 文書を追加
-                    doc_scores[doc_key].append(("hyde", score))  # HyDEのスコアを記録
-            except Exception as e:
-                logger.error(f"HyDE search failed: {e}")
-
-        # ステップ2: RAG-Fusionによる検索（複数クエリを生成して統合）
+            tasks["hyde"] = self.hyde.asearch_with_hyde(
+                query,  # 検索クエリ
+                k=self.config.retrieval_k,  # 取得する文書数
+                num_hypothetical=self.config.hyde_num_hypothetical,  # 仮想回答数
+            )
         if self.config.use_fusion and self.fusion:
             logger.info("Executing RAG-Fusion search...")
-            try:
-                # RAG-Fusion検索を実行
-                fusion_results = self.fusion.search_with_fusion(
-                    query,  # 検索クエリ
-                    k=self.config.retrieval_k,  # 取得する文書数
-                    num_queries=self.config.fusion_num_queries,  # 生成するクエリ数
-                )
-                # 検索結果を統合リストに追加
-                for doc, score in fusion_results["results"]:
-                    doc_key = hash(doc.page_content)  # 文書の一意キーを生成
-                    if doc_key not in doc_scores:
-                        doc_scores[doc_key] = []  # スコアリストを初期化
-                        all_docs.append(doc)  # 文書を追加
-                    doc_scores[doc_key].append(("fusion", score))  # RAG-Fusionのスコアを記録
-            except Exception as e:
-                logger.error(f"RAG-Fusion search failed: {e}")
+            tasks["fusion"] = self.fusion.asearch_with_fusion(
+                query,  # 検索クエリ
+                k=self.config.retrieval_k,  # 取得する文書数
+                num_queries=self.config.fusion_num_queries,  # 生成するクエリ数
+            )
 
-        # 重複文書を除去（ハッシュ値で判定）
-        unique_docs = {}  # ユニークな文書を格納する辞書
-        for doc in all_docs:
-            doc_key = hash(doc.page_content)  # 文書内容のハッシュ値を計算
-            if doc_key not in unique_docs:
-                unique_docs[doc_key] = doc  # まだ登録されていない文書を追加
+        # 同時に実行（一方が失敗してももう一方の結果は使う）
+        outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
 
-        # 辞書からリストに変換
-        documents = list(unique_docs.values())
+        # 検索結果を格納するデータ構造を初期化
+        all_docs = {}  # 文書キー → 文書（挿入順を保持し、重複も同時に除去）
+        query_embedding = None  # 元の質問の埋め込みベクトル（MMRで使用）
+        doc_scores = {}  # 文書ごとの(ソース, 順位)を記録する辞書
+
+        # gather後に結果を統合（HyDE → RAG-Fusionの順）
+        for name, outcome in zip(tasks, outcomes):
+            if isinstance(outcome, Exception):
+                label = "HyDE" if name == "hyde" else "RAG-Fusion"
+                logger.error(f"{label} search failed: {outcome}")
+                complete = False
+                continue
+            if query_embedding is None:
+                query_embedding = outcome.get("query_embedding")
+            # HyDEは距離、RAG-FusionはRRFスコアでスケールが異なるため、順位だけを記録
+            for rank, (doc, _score) in enumerate(outcome["results"], 1):
+                doc_key = document_key(doc)  # 文書の一意キーを取得
+                if doc_key not in doc_scores:
+                    doc_scores[doc_key] = []  # 順位リストを初期化
+                    all_docs[doc_key] = doc  # 文書を追加
+                doc_scores[doc_key].append((name, rank))  # コンポーネント内の順位を記録
+
+        # Reciprocal Rank FusionでHyDEとRAG-Fusionの結果を統合
+        # 両方で上位に来た文書ほどスコアが高くなる
+        rrf_scores = {
+            doc_key: sum(1.0 / (config.FUSION_RRF_K + rank) for _, rank in ranks)
+            for doc_key, ranks in doc_scores.items()
+        }
+        ranked_keys = sorted(rrf_scores, key=rrf_scores.get, reverse=True)
+        documents = [all_docs[doc_key] for doc_key in ranked_keys]
         logger.info(f"Retrieved {len(documents)} unique documents")
 
+        # RRFの1位が2位を大きく引き離している場合はRerankerを省略
+        skip_rerank = False
+        if self.config.rerank_skip_margin is not None and len(ranked_keys) >= 2:
+            top, second = rrf_scores[ranked_keys[0]], rrf_scores[ranked_keys[1]]
+            skip_rerank = (top - second) / top >= self.config.rerank_skip_margin
+            if skip_rerank:
+                logger.info("RRF top result is decisive, skipping reranking")
+
         # ステップ3: Rerankerによる再順位付け（有効な場合）
-        if self.config.use_reranker and self.reranker and documents:
+        if self.config.use_reranker and self.reranker and documents and not skip_rerank:
             logger.info("Executing reranking...")
             try:
                 # Rerankerで再順位付け
@@ -216,29 +339,117 @@ class AdvancedRAGChain:
                 logger.info(f"Reranked to {len(documents)} documents")
             except Exception as e:
                 logger.error(f"Reranking failed: {e}")
+                complete = False
                 # 失敗した場合は元の順序を維持
                 documents = documents[: self.config.final_k]
+        elif self.config.mmr_lambda is not None and query_embedding is not None and documents:
+            # Rerankerを使用しない場合はMMRで関連性と多様性を両立した上位を取得
+            try:
+                documents = self._mmr_select(query_embedding, documents, self.config.final_k)
+            except Exception as e:
+                logger.error(f"MMR selection failed: {e}")
+                complete = False
+                documents = documents[: self.config.final_k]
         else:
-            # Rerankerを使用しない場合は単純に上位を取得
+            # MMRも使用しない場合はRRFの上位を取得
             documents = documents[: self.config.final_k]
 
-        return documents
+        return documents, complete
 
-    def generate_answer(self, query: str, documents: List[Document]) -> str:
+    def _mmr_select(self, query_embedding: List[float], documents: List[Document], k: int) -> List[Document]:
         """
-        検索された文書を基に回答を生成
+        MMR（Maximal Marginal Relevance）で文書を選択
+
+        同じ文書の隣接チャンクばかりが選ばれないように、
+        「質問との類似度」から「選択済み文書との最大類似度」を引いたスコアで順に選ぶ
 
         Args:
-            query: 質問
-            documents: 検索された文書
+            query_embedding: 元の質問の埋め込みベクトル
+            documents: 候補の文書（ChromaDBのIDを持つもの）
+            k: 選択する文書数
 
         Returns:
-            生成された回答
+            選択された文書のリスト（選択順）
         """
-        # 文書がない場合のデフォルトメッセージ
-        if not documents:
-            return "申し訳ございません。質問に関連する情報が見つかりませんでした。"
+        if len(documents) <= k:
+            return documents
+
+        # ChromaDBに保存済みの埋め込みベクトルを1回のgetでまとめて取得
+        collection = (self.hyde or self.fusion).vectorstore._collection
+        stored = collection.get(ids=[doc.id for doc in documents], include=["embeddings"])
+        # getの返却順は保証されないため、IDで並べ直す
+        vectors_by_id = dict(zip(stored["ids"], stored["embeddings"]))
+        embeddings = np.asarray([vectors_by_id[doc.id] for doc in documents], dtype=np.float32)
+
+        # 正規化してコサイン類似度を内積で計算（質問との類似度・文書間の類似度を一度に計算）
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= np.linalg.norm(query)
+        query_sims = embeddings @ query  # 形状 (N,)
+        doc_sims = embeddings @ embeddings.T  # 形状 (N, N)
+
+        # 貪欲法で1件ずつ選択
+        lambda_mult = self.config.mmr_lambda
+        selected = [int(np.argmax(query_sims))]  # 1件目は質問に最も近い文書
+        max_selected_sims = doc_sims[selected[0]].copy()  # 各候補と選択済み文書との最大類似度
+        available = np.ones(len(documents), dtype=bool)  # まだ選択されていない候補
+        available[selected[0]] = False
+        while len(selected) < k:
+            scores = lambda_mult * query_sims - (1 - lambda_mult) * max_selected_sims
+            scores[~available] = -np.inf  # 選択済みの候補を除外
+            index = int(np.argmax(scores))
+            selected.append(index)
+            available[index] = False
+            np.maximum(max_selected_sims, doc_sims[index], out=max_selected_sims)
+
+        return [documents[i] for i in selected]
+
+    def retrieve_documents(self, query: str) -> List[Document]:
+        """
+        Advanced RAG技術を使用して文書を検索（同期版）
+
+        専用のイベントループで実行するため、実行中のイベントループの中
+        （async関数やJupyter等）からは呼び出せない（RuntimeErrorになる）。
+        その場合はaretrieve_documentsをawaitすること。
+        複数スレッドから同時に呼ばれた場合は1つずつ順に実行される。
+
+        Args:
+            query: 検索クエリ
+
+        Returns:
+            検索された文書のリスト
+        """
+        return self._runner.run(self.aretrieve_documents(query))
+
+    def close(self):
+        """共有しているHTTPクライアントと同期API用のイベントループを閉じる"""
+        if self._runner.is_closed:
+            return
+        self._runner.run(self.http_async_client.aclose())
+        self._runner.close()
+        if self.hyde:
+            self.hyde.close()
+        if self.fusion:
+            self.fusion.close()
+        self.http_client.close()
+
+    def clear_cache(self):
+        """検索結果のキャッシュを破棄（ChromaDBを更新した後などに使用）"""
+        self._retrieval_cache.clear()
+
+    # 検索結果が0件の場合の回答
+    NO_DOCUMENTS_ANSWER = "申し訳ございません。質問に関連する情報が見つかりませんでした。"
+
+    def _build_context(self, documents: List[Document]) -> str:
+        """
+        検索された文書から回答生成用のコンテキストを作成
 
+        Args:
+            documents: 検索された文書
+
+        Returns:
+            プロンプトに埋め込むコンテキスト文字列
+        """
         # 検索された文書からコンテキストを作成
         context = "\n\n---\n\n".join(
             [  # 文書間の区切り文字
@@ -252,18 +463,135 @@ class AdvancedRAGChain:
             # 長すぎる場合は切り詰め
             context = context[:max_context_length] + "\n\n[以下省略...]"
 
+        return context
+
+    def _build_sources(self, documents: List[Document]) -> List[Dict[str, Any]]:
+        """
+        参照した文書の情報（メタデータと内容の抜粋）をまとめる
+
+        Args:
+            documents: 検索された文書
+
+        Returns:
+            文書ごとの情報の辞書のリスト
+        """
+        return [
+            {
+                "metadata": doc.metadata,  # ファイル名やページ番号など
+                "content_preview": doc.page_content[:200] + "...",  # 最初の200文字
+            }
+            for doc in documents
+        ]
+
+    def generate_answer(self, query: str, documents: List[Document]) -> str:
+        """
+        検索された文書を基に回答を生成
+
+        Args:
+            query: 質問
+            documents: 検索された文書
+
+        Returns:
+            生成された回答
+        """
+        # 文書がない場合のデフォルトメッセージ
+        if not documents:
+            return self.NO_DOCUMENTS_ANSWER
+
         # LLMで回答を生成
-        chain = self.answer_prompt | self.llm  # プロンプトとLLMを連結
+        chain = self.answer_chain  # プロンプトとLLMを連結したチェーン
         response = chain.invoke(
-            {"context": context, "question": query}  # 検索された文書のコンテキスト  # ユーザーの質問
+            {"context": self._build_context(documents), "question": query}  # 検索された文書のコンテキスト  # ユーザーの質問
         )
 
         return response.content  # 生成された回答を返す
 
+    async def _astream_answer(self, query: str, documents: List[Document]) -> AsyncIterator[str]:
+        """
+        検索された文書を基に回答を生成し、生成された順に少しずつ返す
+
+        Args:
+            query: 質問
+            documents: 検索された文書
+
+        Yields:
+            回答のテキスト断片
+        """
+        # 文書がない場合のデフォルトメッセージ
+        if not documents:
+            yield self.NO_DOCUMENTS_ANSWER
+            return
+
+        # LLMの出力をトークン単位で受け取る
+        chain = self.answer_chain  # プロンプトとLLMを連結したチェーン
+        async for chunk in chain.astream({"context": self._build_context(documents), "question": query}):
+            if chunk.content:
+                yield chunk.content
+
+    async def astream(self, query: str) -> AsyncIterator[str]:
+        """
+        文書検索の後、回答を生成された順に少しずつ返す（非同期版）
+
+        Args:
+            query: ユーザーの質問
+
+        Yields:
+            回答のテキスト断片
+        """
+        logger.info(f"Processing query: {query}")
+        documents = await self.aretrieve_documents(query)
+        async for text in self._astream_answer(query, documents):
+            yield text
+
+    def stream(self, query: str) -> Iterator[str]:
+        """
+        文書検索の後、回答を生成された順に少しずつ返す（同期版）
+
+        回答全体を待たずに表示を始められるので、体感の待ち時間が短くなる
+
+        使用例:
+            for text in rag_chain.stream(query):
+                print(text, end="", flush=True)
+
+        retrieve_documentsと同じく、実行中のイベントループの中からは呼び出せない
+        （その場合はastreamを使うこと）。
+
+        Args:
+            query: ユーザーの質問
+
+        Yields:
+            回答のテキスト断片
+        """
+        logger.info(f"Processing query: {query}")
+        documents = self.retrieve_documents(query)
+
+        # 文書がない場合のデフォルトメッセージ
+        if not documents:
+            yield self.NO_DOCUMENTS_ANSWER
+            return
+
+        # LLMの出力をトークン単位で受け取る
+        chain = self.answer_chain  # プロンプトとLLMを連結したチェーン
+        for chunk in chain.stream({"context": self._build_context(documents), "question": query}):
+            if chunk.content:
+                yield chunk.content
+
+    def _config_summary(self) -> Dict[str, Any]:
+        """レスポンスに含める使用した設定"""
+        return {
+            "use_hyde": self.config.use_hyde,
+            "use_fusion": self.config.use_fusion,
+            "use_reranker": self.config.use_reranker,
+            "reranker_type": self.config.reranker_type if self.config.use_reranker else "none",
+        }
+
     def invoke(self, query: str) -> Dict[str, Any]:
         """
         エンドツーエンドの処理を実行
 
+        retrieve_documentsと同じく、実行中のイベントループの中からは呼び出せない
+        （その場合はainvokeを使うこと）。
+
         Args:
             query: ユーザーの質問
 
@@ -287,15 +615,50 @@ class AdvancedRAGChain:
             "query": query,  # 元の質問
             "answer": answer,  # 生成された回答
             "source_documents": documents,  # 参照した文書
+            "sources": self._build_sources(documents),  # 参照した文書の情報
+            "num_sources": len(documents),  # 文書数
+            "retrieval_time": retrieval_time,  # 検索時間
+            "total_time": total_time,  # 合計処理時間
+            "config": self._config_summary(),  # 使用した設定
+        }
+
+    async def ainvoke(self, query: str) -> Dict[str, Any]:
+        """
+        エンドツーエンドの処理を実行（非同期版）
+
+        回答をストリーミングで受け取っている間に、参照文書の情報を
+        別スレッドでまとめておき、LLMの生成待ちの時間と重ねる
+
+        Args:
+            query: ユーザーの質問
+
+        Returns:
+            回答と統計情報（invokeと同じ形式）
+        """
+        # 処理開始時間を記録
+        start_time = time.time()
+
+        # ステップ1: 文書検索を実行
+        logger.info(f"Processing query: {query}")
+        documents = await self.aretrieve_documents(query)
+        retrieval_time = time.time() - start_time  # 検索時間を計測
+
+        # ステップ2: 参照文書の情報の作成を開始し、その間に回答を生成
+        sources_task = asyncio.create_task(asyncio.to_thread(self._build_sources, documents))
+        answer = "".join([text async for text in self._astream_answer(query, documents)])
+        sources = await sources_task
+        total_time = time.time() - start_time  # 合計時間を計測
+
+        # 結果と統計情報を辞書形式で返す
+        return {
+            "query": query,  # 元の質問
+            "answer": answer,  # 生成された回答
+            "source_documents": documents,  # 参照した文書
+            "sources": sources,  # 参照した文書の情報
             "num_sources": len(documents),  # 文書数
             "retrieval_time": retrieval_time,  # 検索時間
             "total_time": total_time,  # 合計処理時間
-            "config": {  # 使用した設定
-                "use_hyde": self.config.use_hyde,
-                "use_fusion": self.config.use_fusion,
-                "use_reranker": self.config.use_reranker,
-                "reranker_type": self.config.reranker_type if self.config.use_reranker else "none",
-            },
+            "config": self._config_summary(),  # 使用した設定
         }
 
     def format_response(self, response: Dict[str, Any]) -> str:
@@ -367,6 +730,7 @@ if __name__ == "__main__":
     )
 
     # Advanced RAGチェーンの作成とテスト実行
+    rag_chain = None
     try:
         rag_chain = AdvancedRAGChain(config=test_config)  # チェーンを初期化
 
@@ -391,3 +755,7 @@ if __name__ == "__main__":
         print("1. Phase 1のChromaDBが存在することを確認してください")
         print("2. 環境変数（OPENAI_API_KEY等）が設定されていることを確認してください")
         print("3. requirements.txtのパッケージがインストールされていることを確認してください")
+    finally:
+        # HTTPクライアントとイベントループを閉じる
+        if rag_chain is not None:
+            rag_chain.close()
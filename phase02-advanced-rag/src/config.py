@@ -4,19 +4,163 @@ Phase 2 Advanced RAG 設定管理
 """
 
 import os
+import functools
 import yaml
+from dataclasses import MISSING, dataclass, field, fields, is_dataclass
+from typing import Any, Dict
 from pathlib import Path
 from dotenv import load_dotenv
 
+# libyaml（C実装）のローダーが使える場合は優先して使用（純Python版より数倍高速）
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # プロジェクトルートの決定
 PROJECT_ROOT = Path(__file__).parent.parent
 
 # .envファイルの読み込み（APIキーなどの秘匿情報）
 load_dotenv(PROJECT_ROOT / ".env")
 
+
+# ============================================
+# settings.yamlの構造（読み込み後は変更不可）
+# ============================================
+@dataclass(frozen=True, slots=True)
+class LLMSettings:
+    model: str
+    temperature: float
+    max_tokens: int
+
+
+@dataclass(frozen=True, slots=True)
+class EmbeddingSettings:
+    model: str
+
+
+@dataclass(frozen=True, slots=True)
+class ModelsSettings:
+    llm: LLMSettings
+    embedding: EmbeddingSettings
+
+
+@dataclass(frozen=True, slots=True)
+class ChromaDBSettings:
+    persist_directory: str
+    collection_name: str
+
+
+@dataclass(frozen=True, slots=True)
+class DatabaseSettings:
+    chromadb: ChromaDBSettings
+
+
+@dataclass(frozen=True, slots=True)
+class HyDESettings:
+    enabled: bool
+    num_hypothetical: int
+    temperature: float
+    max_length: int
+
+
+@dataclass(frozen=True, slots=True)
+class FusionSettings:
+    enabled: bool
+    num_queries: int
+    rrf_k: int
+
+
+@dataclass(frozen=True, slots=True)
+class RerankerSettings:
+    enabled: bool
+    type: str
+
+
+@dataclass(frozen=True, slots=True)
+class ComponentsSettings:
+    hyde: HyDESettings
+    fusion: FusionSettings
+    reranker: RerankerSettings
+
+
+@dataclass(frozen=True, slots=True)
+class RetrievalSettings:
+    initial_k: int
+    final_k: int
+
+
+@dataclass(frozen=True, slots=True)
+class LoggingSettings:
+    level: str = "INFO"
+    file: str = "logs/advanced_rag.log"
+
+
+@dataclass(frozen=True, slots=True)
+class PerformanceSettings:
+    cache_enabled: bool = False
+    cache_ttl: int = 3600
+    batch_size: int = 10
+    max_workers: int = 4
+
+
+@dataclass(frozen=True, slots=True)
+class DevelopmentSettings:
+    test_mode: bool = False
+    debug: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    models: ModelsSettings
+    database: DatabaseSettings
+    components: ComponentsSettings
+    retrieval: RetrievalSettings
+    logging: LoggingSettings = field(default_factory=LoggingSettings)
+    performance: PerformanceSettings = field(default_factory=PerformanceSettings)
+    development: DevelopmentSettings = field(default_factory=DevelopmentSettings)
+
+
+def _from_dict(cls, data: Dict[str, Any], path: str):
+    """
+    settings.yamlのセクションを対応するdataclassに変換（入れ子のセクションも再帰的に変換）
+
+    未定義のキーや必須キーの不足は、どのセクションのどのキーかを示すValueErrorにする
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"settings.yaml: '{path or '(root)'}' must be a mapping")
+
+    def key_path(key: str) -> str:
+        return f"{path}.{key}" if path else key
+
+    known = {f.name: f for f in fields(cls)}
+    unknown = sorted(set(data) - set(known))
+    if unknown:
+        keys = ", ".join(key_path(key) for key in unknown)
+        raise ValueError(f"settings.yaml: unknown key(s): {keys}")
+
+    values = {}
+    for name, f in known.items():
+        if name not in data or data[name] is None:
+            if f.default is MISSING and f.default_factory is MISSING:
+                raise ValueError(f"settings.yaml: missing required key: {key_path(name)}")
+            continue  # dataclass側のデフォルト値を使う
+        value = data[name]
+        values[name] = _from_dict(f.type, value, key_path(name)) if is_dataclass(f.type) else value
+    return cls(**values)
+
+
+@functools.lru_cache(maxsize=1)
+def load_settings() -> Settings:
+    """settings.yamlを一度だけ読み込み、変更不可のSettingsに変換"""
+    with open(PROJECT_ROOT / "config" / "settings.yaml", "r", encoding="utf-8") as f:
+        raw = yaml.load(f, Loader=_YamlLoader)
+
+    return _from_dict(Settings, raw or {}, "")
+
+
 # settings.yamlの読み込み（アプリケーション設定）
-with open(PROJECT_ROOT / "config" / "settings.yaml", 'r', encoding='utf-8') as f:
-    settings = yaml.safe_load(f)
+settings = load_settings()
 
 # ============================================
 # APIキー（環境変数から取得）
@@ -26,34 +170,34 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 # ============================================
 # モデル設定（settings.yamlから取得）
 # ============================================
-LLM_MODEL = settings["models"]["llm"]["model"]
-LLM_TEMPERATURE = settings["models"]["llm"]["temperature"]
-LLM_MAX_TOKENS = settings["models"]["llm"]["max_tokens"]
-EMBEDDING_MODEL = settings["models"]["embedding"]["model"]
+LLM_MODEL = settings.models.llm.model
+LLM_TEMPERATURE = settings.models.llm.temperature
+LLM_MAX_TOKENS = settings.models.llm.max_tokens
+EMBEDDING_MODEL = settings.models.embedding.model
 
 # ============================================
 # データベース設定
 # ============================================
-CHROMADB_PATH = settings["database"]["chromadb"]["persist_directory"]
-CHROMADB_COLLECTION = settings["database"]["chromadb"]["collection_name"]
+CHROMADB_PATH = settings.database.chromadb.persist_directory
+CHROMADB_COLLECTION = settings.database.chromadb.collection_name
 
 # ============================================
 # Advanced RAGコンポーネント設定
 # ============================================
 # HyDE設定
-HYDE_ENABLED = settings["components"]["hyde"]["enabled"]
-HYDE_NUM_HYPOTHETICAL = settings["components"]["hyde"]["num_hypothetical"]
-HYDE_TEMPERATURE = settings["components"]["hyde"]["temperature"]
-HYDE_MAX_LENGTH = settings["components"]["hyde"]["max_length"]
+HYDE_ENABLED = settings.components.hyde.enabled
+HYDE_NUM_HYPOTHETICAL = settings.components.hyde.num_hypothetical
+HYDE_TEMPERATURE = settings.components.hyde.temperature
+HYDE_MAX_LENGTH = settings.components.hyde.max_length
 
 # RAG-Fusion設定
-FUSION_ENABLED = settings["components"]["fusion"]["enabled"]
-FUSION_NUM_QUERIES = settings["components"]["fusion"]["num_queries"]
-FUSION_RRF_K = settings["components"]["fusion"]["rrf_k"]
+FUSION_ENABLED = settings.components.fusion.enabled
+FUSION_NUM_QUERIES = settings.components.fusion.num_queries
+FUSION_RRF_K = settings.components.fusion.rrf_k
 
 # Reranker設定
-RERANKER_ENABLED = settings["components"]["reranker"]["enabled"]
-RERANKER_TYPE = settings["components"]["reranker"]["type"]
+RERANKER_ENABLED = settings.components.reranker.enabled
+RERANKER_TYPE = settings.components.reranker.type
 
 # Reranker用のオプショナルAPIキー（Cohere用）
 COHERE_API_KEY = os.getenv("COHERE_API_KEY")
@@ -61,14 +205,14 @@ COHERE_API_KEY = os.getenv("COHERE_API_KEY")
 # ============================================
 # 検索設定
 # ============================================
-RETRIEVAL_INITIAL_K = settings["retrieval"]["initial_k"]
-RETRIEVAL_FINAL_K = settings["retrieval"]["final_k"]
+RETRIEVAL_INITIAL_K = settings.retrieval.initial_k
+RETRIEVAL_FINAL_K = settings.retrieval.final_k
 
 # ============================================
 # ロギング設定
 # ============================================
-LOG_LEVEL = settings.get("logging", {}).get("level", "INFO")
-LOG_FILE = settings.get("logging", {}).get("file", "logs/advanced_rag.log")
+LOG_LEVEL = settings.logging.level
+LOG_FILE = settings.logging.file
 
 # ============================================
 # 設定検証
@@ -0,0 +1,37 @@
+"""
+検索結果の重複判定に使う文書キー
+
+HyDE・RAG-Fusion・Advanced RAG Chain・Rerankerで同じ文書を同じキーで扱うための共通関数。
+Python組み込みのhash()はプロセスごとに値が変わるため、
+文書内容のblake2bダイジェストを整数にした安定したキーを使う。
+"""
+
+# 必要なライブラリのインポート
+import hashlib  # 文書内容のダイジェスト計算用
+from functools import lru_cache  # 計算済みキーの再利用用
+from langchain.schema import Document  # LangChainのドキュメント型
+
+# キャッシュする文書キーの最大数（1回の検索で扱う文書数より十分大きい値）
+DOCUMENT_KEY_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DOCUMENT_KEY_CACHE_SIZE)
+def _content_key(content: str) -> int:
+    """文書内容から64bitのキーを計算（同じ内容は2回目以降キャッシュから返す）"""
+    return int.from_bytes(hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def document_key(doc: Document) -> int:
+    """
+    文書の一意キーを取得
+
+    HyDEの重複除去で計算したキーを、後段のRRFや検索結果の統合でも
+    再計算せずに使い回せるようにキャッシュしている。
+
+    Args:
+        doc: 対象の文書
+
+    Returns:
+        文書内容から計算した整数キー（プロセスをまたいでも同じ値）
+    """
+    return _content_key(doc.page_content)
@@ -10,7 +10,8 @@ HyDEはユーザーの質問に対して、AIが「仮想的な理想的回答
 """
 
 # 必要なライブラリのインポート
-from typing import List, Optional, Dict  # 型ヒント用のライブラリ
+import asyncio  # 仮想回答の並列生成用
+from typing import List, Optional, Dict, Tuple  # 型ヒント用のライブラリ
 from textwrap import dedent  # 複数行文字列のインデント調整用
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings  # OpenAIのLLMと埋め込みモデル
 from langchain.prompts import PromptTemplate  # プロンプトテンプレート作成用
@@ -21,6 +22,8 @@ from loguru import logger  # type: ignore  # ログ出力用（型チェック
 
 # 設定をインポート
 import config
+from document_key import document_key  # 文書の一意キー
+from sync_runner import SyncLoopRunner  # 同期APIから非同期処理を実行する専用ループ
 
 
 class HyDE:
@@ -68,6 +71,11 @@ class HyDE:
             model=config.EMBEDDING_MODEL  # text-embedding-3-smallなど
         )
 
+        # 同期メソッドから非同期版を呼ぶためのイベントループ
+        # 呼び出しごとにasyncio.run()で新しいループを作ると、LLMと埋め込みモデルの
+        # 非同期HTTP接続が前のループに紐づいたまま再利用されてしまうため、ループを固定する
+        self._runner = SyncLoopRunner(type(self).__name__)
+
         # ChromaDBの初期化：Phase 1で構築済みのベクトルデータベースに接続
         # ChromaDBにはすでに文書がベクトル化されて保存されている
         if persist_directory:
@@ -131,45 +139,80 @@ class HyDE:
         Returns:
             仮想回答のリスト（各回答は200-300文字程度）
         """
-        # 生成された仮想回答を格納するリスト
-        # 複数の回答を生成して、検索の精度を上げる
-        hypothetical_docs = []
-
-        # 指定された数だけ仮想回答を生成
-        for i in range(num_documents):
-            # 温度パラメータを動的に変更（重要なテクニック！）
-            # 1つ目：0.5（より確実性の高い回答）
-            # 2つ目：0.7（バランスの取れた回答）  
-            # 3つ目：0.9（より創造的な回答）
-            # これにより異なる観点の回答を生成できる
-            self.llm.temperature = 0.5 + (i * 0.2)
-
-            # プロンプトテンプレートとLLMを連結（LangChainのパイプ機能）
-            # プロンプト | LLM という記法でチェーンを作成
-            chain = self.hyde_prompt | self.llm
-            
-            # 質問を入力として仮想回答を生成
-            # LLMが「もし私がこの質問に答える文書だったら...」と考えて回答
-            response = chain.invoke({"question": question})
-            
-            # 生成された回答をリストに追加
-            hypothetical_docs.append(response.content)
-
-            # 進捗状況をログに記録（デバッグや監視用）
-            logger.info(f"Generated hypothetical document {i+1}/{num_documents}")
-
-        return hypothetical_docs
+        # 非同期版を専用ループで実行（各仮想回答の生成は並列に行われる）
+        return self._runner.run(self.agenerate_hypothetical_documents(question, num_documents))
+
+    async def agenerate_hypothetical_documents(
+        self, question: str, num_documents: int = 3
+    ) -> List[str]:
+        """
+        複数の仮想回答を並列に生成する（generate_hypothetical_documentsの非同期版）
+
+        各仮想回答は互いに独立したプロンプトなので、asyncio.gatherで
+        LLMへのリクエストを同時に送信します。
+        生成時間は「N回分のLLM呼び出し」から「ほぼ1回分」に短縮されます。
+
+        Args:
+            question: ユーザーの質問
+            num_documents: 生成する仮想回答の数（デフォルト3つ）
+
+        Returns:
+            仮想回答のリスト（生成を依頼した順）
+        """
+        # 温度パラメータを回答ごとに変える（重要なテクニック！）
+        # 1つ目：0.5（より確実性の高い回答）
+        # 2つ目：0.7（バランスの取れた回答）
+        # 3つ目：0.9（より創造的な回答）
+        # self.llmは他のコンポーネントと共有されるため、属性は書き換えずに
+        # bind()で呼び出しごとの温度を指定する
+        chains = [
+            self.hyde_prompt | self.llm.bind(temperature=0.5 + (i * 0.2))
+            for i in range(num_documents)
+        ]
+
+        # すべての仮想回答を同時に生成
+        # gatherは結果を渡した順に返すので、回答の順番は温度の順と一致する
+        responses = await asyncio.gather(
+            *[chain.ainvoke({"question": question}) for chain in chains]
+        )
+
+        # 進捗状況をログに記録（デバッグや監視用）
+        logger.info(f"Generated {len(responses)} hypothetical documents")
+
+        return [response.content for response in responses]
 
     def search_with_hyde(
         self, question: str, k: int = 10, num_hypothetical: int = 3
     ) -> Dict:
         """
-        HyDEを使用した検索のメインメソッド
-        
+        HyDEを使用した検索のメインメソッド（同期版）
+
+        実行中のイベントループの中からは呼び出せない（その場合はasearch_with_hydeをawaitすること）
+
+        Args:
+            question: ユーザーの質問
+            k: 最終的に取得する文書数（デフォルト10件）
+            num_hypothetical: 生成する仮想回答数（デフォルト3つ）
+
+        Returns:
+            検索結果と統計情報を含む辞書
+        """
+        return self._runner.run(self.asearch_with_hyde(question, k, num_hypothetical))
+
+    def close(self):
+        """同期API用のイベントループを閉じる"""
+        self._runner.close()
+
+    async def asearch_with_hyde(
+        self, question: str, k: int = 10, num_hypothetical: int = 3
+    ) -> Dict:
+        """
+        HyDEを使用した検索のメインメソッド（非同期版）
+
         処理の流れ：
-        1. ユーザーの質問から複数の仮想回答を生成
-        2. 各仮想回答をベクトル化してChromaDBで検索
-        3. 複数の検索結果から重複を除去
+        1. ユーザーの質問から複数の仮想回答を並列に生成
+        2. 質問とすべての仮想回答を1回のAPI呼び出しでまとめてベクトル化
+        3. 全ベクトルでChromaDBを一括検索し、重複を除去
         4. スコア順にソートして上位k件を返す
 
         Args:
@@ -183,37 +226,40 @@ class HyDE:
         # ステップ1: 質問から複数の仮想回答を生成
         # ここがHyDEの最初の重要なステップ
         logger.info("Generating hypothetical documents...")
-        hypothetical_docs = self.generate_hypothetical_documents(
+        hypothetical_docs = await self.agenerate_hypothetical_documents(
             question, num_hypothetical
         )
 
-        # ステップ2: 各仮想回答をクエリとして類似文書を検索
+        # ステップ2: 元の質問と仮想回答をまとめてベクトル化
+        # Embedding APIは複数テキストを1リクエストで受け付けるので、
+        # テキストごとにAPIを呼ぶよりも往復回数が減る
+        # 元の質問も検索に使い、仮想回答が的外れだった場合の取りこぼしを防ぐ
+        query_embeddings = await self.embeddings.aembed_documents(
+            [question] + hypothetical_docs
+        )
+
+        # ステップ3: すべてのベクトルでChromaDBを一括検索
         # ここがHyDEの核心：仮想回答と似た内容の実際の文書を探す
         all_results = []  # すべての検索結果を格納
         seen_contents = set()  # 重複チェック用（同じ文書を何度も取得しないように）
 
-        # 各仮想回答を使って検索を実行
-        for hyde_doc in hypothetical_docs:
-            # ChromaDBでベクトル類似度検索を実行
-            # 仮想回答をベクトル化 → DB内の文書ベクトルと比較 → 類似度が高いものを取得
-            results = self.vectorstore.similarity_search_with_score(hyde_doc, k=k)
-
+        for results in self.search_by_embeddings(query_embeddings, k=k):
             # 重複文書を除去しながら結果を統合
             for doc, score in results:
-                # 文書内容のハッシュ値を計算（同じ内容かどうか判定）
-                content_hash = hash(doc.page_content)
-                
+                # 文書の一意キーを取得（同じ内容かどうか判定）
+                content_hash = document_key(doc)
+
                 # まだ見ていない文書なら追加
                 if content_hash not in seen_contents:
                     seen_contents.add(content_hash)  # 「この文書は見た」と記録
                     all_results.append((doc, score))  # 結果リストに追加
 
-        # ステップ3: スコアでソート
+        # ステップ4: スコアでソート
         # ChromaDBは「距離」を返すので、値が小さいほど類似度が高い
         # （距離0 = 完全に同じ、距離が大きい = 似ていない）
         all_results.sort(key=lambda x: x[1])  # スコア（距離）で昇順ソート
 
-        # ステップ4: 上位k件の文書を最終結果として選択
+        # 上位k件の文書を最終結果として選択
         # 指定された数だけ取得（デフォルトは10件）
         final_results = all_results[:k]
 
@@ -222,6 +268,7 @@ class HyDE:
         return {
             "question": question,  # 元の質問
             "hypothetical_docs": hypothetical_docs,  # 生成された仮想回答のリスト
+            "query_embedding": query_embeddings[0],  # 元の質問の埋め込みベクトル（MMR等で再利用）
             "results": final_results,  # 最終的な検索結果（文書とスコアのタプル）
             "num_unique_docs": len(all_results),  # 重複除去後の総文書数
             "top_score": (
@@ -229,6 +276,40 @@ class HyDE:
             ),  # 最高スコア（最も距離が近い=似ている文書）
         }
 
+    def search_by_embeddings(
+        self, embeddings: List[List[float]], k: int
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        ベクトル化済みの複数テキストでChromaDBを一括検索
+
+        ChromaDBのqueryは複数のクエリベクトルを受け付けるので、
+        テキストごとにsimilarity_searchを呼ばずに1回で検索します。
+
+        Args:
+            embeddings: 検索に使う埋め込みベクトルのリスト
+            k: ベクトルごとに取得する文書数
+
+        Returns:
+            ベクトルごとの(文書, 距離)のリスト（embeddingsと同じ順）
+        """
+        # 全ベクトル分の検索結果を1回で取得
+        response = self.vectorstore._collection.query(
+            query_embeddings=embeddings,  # 検索に使うベクトル（複数可）
+            n_results=k,  # ベクトルごとの取得件数
+            include=["documents", "metadatas", "distances"],  # 文書本文・メタデータ・距離
+        )
+
+        # ChromaDBの結果（ベクトルごとのリストのリスト）を(Document, 距離)に変換
+        return [
+            [
+                (Document(id=doc_id, page_content=text, metadata=metadata or {}), distance)
+                for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+            ]
+            for ids, texts, metadatas, distances in zip(
+                response["ids"], response["documents"], response["metadatas"], response["distances"]
+            )
+        ]
+
     def format_results(self, search_results: Dict) -> str:
         """
         検索結果を人間が読みやすい形式にフォーマット
@@ -319,3 +400,6 @@ if __name__ == "__main__":
         
         # 結果を見やすく整形して表示
         print(hyde.format_results(results))
+
+    # 同期API用のイベントループを閉じる
+    hyde.close()
@@ -23,6 +23,8 @@ from loguru import logger  # ログ出力用
 
 # 設定をインポート
 import config
+from document_key import document_key  # 文書の一意キー
+from sync_runner import SyncLoopRunner  # 同期APIから非同期処理を実行する専用ループ
 
 
 class RAGFusion:
@@ -71,6 +73,11 @@ class RAGFusion:
             model=config.EMBEDDING_MODEL,  # text-embedding-3-smallなど
         )
 
+        # 同期メソッドから非同期版を呼ぶためのイベントループ
+        # 呼び出しごとにasyncio.run()で新しいループを作ると、LLMと埋め込みモデルの
+        # 非同期HTTP接続が前のループに紐づいたまま再利用されてしまうため、ループを固定する
+        self._runner = SyncLoopRunner(type(self).__name__)
+
         # ChromaDBの初朞化：Phase 1で構築済みのベクトルデータベースに接続
         # 複数のクエリで検索した結果を統合するためのDB
         if persist_directory:
@@ -133,6 +140,19 @@ class RAGFusion:
             original_query: ユーザーの元の質問（例：「RAGとは？」）
             num_queries: 生成するクエリ数（デフォルト5つ）
 
+        Returns:
+            クエリのリスト（元のクエリを含む）
+        """
+        return self._runner.run(self.agenerate_queries(original_query, num_queries))
+
+    async def agenerate_queries(self, original_query: str, num_queries: int = 5) -> List[str]:
+        """
+        複数の検索クエリを生成する（generate_queriesの非同期版）
+
+        Args:
+            original_query: ユーザーの元の質問
+            num_queries: 生成するクエリ数（デフォルト5つ）
+
         Returns:
             クエリのリスト（元のクエリを含む）
         """
@@ -142,7 +162,7 @@ class RAGFusion:
 
         # LLMにクエリ生成を依頼
         # LLMが「この質問を異なる角度から表現すると...」と考えて生成
-        response = chain.invoke(
+        response = await chain.ainvoke(
             {
                 "original_query": original_query,  # 元の質問
                 "num_queries": num_queries,  # 生成するクエリ数
@@ -176,6 +196,55 @@ class RAGFusion:
         # 指定数+1個（元のクエリ含む）までに制限して返す
         return queries[: num_queries + 1]
 
+    async def aembed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        複数のクエリを1回のAPI呼び出しでまとめてベクトル化
+
+        Embedding APIは複数テキストを配列で受け付けるので、
+        クエリごとにembed_queryを呼ぶよりも往復回数がN回から1回に減ります。
+
+        Args:
+            queries: ベクトル化するクエリのリスト
+
+        Returns:
+            クエリごとの埋め込みベクトルのリスト（queriesと同じ順）
+        """
+        return await self.embeddings.aembed_documents(queries)
+
+    def search_by_embeddings(
+        self, embeddings: List[List[float]], k: int
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        ベクトル化済みの複数クエリでChromaDBを一括検索
+
+        similarity_search_with_scoreはクエリごとに内部でベクトル化し直すため、
+        ChromaDBのコレクションに直接ベクトルを渡して1回のqueryで検索します。
+
+        Args:
+            embeddings: クエリの埋め込みベクトルのリスト
+            k: クエリごとに取得する文書数
+
+        Returns:
+            クエリごとの(文書, 距離)のリスト（embeddingsと同じ順）
+        """
+        # 全クエリ分の検索結果を1回で取得
+        response = self.vectorstore._collection.query(
+            query_embeddings=embeddings,  # 検索に使うベクトル（複数可）
+            n_results=k,  # クエリごとの取得件数
+            include=["documents", "metadatas", "distances"],  # 文書本文・メタデータ・距離
+        )
+
+        # ChromaDBの結果（クエリごとのリストのリスト）を(Document, 距離)に変換
+        return [
+            [
+                (Document(id=doc_id, page_content=text, metadata=metadata or {}), distance)
+                for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+            ]
+            for ids, texts, metadatas, distances in zip(
+                response["ids"], response["documents"], response["metadatas"], response["distances"]
+            )
+        ]
+
     def reciprocal_rank_fusion(
         self, results_dict: Dict[str, List[Tuple[Document, float]]], k: int = None
     ) -> List[Tuple[Document, float]]:
@@ -206,9 +275,9 @@ class RAGFusion:
         for query, results in results_dict.items():
             # 各文書にランク付け（順位は1から開始）
             for rank, (doc, original_score) in enumerate(results, 1):
-                # 文書内容のハッシュ値を使って一意なキーを作成
+                # 文書内容から一意なキーを取得
                 # 同じ内容の文書は同じキーになる
-                doc_key = hash(doc.page_content)
+                doc_key = document_key(doc)
 
                 # Reciprocal Rank Fusionの公式：1 / (rank + k)
                 # rankが小さい（上位）ほどスコアが高くなる
@@ -240,13 +309,35 @@ class RAGFusion:
 
     def search_with_fusion(self, original_query: str, k: int = 10, num_queries: int = 5) -> Dict:
         """
-        RAG-Fusionを使用した検索のメインメソッド
+        RAG-Fusionを使用した検索のメインメソッド（同期版）
+
+        実行中のイベントループの中からは呼び出せない（その場合はasearch_with_fusionをawaitすること）
+
+        Args:
+            original_query: ユーザーの質問
+            k: 最終的に取得する文書数（デフォルト10件）
+            num_queries: 生成するクエリ数（デフォルト5つ）
+
+        Returns:
+            検索結果と統計情報を含む辞書
+        """
+        return self._runner.run(self.asearch_with_fusion(original_query, k, num_queries))
+
+    def close(self):
+        """同期API用のイベントループを閉じる"""
+        self._runner.close()
+
+    async def asearch_with_fusion(
+        self, original_query: str, k: int = 10, num_queries: int = 5
+    ) -> Dict:
+        """
+        RAG-Fusionを使用した検索のメインメソッド（非同期版）
 
         処理の流れ：
         1. ユーザーの質問から複数の検索クエリを生成
-        2. 各クエリでChromaDBを検索（並列的に実行）
-        3. Reciprocal Rank Fusionで結果を統合
-        4. 上位k件を最終結果として返す
+        2. すべてのクエリを1回のAPI呼び出しでまとめてベクトル化
+        3. ベクトル化済みのクエリでChromaDBを一括検索
+        4. Reciprocal Rank Fusionで結果を統合し、上位k件を返す
 
         Args:
             original_query: ユーザーの質問
@@ -259,31 +350,30 @@ class RAGFusion:
         # ステップ1: 元のクエリから複数の検索クエリを生成
         # ここがRAG-Fusionの最初の重要なステップ
         logger.info("Generating multiple queries...")
-        queries = self.generate_queries(original_query, num_queries)
-        # ステップ2: 各クエリで検索を実行（概念的には並列）
+        queries = await self.agenerate_queries(original_query, num_queries)
+
+        # ステップ2: 全クエリを1回のAPI呼び出しでまとめてベクトル化
+        query_embeddings = await self.aembed_queries(queries)
+
+        # ステップ3: 全クエリで一括検索
         # ここがRAG-Fusionの核心：異なる観点からの検索結果を収集
-        logger.info("Executing parallel searches...")
-        results_dict = {}  # クエリごとの検索結果を格納する辞書
+        # 統合で絞り込まれるので、多めに取得（最終k件の2倍）
+        logger.info("Executing batched searches...")
+        results_per_query = self.search_by_embeddings(query_embeddings, k=k * 2)
 
-        # 各クエリでベクトル類似度検索を実行
-        for query in queries:
-            # ChromaDBでベクトル類似度検索を実行
-            # クエリをベクトル化 → DB内の文書ベクトルと比較 → 類似度が高いものを取得
-            results = self.vectorstore.similarity_search_with_score(
-                query,  # 検索クエリ（生成されたクエリまたは元のクエリ）
-                k=k * 2,  # 統合で絞り込まれるので、多めに取得（最終k件の2倍）
-            )
+        results_dict = {}  # クエリごとの検索結果を格納する辞書
+        for query, results in zip(queries, results_per_query):
             results_dict[query] = results  # 結果をクエリごとに保存
 
             # 検索結果数をログに記録（デバッグや監視用）
             logger.info(f"Found {len(results)} results for: {query[:50]}...")
 
-        # ステップ3: Reciprocal Rank Fusionで複数の検索結果を統合
+        # ステップ4: Reciprocal Rank Fusionで複数の検索結果を統合
         # 複数クエリで頻繁にヒットした文書が高スコアになる
         logger.info("Applying Reciprocal Rank Fusion...")
         fused_results = self.reciprocal_rank_fusion(results_dict)  # RRFアルゴリズムを適用
 
-        # ステップ4: 統合結果から上位k件を最終結果として選択
+        # 統合結果から上位k件を最終結果として選択
         # 指定された数だけ取得（デフォルトは10件）
         final_results = fused_results[:k]
 
@@ -292,6 +382,7 @@ class RAGFusion:
         return {
             "original_query": original_query,  # 元の質問
             "generated_queries": queries,  # 生成された複数の検索クエリ
+            "query_embedding": query_embeddings[0],  # 元の質問の埋め込みベクトル（MMR等で再利用）
             "results": final_results,  # RRF統合後の最終結果（文書とスコアのタプル）
             "num_queries": len(queries),  # 使用したクエリ数
             "total_unique_docs": len(fused_results),  # 統合後のユニーク文書総数
@@ -383,3 +474,6 @@ if __name__ == "__main__":
 
         # 結果を見やすく整形して表示
         print(fusion.format_results(results))
+
+    # 同期API用のイベントループを閉じる
+    fusion.close()
@@ -10,6 +10,7 @@ from loguru import logger  # ログ出力用
 
 # 設定をインポート
 import config
+from document_key import document_key  # 文書の一意キー
 
 # Cohereは使用しないためコメントアウト
 # try:
@@ -184,8 +185,8 @@ class HybridReranker(BaseReranker):
         # 各Rerankerの結果を処理し、文書ごとにスコアを集計
         for results in all_results:
             for doc, score in results:
-                # 文書の内容をハッシュ化して一意なキーを生成
-                doc_key = hash(doc.page_content)
+                # 文書の内容から一意なキーを取得
+                doc_key = document_key(doc)
 
                 # 初めて出現する文書の場合は初期化
                 if doc_key not in doc_scores:
@@ -0,0 +1,65 @@
+"""
+同期APIから非同期処理を実行するためのイベントループ
+
+HyDE・RAG-Fusion・Advanced RAG Chainの同期メソッドは内部で非同期版を呼んでいる。
+asyncio.run()は呼び出しごとに新しいループを作るため、インスタンスが持つ
+非同期HTTPクライアントのkeep-alive接続が前のループに紐づいたまま残ってしまう。
+インスタンスごとに1つのループを持ち、同期呼び出しはすべてそのループで実行する。
+"""
+
+# 必要なライブラリのインポート
+import asyncio  # イベントループ用
+import threading  # 複数スレッドからの同時呼び出しを直列化するロック用
+from typing import Any, Coroutine, TypeVar  # 型ヒント用のライブラリ
+
+T = TypeVar("T")
+
+
+class SyncLoopRunner:
+    """
+    専用のイベントループでコルーチンを完了まで実行するクラス
+
+    制限：
+    - 実行中のイベントループの中（async関数、Jupyter等）からは呼び出せない。
+      その場合はRuntimeErrorになるので、非同期版のメソッドを直接awaitすること。
+    - 複数スレッドから同時に呼ばれた場合はロックで1つずつ順に実行する。
+    """
+
+    def __init__(self, owner: str):
+        """
+        Args:
+            owner: エラーメッセージに表示する呼び出し元のクラス名
+        """
+        self._owner = owner
+        self._loop = asyncio.new_event_loop()
+        self._lock = threading.Lock()
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """コルーチンを専用ループで実行して結果を返す"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass  # 実行中のループがない（通常の同期呼び出し）
+        else:
+            coro.close()  # 未実行のコルーチンの警告を出さないように閉じる
+            raise RuntimeError(
+                f"{self._owner}の同期メソッドはイベントループの中から呼び出せません。"
+                "非同期版（a〜で始まるメソッド）をawaitしてください。"
+            )
+
+        with self._lock:
+            if self._loop.is_closed():
+                coro.close()
+                raise RuntimeError(f"{self._owner}は既に閉じられています")
+            return self._loop.run_until_complete(coro)
+
+    @property
+    def is_closed(self) -> bool:
+        """専用ループが閉じられているかどうか"""
+        return self._loop.is_closed()
+
+    def close(self):
+        """専用ループを閉じる（2回目以降の呼び出しは何もしない）"""
+        with self._lock:
+            if not self._loop.is_closed():
+                self._loop.close()